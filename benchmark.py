@@ -0,0 +1,215 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+
+from datetime import datetime, timezone
+
+from swarm_sim import SwarmTrace
+
+
+FUNCTIONS = ('neighbor_matrix', 'distance_matrix', 'swarm_to_nxgraph', 'connected_components', 'diameter', 'cluster_coef',
+             'k_vicinity', 'ForestFire', 'MDRW')
+DENSE = ('neighbor_matrix', 'distance_matrix', 'diameter') # Functions with (N, N) outputs or intermediates
+NEEDS_NEIGHBORS = ('connected_components', 'cluster_coef', 'k_vicinity', 'ForestFire', 'MDRW') # Functions reading the neighbor lists
+
+
+#==============================================================================================
+
+def synthetic_trace(nb_nodes, steps=10, connection_range=20000, degree=10, speed=0.01, seed=0):
+    """
+    Function to generate a seeded synthetic trace: the nodes start uniformly in a cube sized so that each node has about `degree`
+    neighbors, then follow independent random walks.
+    Args:
+        nb_nodes (int): the number of nodes N.
+        steps (int, optional): the number of timestamps T. Defaults to 10.
+        connection_range (int, optional): the connection range of the swarm. Defaults to 20000.
+        degree (float, optional): the expected mean degree. Defaults to 10.
+        speed (float, optional): the standard deviation of each step, relative to the connection range. Defaults to 0.01.
+        seed (int, optional): the random seed. Defaults to 0.
+    Returns:
+        SwarmTrace: the (T, N, 3) synthetic trace.
+    """
+    rng = np.random.default_rng(seed)
+    side = (nb_nodes * 4/3*np.pi*connection_range**3 / degree)**(1/3)
+    start = rng.uniform(0, side, (1, nb_nodes, 3))
+    moves = rng.normal(0, speed*connection_range, (steps-1, nb_nodes, 3))
+    positions = np.concatenate((start, start + np.cumsum(moves, axis=0)))
+    return SwarmTrace(positions, connection_range=connection_range)
+
+def real_trace(pattern='out*.csv', start=0, steps=10, connection_range=20000):
+    """
+    Function to load a slice of the real trace of the repository (one CSV file per node).
+    Args:
+        pattern (str, optional): the glob pattern of the CSV files. Defaults to 'out*.csv'.
+        start (int, optional): the first timestamp index. Defaults to 0.
+        steps (int, optional): the number of timestamps. Defaults to 10.
+        connection_range (int, optional): the connection range of the swarm. Defaults to 20000.
+    Returns:
+        SwarmTrace: the trace slice, None if no CSV file matches.
+    """
+    key = lambda p: int(''.join(c for c in os.path.basename(p) if c.isdigit()) or 0)
+    paths = sorted(glob.glob(pattern), key=key)
+    if not paths:
+        return None
+    return SwarmTrace.from_csv(paths, connection_range=connection_range).window(start, start + steps)
+
+def measure(func, repeat=1):
+    """
+    Function to measure the wall-clock time and the peak memory allocated by a call (numpy allocations included).
+    The memory is traced during an extra call, so that the tracing overhead does not affect the times.
+    Args:
+        func (function): the function to call, without arguments.
+        repeat (int, optional): the number of timed calls, the best time is kept. Defaults to 1.
+    Returns:
+        tuple(float, int): the best time in seconds and the peak of allocated memory in bytes.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        t = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def _call(swarm, name, seed):
+    """
+    Function to call one benchmarked method of a swarm with the arguments used by the notebook.
+    Args:
+        swarm (Swarm): the swarm.
+        name (str): the method name.
+        seed (int): the random seed of the sampling algorithms.
+    """
+    if name == 'ForestFire':
+        return swarm.ForestFire(n=10, p=0.7, s=seed)
+    if name == 'MDRW':
+        return swarm.MDRW(n=10, s=seed)
+    if name == 'k_vicinity':
+        return swarm.k_vicinity(depth=2)
+    return getattr(swarm, name)()
+
+def run_benchmarks(traces, functions=FUNCTIONS, repeat=1, max_dense=5000, seed=0, verbose=True):
+    """
+    Function to benchmark the Swarm methods on every timestamp of several traces.
+    Args:
+        traces (dict(str:SwarmTrace)): the traces to benchmark, by source name.
+        functions (list(str), optional): the Swarm methods to benchmark. Defaults to FUNCTIONS.
+        repeat (int, optional): the number of calls per timestamp, the best time is kept. Defaults to 1.
+        max_dense (int, optional): the largest swarm on which the methods with (N, N) arrays are run. Defaults to 5000.
+        seed (int, optional): the random seed of the sampling algorithms. Defaults to 0.
+        verbose (bool, optional): if True, each result is printed. Defaults to True.
+    Returns:
+        list(dict): one record per (source, function), with the mean, min and max time over the timestamps (in seconds) and
+        the largest peak memory (in MiB). The status is 'ok' or 'skipped'.
+    """
+    unknown = set(functions) - set(FUNCTIONS)
+    if unknown:
+        raise ValueError(f"Unknown function(s): {sorted(unknown)}")
+    warmup = synthetic_trace(50, 1, seed=seed).swarm(0)
+    warmup.compute_neighbors()
+    for name in functions: # First calls pay for imports and caches
+        _call(warmup, name, seed)
+    records = []
+    for source, trace in traces.items():
+        N = trace.positions.shape[1]
+        for name in functions:
+            record = {'source': source, 'nodes': N, 'steps': len(trace), 'function': name}
+            if name in DENSE and N > max_dense:
+                record['status'] = 'skipped'
+                records.append(record)
+                continue
+            times, peaks = [], []
+            for t in range(len(trace)):
+                swarm = trace.swarm(t)
+                if name in NEEDS_NEIGHBORS:
+                    swarm.compute_neighbors() # Setup, not measured
+                elapsed, peak = measure(lambda: _call(swarm, name, seed), repeat)
+                times.append(elapsed)
+                peaks.append(peak)
+            record.update({'status': 'ok', 'time_mean': float(np.mean(times)), 'time_min': float(np.min(times)),
+                           'time_max': float(np.max(times)), 'peak_mib': max(peaks) / 2**20})
+            records.append(record)
+            if verbose:
+                print(f"{source:>14} {name:>20}: {record['time_mean']*1e3:10.2f} ms, {record['peak_mib']:9.2f} MiB")
+    return records
+
+def environment():
+    """
+    Function to describe the machine and the code version, stored with the results.
+    Returns:
+        dict: the date, Python and numpy versions, platform, number of CPUs and git commit.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'date': datetime.now(timezone.utc).isoformat(), 'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'commit': commit}
+
+def compare(baseline, records, threshold=1.25):
+    """
+    Function to compare benchmark results with a previous run, to catch regressions.
+    Args:
+        baseline (list(dict)): the records of the previous run (see help(run_benchmarks)).
+        records (list(dict)): the records of the current run.
+        threshold (float, optional): the ratio of mean times above which a function is reported as slower. Defaults to 1.25.
+    Returns:
+        list(dict): the (source, function) couples found in both runs, with their time and memory ratios (current / baseline)
+        and a 'regression' flag.
+    """
+    previous = {(r['source'], r['function']): r for r in baseline if r.get('status') == 'ok'}
+    out = []
+    for r in records:
+        old = previous.get((r['source'], r['function']))
+        if old is None or r.get('status') != 'ok':
+            continue
+        ratio = r['time_mean'] / old['time_mean'] if old['time_mean'] else np.inf
+        out.append({'source': r['source'], 'function': r['function'], 'time_ratio': ratio,
+                    'memory_ratio': r['peak_mib'] / old['peak_mib'] if old['peak_mib'] else np.inf,
+                    'regression': bool(ratio > threshold)})
+    return out
+
+
+#==============================================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the swarm_sim hot paths across swarm sizes.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help="synthetic swarm sizes")
+    parser.add_argument('--steps', type=int, default=10, help="number of timestamps per trace")
+    parser.add_argument('--functions', nargs='+', default=list(FUNCTIONS), choices=FUNCTIONS)
+    parser.add_argument('--repeat', type=int, default=1, help="calls per timestamp, the best time is kept")
+    parser.add_argument('--max-dense', type=int, default=5000, help="largest swarm for the methods with (N, N) arrays")
+    parser.add_argument('--range', type=int, default=20000, help="connection range")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-real', action='store_true', help="skip the slice of the real out*.csv trace")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="previous results file to compare with")
+    parser.add_argument('--threshold', type=float, default=1.25, help="time ratio reported as a regression")
+    args = parser.parse_args()
+
+    traces = {f'synthetic_{n}': synthetic_trace(n, args.steps, args.range, seed=args.seed) for n in args.sizes}
+    if not args.no_real:
+        real = real_trace(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'out*.csv'), steps=args.steps, connection_range=args.range)
+        if real is not None:
+            traces['real'] = real
+    records = run_benchmarks(traces, args.functions, args.repeat, args.max_dense, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'parameters': vars(args), 'results': records}, f, indent=2)
+    print(f"Results saved to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            diff = compare(json.load(f)['results'], records, args.threshold)
+        for d in diff:
+            flag = 'REGRESSION' if d['regression'] else ''
+            print(f"{d['source']:>14} {d['function']:>20}: x{d['time_ratio']:.2f} time, x{d['memory_ratio']:.2f} memory {flag}")
+        if any(d['regression'] for d in diff):
+            raise SystemExit(1)
@@ -0,0 +1,155 @@
+import numpy as np
+
+from contacts import INTERVAL_DTYPE
+from spatial_index import SpatialGrid
+
+
+EVENT_DTYPE = np.dtype([('time', float), ('n1', np.int64), ('n2', np.int64), ('up', bool)])
+
+
+#==============================================================================================
+
+class ContactPlan:
+    """
+    ContactPlan object, listing the exact link-up / link-down events of a swarm between two times.
+    The trajectories are interpolated linearly between samples, so the distance between two nodes crosses the connection range
+    at the roots of a quadratic equation, solved in closed form.
+    """
+
+    def __init__(self, initial, events, start_time, end_time, connection_range):
+        """
+        ContactPlan object constructor
+
+        Args:
+            initial (np.ndarray): the (M, 2) array of node pairs in contact at the start time.
+            events (np.ndarray): the structured array of events (time, n1, n2, up), sorted by time.
+            start_time (float): the start time of the plan.
+            end_time (float): the end time of the plan.
+            connection_range (float): the connection range of the swarm.
+        """
+        self.initial = initial
+        self.events = events
+        self.start_time = start_time
+        self.end_time = end_time
+        self.connection_range = connection_range
+
+    def __len__(self):
+        """
+        Returns:
+            int: the number of events.
+        """
+        return len(self.events)
+
+    def __str__(self):
+        """
+        ContactPlan object descriptor
+
+        Returns:
+            str: the string description of the plan
+        """
+        return f"Contact plan from {self.start_time} to {self.end_time}: {len(self.initial)} initial contact(s), {len(self)} event(s)"
+
+    def intervals(self):
+        """
+        Function to convert the plan into contact intervals. The contacts still ongoing at the end time are closed at the end time.
+        Returns:
+            np.ndarray: the structured array of intervals with fields n1, n2, start, end and duration (see help(contacts.ContactAnalyzer.intervals)),
+            sorted by pair then start.
+        """
+        n1 = np.concatenate((self.initial[:, 0], self.events['n1']))
+        n2 = np.concatenate((self.initial[:, 1], self.events['n2']))
+        time = np.concatenate((np.full(len(self.initial), self.start_time), self.events['time']))
+        up = np.concatenate((np.ones(len(self.initial), dtype=bool), self.events['up']))
+        order = np.lexsort((time, n2, n1))
+        n1, n2, time, up = n1[order], n2[order], time[order], up[order]
+        starts = np.flatnonzero(up)
+        closed = (starts+1 < len(up)) & (n1[np.minimum(starts+1, len(up)-1)] == n1[starts]) & (n2[np.minimum(starts+1, len(up)-1)] == n2[starts])
+        closed &= ~up[np.minimum(starts+1, len(up)-1)]
+        out = np.empty(len(starts), dtype=INTERVAL_DTYPE)
+        out['n1'], out['n2'], out['start'] = n1[starts], n2[starts], time[starts]
+        out['end'] = np.where(closed, time[np.minimum(starts+1, len(up)-1)], self.end_time)
+        out['duration'] = out['end'] - out['start']
+        return out
+
+
+#==============================================================================================
+
+def _crossings(d0, d1, r):
+    """
+    Function to find when the relative position of node pairs, interpolated linearly between d0 and d1, crosses the sphere of radius r.
+    Solves |d0 + s*(d1-d0)|^2 = r^2 for s in ]0, 1].
+    Args:
+        d0 (np.ndarray): the (K, 3) relative positions at the beginning of the interval.
+        d1 (np.ndarray): the (K, 3) relative positions at the end of the interval.
+        r (float): the connection range.
+    Returns:
+        tuple(np.ndarray, np.ndarray): the entry and exit fractions s of each pair, NaN if none in ]0, 1].
+    """
+    delta = d1 - d0
+    a = np.einsum('ij,ij->i', delta, delta)
+    b = 2*np.einsum('ij,ij->i', d0, delta)
+    c = np.einsum('ij,ij->i', d0, d0) - r*r
+    disc = b*b - 4*a*c
+    ok = (a > 0) & (disc > 0) # Tangent or static pairs do not change state
+    sq = np.sqrt(np.where(ok, disc, 0))
+    a_safe = np.where(ok, a, 1)
+    s_in, s_out = (-b - sq)/(2*a_safe), (-b + sq)/(2*a_safe)
+    valid = lambda s: ok & (s > 0) & (s <= 1)
+    return np.where(valid(s_in), s_in, np.nan), np.where(valid(s_out), s_out, np.nan)
+
+def contact_plan(trace, connection_range=None, start=0, stop=None, dt=1.0, block=50):
+    """
+    Function to compute the exact contact plan of a trace, with linear interpolation of the trajectories between samples.
+    The common motion of the swarm is removed first. The samples are processed by blocks: a pair is skipped for a whole block
+    when the distance it can cover, bounded by the path lengths of its two nodes, cannot bring it across the connection range,
+    and within a block, an interval is skipped when the bounds of the distance over the segment stay on one side of the range.
+    Only the remaining pairs and intervals are solved, so the cost follows the number of events rather than the number of samples.
+    Args:
+        trace (SwarmTrace): the trace of the swarm.
+        connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+        start (int, optional): the first timestamp index. Defaults to 0.
+        stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        dt (float, optional): the duration between two samples. Defaults to 1.0.
+        block (int, optional): the number of sample intervals per block. Defaults to 50.
+    Returns:
+        ContactPlan: the contact plan, with times expressed as timestamp index * dt.
+    """
+    r = float(connection_range or trace.connection_range)
+    P = np.asarray(trace.positions[start:stop], dtype=float)
+    P = P - P.mean(axis=1, keepdims=True) # Pairwise distances do not depend on the common motion
+    T = len(P)
+    start, _, _ = slice(start, stop).indices(len(trace))
+    grid = SpatialGrid(P[0], r) if T else None
+    initial = grid.query_pairs() if T else np.empty((0, 2), dtype=np.int64)
+    steps = np.sqrt(((P[1:] - P[:-1])**2).sum(axis=2)) # (T-1, N) path length of each node per interval
+    times, n1, n2, up = [], [], [], []
+    for b in range(0, T-1, block):
+        e = min(b + block, T-1)
+        path = steps[b:e].sum(axis=0)
+        reach = 2*path.max()
+        pairs = SpatialGrid(P[b], r + reach).query_pairs() # Pairs that may come within range during the block
+        i, j = pairs[:, 0], pairs[:, 1]
+        d = np.sqrt(((P[b, i] - P[b, j])**2).sum(axis=1))
+        slack = path[i] + path[j]
+        keep = (d - slack <= r) & (d + slack > r) # Else the pair stays on the same side for the whole block
+        i, j = i[keep], j[keep]
+        if len(i) == 0:
+            continue
+        d0 = P[b:e, i] - P[b:e, j] # (C, K, 3), C intervals of the block (time first) and K pairs
+        d1 = P[b+1:e+1, i] - P[b+1:e+1, j]
+        n0, nn1 = np.linalg.norm(d0, axis=2), np.linalg.norm(d1, axis=2)
+        lower = (n0 + nn1 - np.linalg.norm(d1 - d0, axis=2))/2 # Bounds of the distance over each segment
+        upper = np.maximum(n0, nn1)
+        step, pair = np.nonzero((lower <= r) & (upper > r)) # Interval offset in the block, pair index in i, j
+        s_in, s_out = _crossings(d0[step, pair], d1[step, pair], r)
+        for s, kind in ((s_in, True), (s_out, False)):
+            hit = ~np.isnan(s)
+            times.append((start + b + step[hit] + s[hit])*dt)
+            n1.append(i[pair[hit]])
+            n2.append(j[pair[hit]])
+            up.append(np.full(hit.sum(), kind))
+    events = np.empty(sum(len(t) for t in times), dtype=EVENT_DTYPE)
+    if times:
+        events['time'], events['n1'], events['n2'], events['up'] = map(np.concatenate, (times, n1, n2, up))
+    events = events[np.argsort(events['time'], kind='stable')]
+    return ContactPlan(initial, events, start*dt, (start + max(T-1, 0))*dt, r)
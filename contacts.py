@@ -0,0 +1,210 @@
+import numpy as np
+
+
+INTERVAL_DTYPE = np.dtype([('n1', np.int64), ('n2', np.int64), ('start', float), ('end', float), ('duration', float)])
+
+
+#==============================================================================================
+
+class ContactAnalyzer:
+    """
+    ContactAnalyzer object, extracting pairwise contact statistics from a sequence of boolean adjacency matrices.
+    The adjacency matrices are fed in time chunks (see help(ContactAnalyzer.update)), so that the whole (T, N, N) stack never
+    has to be held in memory. All pairs are processed at once with array operations.
+    """
+
+    def __init__(self, nb_nodes, dt=1.0, t0=0.0):
+        """
+        ContactAnalyzer object constructor
+
+        Args:
+            nb_nodes (int): the number of nodes N.
+            dt (float, optional): the duration of a timestamp (e.g. 10 for 10 s samples). Defaults to 1.0.
+            t0 (float, optional): the time of the first timestamp. Defaults to 0.0.
+        """
+        self.nb_nodes = int(nb_nodes)
+        self.dt = float(dt)
+        self.t0 = float(t0)
+        self.pairs = np.stack(np.triu_indices(self.nb_nodes, k=1), axis=1) # (P, 2) node pairs, i < j
+        P = len(self.pairs)
+        self.steps = 0 # Number of timestamps processed so far
+        self.up_count = np.zeros(P, dtype=np.int64) # Number of timestamps in contact during the finished contacts, per pair
+        self._last = np.zeros(P, dtype=bool) # Link state at the last timestamp
+        self._open_start = np.full(P, -1, dtype=np.int64) # Start of the ongoing contact, -1 if none
+        self._closed = [] # (pair, start, end) arrays of the finished contacts, in timestamp indices
+
+    def __str__(self):
+        """
+        ContactAnalyzer object descriptor
+
+        Returns:
+            str: the string description of the analyzer
+        """
+        nb_contacts = sum(len(c) for c in self._closed) + int((self._open_start >= 0).sum())
+        return f"Contact analysis of {self.nb_nodes} node(s) over {self.steps} timestamp(s): {nb_contacts} contact(s)"
+
+    #*************** Common operations ***************
+    def update(self, adjacency):
+        """
+        Function to process the next adjacency matrices of the sequence.
+        Args:
+            adjacency (np.ndarray): a (N, N) boolean adjacency matrix, or a (t, N, N) chunk of them in time order.
+        """
+        adjacency = np.asarray(adjacency, dtype=bool)
+        if adjacency.ndim == 2:
+            adjacency = adjacency[np.newaxis]
+        links = adjacency[:, self.pairs[:, 0], self.pairs[:, 1]] # (t, P) link states
+        if len(links) == 0:
+            return
+        change = np.diff(np.vstack((self._last, links)).astype(np.int8), axis=0) # +1 link up, -1 link down
+        ev_t, ev_p = np.nonzero(change)
+        ev_up = change[ev_t, ev_p] > 0
+        ev_t = ev_t + self.steps
+        order = np.lexsort((ev_t, ev_p)) # Group the events by pair, in time order
+        ev_t, ev_p, ev_up = ev_t[order], ev_p[order], ev_up[order]
+        same_pair = np.zeros(len(ev_p), dtype=bool)
+        same_pair[1:] = ev_p[1:] == ev_p[:-1]
+        # A link down closes the link up just before it, or the contact still open from the previous chunk
+        down = np.flatnonzero(~ev_up)
+        start = np.where(same_pair[down], ev_t[down-1], self._open_start[ev_p[down]])
+        self._closed.append(np.stack((ev_p[down], start, ev_t[down]), axis=1))
+        np.add.at(self.up_count, ev_p[down], ev_t[down] - start)
+        last_event = np.ones(len(ev_p), dtype=bool)
+        last_event[:-1] = ev_p[:-1] != ev_p[1:]
+        self._open_start[ev_p[last_event]] = np.where(ev_up[last_event], ev_t[last_event], -1)
+        self._last = links[-1].copy()
+        self.steps += len(links)
+
+    def update_deltas(self, ups, downs):
+        """
+        Function to process the next timestamp of the sequence from its link changes only (see help(topology_log.TopologyLog)),
+        in time proportional to the number of changes.
+        Args:
+            ups (np.ndarray): the (K, 2) node pairs (i, j), with i < j, whose link comes up at this timestamp.
+            downs (np.ndarray): the (K', 2) node pairs whose link goes down at this timestamp.
+        """
+        t = self.steps
+        down = self._pair_index(downs)
+        start = self._open_start[down]
+        self._closed.append(np.stack((down, start, np.full(len(down), t)), axis=1))
+        self.up_count[down] += t - start
+        self._open_start[down] = -1
+        self._last[down] = False
+        up = self._pair_index(ups)
+        self._open_start[up] = t
+        self._last[up] = True
+        self.steps += 1
+
+    def _pair_index(self, pairs):
+        """
+        Function to find the position of node pairs in self.pairs.
+        Args:
+            pairs (np.ndarray): the (K, 2) node pairs (i, j), with i < j.
+        Returns:
+            np.ndarray: the (K,) pair indices.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        i, j = pairs[:, 0], pairs[:, 1]
+        return i*self.nb_nodes - i*(i+1)//2 + j - i - 1
+
+    def _to_intervals(self, records):
+        """
+        Function to convert (pair, start, end) records in timestamp indices into a structured array of intervals.
+        Args:
+            records (np.ndarray): the (M, 3) array of records.
+        Returns:
+            np.ndarray: the structured array of intervals, see help(ContactAnalyzer.intervals).
+        """
+        out = np.empty(len(records), dtype=INTERVAL_DTYPE)
+        out['n1'] = self.pairs[records[:, 0], 0]
+        out['n2'] = self.pairs[records[:, 0], 1]
+        out['start'] = self.t0 + records[:, 1]*self.dt
+        out['end'] = self.t0 + records[:, 2]*self.dt
+        out['duration'] = (records[:, 2] - records[:, 1])*self.dt
+        return out
+
+    def _records(self, close=True):
+        """
+        Function to gather all contact records sorted by pair then start time.
+        Args:
+            close (bool, optional): if True, the ongoing contacts are closed at the end of the sequence. Defaults to True.
+        Returns:
+            np.ndarray: the (M, 3) array of (pair, start, end) records, in timestamp indices.
+        """
+        records = list(self._closed)
+        if close:
+            ongoing = np.flatnonzero(self._open_start >= 0)
+            records.append(np.stack((ongoing, self._open_start[ongoing], np.full(len(ongoing), self.steps)), axis=1))
+        records = np.concatenate(records) if records else np.empty((0, 3), dtype=np.int64)
+        return records[np.lexsort((records[:, 1], records[:, 0]))]
+
+    #*************** Metrics ***************
+    def availability(self):
+        """
+        Function to compute the availability (aka disponibility) of each pair, defined as the percentage of timestamps
+        during which the two nodes are neighbors.
+        Returns:
+            np.ndarray: the (N, N) symmetric matrix of availabilities between 0 and 100.
+        """
+        matrix = np.zeros((self.nb_nodes, self.nb_nodes))
+        if self.steps:
+            ongoing = self._open_start >= 0
+            up_count = self.up_count + np.where(ongoing, self.steps - self._open_start, 0)
+            values = up_count / self.steps * 100
+            matrix[self.pairs[:, 0], self.pairs[:, 1]] = values
+            matrix[self.pairs[:, 1], self.pairs[:, 0]] = values
+        return matrix
+
+    def intervals(self, close=True):
+        """
+        Function to list the contact intervals of every pair. A contact starts at the first timestamp where the two nodes are
+        neighbors and ends at the first timestamp where they are not anymore.
+        Args:
+            close (bool, optional): if True, the ongoing contacts are closed at the end of the sequence. Defaults to True.
+        Returns:
+            np.ndarray: the structured array of intervals with fields n1, n2, start, end and duration, sorted by pair then start.
+        """
+        return self._to_intervals(self._records(close))
+
+    def inter_contact_times(self):
+        """
+        Function to list the inter-contact gaps of every pair, i.e. the time between the end of a contact and the start of the
+        next one between the same two nodes.
+        Returns:
+            np.ndarray: the structured array of gaps with fields n1, n2, start, end and duration, sorted by pair then start.
+        """
+        records = self._records(close=True)
+        nxt = np.flatnonzero(records[1:, 0] == records[:-1, 0]) # Consecutive contacts of the same pair
+        gaps = np.stack((records[nxt, 0], records[nxt, 2], records[nxt+1, 1]), axis=1)
+        return self._to_intervals(gaps.reshape(-1, 3))
+
+    def ict_distribution(self, bins=50):
+        """
+        Function to compute the distribution of the inter-contact times (see help(ContactAnalyzer.inter_contact_times)).
+        Args:
+            bins (int or list(float), optional): the histogram bins, see help(np.histogram). Defaults to 50.
+        Returns:
+            tuple(np.ndarray, np.ndarray): the number of gaps in each bin and the bin edges.
+        """
+        return np.histogram(self.inter_contact_times()['duration'], bins=bins)
+
+
+#==============================================================================================
+
+def analyze_contacts(adjacency_chunks, nb_nodes=None, dt=1.0, t0=0.0):
+    """
+    Function to run a contact analysis over a whole sequence of adjacency matrices (see help(ContactAnalyzer)).
+    Args:
+        adjacency_chunks (iterable(np.ndarray)): (N, N) or (t, N, N) boolean adjacency matrices, in time order.
+        nb_nodes (int, optional): the number of nodes. Defaults to None (read from the first chunk).
+        dt (float, optional): the duration of a timestamp. Defaults to 1.0.
+        t0 (float, optional): the time of the first timestamp. Defaults to 0.0.
+    Returns:
+        ContactAnalyzer: the analyzer fed with the whole sequence.
+    """
+    analyzer = None
+    for chunk in adjacency_chunks:
+        if analyzer is None:
+            analyzer = ContactAnalyzer(nb_nodes or np.shape(chunk)[-1], dt, t0)
+        analyzer.update(chunk)
+    return analyzer if analyzer is not None else ContactAnalyzer(nb_nodes or 0, dt, t0)
@@ -0,0 +1,158 @@
+import os
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+
+from graph_metrics import clustering_coefficients, hop_distances, pairs_to_csr
+from sampling import forest_fire, generators, mdrw, rns
+from spatial_index import pairwise_distances
+
+
+ALGORITHMS = ('ForestFire', 'MDRW', 'RNS')
+METRICS = ('ks_degree', 'ks_clustering', 'diameter_ratio')
+
+
+_shared = {} # Worker state: the adjacency matrix and ground-truth profile of each connection range, see _init_worker
+
+
+#==============================================================================================
+
+def ks_distance(a, b):
+    """
+    Function to compute the two-sample Kolmogorov-Smirnov distance, i.e. the maximum gap between the empirical cumulative
+    distribution functions of two samples.
+    Args:
+        a (np.ndarray): the first sample.
+        b (np.ndarray): the second sample.
+    Returns:
+        float: the KS distance between 0 and 1 (1 if a sample is empty).
+    """
+    a, b = np.sort(np.ravel(a)), np.sort(np.ravel(b))
+    if len(a) == 0 or len(b) == 0:
+        return 1.0
+    points = np.concatenate((a, b))
+    cdf_a = np.searchsorted(a, points, side='right') / len(a)
+    cdf_b = np.searchsorted(b, points, side='right') / len(b)
+    return float(np.abs(cdf_a - cdf_b).max())
+
+def graph_profile(adjacency):
+    """
+    Function to compute the metrics used to compare a sample with the whole swarm: degree distribution, clustering coefficient
+    distribution and diameter (in number of hops).
+    Args:
+        adjacency (np.ndarray): the (N, N) boolean adjacency matrix.
+    Returns:
+        dict: 'degree' (N,), 'clustering' (N,) and 'diameter' (int).
+    """
+    A = np.asarray(adjacency, dtype=bool)
+    indptr, indices = pairs_to_csr(len(A), np.argwhere(np.triu(A)))
+    hops = hop_distances(indptr, indices)
+    return {
+        'degree': A.sum(axis=1),
+        'clustering': clustering_coefficients(A),
+        'diameter': int(hops.max()) if hops.size else 0,
+        }
+
+def _init_worker(snapshots):
+    """
+    Function to hand the adjacency matrices and ground-truth profiles to a worker process once, instead of with every run.
+    Args:
+        snapshots (dict): the (adjacency matrix, ground-truth profile) couple of each connection range.
+    """
+    _shared.update(snapshots)
+
+def _run(task, snapshots=None):
+    """
+    Function to evaluate one sampling run: partition the swarm, then compare the induced subgraph of every group with the whole swarm.
+    The random stream of the run is spawned from its seed, one independent stream per algorithm (see help(sampling.generators)).
+    Args:
+        task (tuple): the algorithm name, connection range, seed, number of groups and fire spreading probability.
+        snapshots (dict, optional): the (adjacency matrix, ground-truth profile) couple of each connection range (see
+            help(graph_profile)). Defaults to None (the ones of the worker, see help(_init_worker)).
+    Returns:
+        dict: the metrics of the run, averaged over its groups.
+    """
+    algorithm, connection_range, seed, n_groups, p = task
+    A, truth = (_shared if snapshots is None else snapshots)[connection_range]
+    rng = generators(seed, len(ALGORITHMS))[ALGORITHMS.index(algorithm)]
+    if algorithm == 'RNS':
+        labels = rns(len(A), range(n_groups), rng)
+    else:
+        indptr, indices = pairs_to_csr(len(A), np.argwhere(np.triu(A)))
+        if algorithm == 'ForestFire':
+            labels = forest_fire(indptr, indices, n_groups, p, rng)
+        else:
+            labels = mdrw(indptr, indices, n_groups, rng)
+    scores = {m: [] for m in METRICS}
+    for g in np.unique(labels):
+        idx = np.flatnonzero(labels == g)
+        profile = graph_profile(A[np.ix_(idx, idx)])
+        scores['ks_degree'].append(ks_distance(profile['degree'], truth['degree']))
+        scores['ks_clustering'].append(ks_distance(profile['clustering'], truth['clustering']))
+        scores['diameter_ratio'].append(profile['diameter'] / truth['diameter'] if truth['diameter'] else np.nan)
+    row = {'algorithm': algorithm, 'connection_range': connection_range, 'seed': seed, 'groups': len(scores['ks_degree'])}
+    row.update({m: float(np.mean(v)) for m, v in scores.items()})
+    return row
+
+def sampling_runs(positions, ranges, algorithms=ALGORITHMS, seeds=range(100), n_groups=10, p=0.7, workers=None):
+    """
+    Function to run every combination of sampling algorithm, connection range and seed on a swarm snapshot, in parallel.
+    The ground-truth profile of the whole swarm is computed once per connection range and sent once to each worker, with the
+    adjacency matrix, rather than with every run.
+    Args:
+        positions (np.ndarray): the (N, 3) array of node coordinates (see help(Swarm.positions)).
+        ranges (list(int)): the connection ranges to evaluate.
+        algorithms (list(str), optional): among 'ForestFire', 'MDRW' and 'RNS'. Defaults to all of them.
+        seeds (list(int), optional): the seed of each run; each run uses its own random stream, spawned from its seed
+            (see help(sampling.generators)). Defaults to range(100).
+        n_groups (int, optional): the number of groups (samples) per run. Defaults to 10.
+        p (float, optional): the fire spreading probability of Forest Fire. Defaults to 0.7.
+        workers (int, optional): the number of worker processes. Defaults to None (number of CPUs). 1 runs in the current process.
+    Returns:
+        pd.DataFrame: one row per run with the KS distances of the degree and clustering coefficient distributions and the
+        diameter ratio, each averaged over the groups of the run.
+    """
+    unknown = set(algorithms) - set(ALGORITHMS)
+    if unknown:
+        raise ValueError(f"Unknown algorithm(s): {sorted(unknown)}")
+    D = pairwise_distances(positions)
+    np.fill_diagonal(D, np.inf)
+    snapshots = {}
+    for cr in ranges:
+        A = D <= cr
+        snapshots[cr] = A, graph_profile(A) # Cached ground truth for this range
+    tasks = [(algo, cr, s, n_groups, p) for cr in ranges for algo in algorithms for s in seeds]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        rows = [_run(task, snapshots) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(snapshots,)) as pool: # Snapshots sent once per worker
+            rows = list(pool.map(_run, tasks, chunksize=max(1, len(tasks) // (4*workers))))
+    return pd.DataFrame(rows)
+
+def summarize(runs):
+    """
+    Function to summarize sampling runs: the spread of each metric across seeds, for each algorithm and connection range.
+    Args:
+        runs (pd.DataFrame): the runs, see help(sampling_runs).
+    Returns:
+        pd.DataFrame: the mean, standard deviation, minimum and maximum of each metric, indexed by (algorithm, connection_range).
+    """
+    return runs.groupby(['algorithm', 'connection_range'])[list(METRICS)].agg(['mean', 'std', 'min', 'max'])
+
+def evaluate_sampling(positions, ranges, algorithms=ALGORITHMS, seeds=range(100), n_groups=10, p=0.7, workers=None):
+    """
+    Function to evaluate how representative the samples of each algorithm are (see help(sampling_runs) and help(summarize)).
+    Args:
+        positions (np.ndarray): the (N, 3) array of node coordinates.
+        ranges (list(int)): the connection ranges to evaluate.
+        algorithms (list(str), optional): among 'ForestFire', 'MDRW' and 'RNS'. Defaults to all of them.
+        seeds (list(int), optional): the seed of each run. Defaults to range(100).
+        n_groups (int, optional): the number of groups (samples) per run. Defaults to 10.
+        p (float, optional): the fire spreading probability of Forest Fire. Defaults to 0.7.
+        workers (int, optional): the number of worker processes. Defaults to None (number of CPUs).
+    Returns:
+        pd.DataFrame: the summary table, indexed by (algorithm, connection_range).
+    """
+    return summarize(sampling_runs(positions, ranges, algorithms, seeds, n_groups, p, workers))
@@ -0,0 +1,331 @@
+import numpy as np
+
+from spatial_index import pairwise_distances
+
+
+#==============================================================================================
+
+def components_by_threshold(n, pairs, weights, thresholds):
+    """
+    Function to count the connected components of a graph for several edge-weight thresholds in a single pass.
+    Edges are sorted by weight and merged with a union-find structure (Kruskal order), and the number of components is
+    recorded each time a threshold is reached.
+    Args:
+        n (int): the number of nodes.
+        pairs (np.ndarray): the (M, 2) array of node index pairs.
+        weights (np.ndarray): the weight of each pair (e.g. the distance between the two nodes).
+        thresholds (list(float)): the thresholds; an edge exists if its weight is lower or equal to the threshold.
+    Returns:
+        np.ndarray: the number of connected components for each threshold, in the given order.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    weights = np.asarray(weights)
+    keep = np.flatnonzero(weights <= thresholds.max()) if len(thresholds) else np.empty(0, dtype=int) # Longer edges never count
+    order = keep[np.argsort(weights[keep], kind='stable')]
+    pairs, weights = np.asarray(pairs)[order].tolist(), weights[order]
+    stops = np.searchsorted(weights, np.sort(thresholds), side='right') # Number of edges below each sorted threshold
+    parent = list(range(n))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]] # Path halving
+            i = parent[i]
+        return i
+    counts = []
+    components, e = n, 0
+    for stop in stops:
+        while e < stop and components > 1:
+            ri, rj = find(pairs[e][0]), find(pairs[e][1])
+            if ri != rj:
+                parent[ri] = rj
+                components -= 1
+            e += 1
+        counts.append(components)
+    result = np.empty(len(thresholds), dtype=int)
+    result[np.argsort(thresholds, kind='stable')] = counts
+    return result
+
+def range_sweep(positions, ranges, ids=None):
+    """
+    Function to compute connectivity metrics for a whole list of connection ranges from a single distance computation.
+    Args:
+        positions (np.ndarray): the (N, 3) array of node coordinates.
+        ranges (list(float)): the connection ranges to evaluate.
+        ids (np.ndarray, optional): the node IDs; nodes sharing an ID are never neighbors. Defaults to None (all distinct).
+    Returns:
+        dict(str:np.ndarray): for R ranges, 'degree' (R, N), 'isolation' (R,) ratio of nodes without neighbor, 'density' (R,)
+        graph density and 'components' (R,) number of connected components.
+    """
+    ranges = np.asarray(ranges, dtype=float)
+    D = pairwise_distances(positions)
+    N = len(D)
+    if ids is None:
+        ids = np.arange(N)
+    ids = np.asarray(ids)
+    D[ids[:, np.newaxis] == ids[np.newaxis, :]] = np.inf # Same rule as Node.is_neighbor
+    degree = np.stack([(D <= r).sum(axis=1) for r in ranges]) if len(ranges) else np.empty((0, N), dtype=int)
+    max_edges = N*(N-1)
+    iu = np.triu_indices(N, k=1)
+    return {
+        'ranges': ranges,
+        'degree': degree,
+        'isolation': (degree == 0).mean(axis=1) if N else np.zeros(len(ranges)),
+        'density': degree.sum(axis=1)/max_edges if max_edges else np.zeros(len(ranges)),
+        'components': components_by_threshold(N, np.stack(iu, axis=1), D[iu], ranges),
+        }
+
+def pairs_to_csr(n, pairs):
+    """
+    Function to convert a list of undirected node pairs into a compressed sparse row (CSR) adjacency.
+    Args:
+        n (int): the number of nodes.
+        pairs (np.ndarray): the (M, 2) array of node index pairs, each pair being set both ways.
+    Returns:
+        tuple(np.ndarray, np.ndarray): the (n+1,) indptr array and the (2M,) indices array.
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    src = np.concatenate((pairs[:, 0], pairs[:, 1]))
+    dst = np.concatenate((pairs[:, 1], pairs[:, 0]))
+    order = np.lexsort((dst, src))
+    indptr = np.searchsorted(src[order], np.arange(n+1))
+    return indptr.astype(np.int64), dst[order]
+
+def hop_distances(indptr, indices, sources=None, block_size=256):
+    """
+    Function to compute the hop distances from a set of source nodes to every node, with a breadth-first search run for a block
+    of sources at once: the frontiers of all sources are expanded together as a boolean (S, N) array.
+    Args:
+        indptr (np.ndarray): the CSR index pointers, see help(pairs_to_csr).
+        indices (np.ndarray): the CSR neighbor indices.
+        sources (list(int), optional): the source node indices. Defaults to None (all nodes).
+        block_size (int, optional): the number of sources expanded together, to bound memory. Defaults to 256.
+    Returns:
+        np.ndarray: the (S, N) matrix of hop distances, -1 for unreachable nodes.
+    """
+    N = len(indptr) - 1
+    sources = np.arange(N) if sources is None else np.asarray(sources, dtype=np.int64)
+    hops = np.full((len(sources), N), -1, dtype=np.int64)
+    hops[np.arange(len(sources)), sources] = 0
+    E = len(indices)
+    if E == 0:
+        return hops
+    has_neighbors = np.diff(indptr) > 0
+    starts = indptr[:-1][has_neighbors] # Segments of the nodes with neighbors only, the others would end the previous segment early
+    for b in range(0, len(sources), block_size):
+        block = hops[b:b+block_size]
+        frontier = block == 0
+        visited = frontier.copy()
+        depth = 0
+        while frontier.any():
+            depth += 1
+            reached = np.zeros_like(frontier)
+            reached[:, has_neighbors] = np.logical_or.reduceat(frontier[:, indices], starts, axis=1) # Any neighbor in the frontier
+            frontier = reached & ~visited
+            visited |= frontier
+            block[frontier] = depth
+    return hops
+
+def path_report(hops, ids=None):
+    """
+    Function to summarize a square matrix of hop distances between a set of nodes.
+    Args:
+        hops (np.ndarray): the (K, K) matrix of hop distances, -1 for unreachable pairs.
+        ids (list(int), optional): the ID of each node. Defaults to None (0 to K-1).
+    Returns:
+        dict: 'hops' the hop matrix, 'diameter' the tuple (source_id, target_id, number of hops) of the longest shortest path
+        (first one in row order, (0,0,0) if none), 'eccentricity' (K,) the maximum hop distance from each node to the nodes it
+        can reach, and 'lengths' the shortest path lengths of all connected pairs of distinct nodes, in row order.
+    """
+    hops = np.asarray(hops)
+    K = len(hops)
+    ids = np.arange(K) if ids is None else np.asarray(ids)
+    distinct = ids[:, np.newaxis] != ids[np.newaxis, :]
+    diameter = (0, 0, 0)
+    if K and hops.max() > 0:
+        i, j = np.unravel_index(np.argmax(hops), hops.shape)
+        diameter = (ids[i].item(), ids[j].item(), hops[i, j].item())
+    return {
+        'hops': hops,
+        'diameter': diameter,
+        'eccentricity': hops.max(axis=1).clip(min=0) if K else np.empty(0, dtype=int),
+        'lengths': hops[(hops >= 0) & distinct],
+        }
+
+def clustering_coefficients(adjacency):
+    """
+    Function to compute the clustering coefficient of every node from the adjacency matrix, using matrix products:
+    the number of edges between the neighbors of node i is the number of triangles through i, ((A @ A) * A).sum(i) / 2.
+    Args:
+        adjacency (np.ndarray): a (N, N) boolean adjacency matrix, or a (T, N, N) stack of them.
+    Returns:
+        np.ndarray: the (N,) or (T, N) clustering coefficients between 0 and 1 (0 for nodes with less than 2 neighbors).
+    """
+    A = np.asarray(adjacency, dtype=np.float64)
+    degree = A.sum(axis=-1)
+    links = (np.matmul(A, A) * A).sum(axis=-1) # Twice the number of edges between the neighbors of each node
+    max_links = degree * (degree - 1)
+    return np.divide(links, max_links, out=np.zeros_like(links), where=max_links > 0)
+
+def graph_density(adjacency):
+    """
+    Function to compute the graph density, i.e. the ratio between the number of edges and the maximum possible number of edges.
+    Args:
+        adjacency (np.ndarray): a (N, N) boolean adjacency matrix, or a (T, N, N) stack of them.
+    Returns:
+        float or np.ndarray: the graph density between 0 and 1, one value per snapshot.
+    """
+    A = np.asarray(adjacency, dtype=bool)
+    N = A.shape[-1]
+    if N < 2:
+        return np.zeros(A.shape[:-2]) if A.ndim > 2 else 0.0
+    return np.count_nonzero(A, axis=(-2, -1)) / (N*(N-1))
+
+def k_vicinity(adjacency, depth=1):
+    """
+    Function to compute the k-vicinity of every node, i.e. the number of other nodes within at most k hops, by expanding the
+    reachability matrix of all nodes at once.
+    Args:
+        adjacency (np.ndarray): a (N, N) boolean adjacency matrix, or a (T, N, N) stack of them.
+        depth (int, optional): the number of hops k. Defaults to 1.
+    Returns:
+        np.ndarray: the (N,) or (T, N) k-vicinity counts.
+    """
+    A = np.asarray(adjacency, dtype=bool)
+    N = A.shape[-1]
+    not_self = ~np.eye(N, dtype=bool)
+    reach = A & not_self
+    Af = A.astype(np.float32)
+    for _ in range(depth-1):
+        new_reach = (np.matmul(reach.astype(np.float32), Af) > 0) & not_self
+        new_reach |= reach
+        if np.array_equal(new_reach, reach): # No new node reached, deeper hops will not change anything
+            break
+        reach = new_reach
+    return reach.sum(axis=-1)
+
+def component_labels(n, pairs):
+    """
+    Function to label the connected components of a graph without recursion, by propagating the minimum label along the edges
+    and compressing the label chains (pointer jumping, as in a union-find structure) until stable.
+    Args:
+        n (int): the number of nodes.
+        pairs (np.ndarray): the (M, 2) array of node index pairs.
+    Returns:
+        np.ndarray: the (n,) component label of each node, numbered from 0 in order of the first node of each component.
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    labels = np.arange(n)
+    i, j = pairs[:, 0], pairs[:, 1]
+    while True:
+        low = np.minimum(labels[i], labels[j])
+        new = labels.copy()
+        np.minimum.at(new, i, low)
+        np.minimum.at(new, j, low)
+        np.minimum.at(new, labels, new) # Hook each root onto the lowest label of its members
+        while True: # Pointer jumping
+            jumped = new[new]
+            if np.array_equal(jumped, new):
+                break
+            new = jumped
+        if np.array_equal(new, labels):
+            break
+        labels = new
+    return _canonical(labels)
+
+def _canonical(labels):
+    """
+    Function to renumber component labels from 0, in order of the first node of each component.
+    Args:
+        labels (np.ndarray): the (n,) array of arbitrary labels.
+    Returns:
+        np.ndarray: the renumbered labels.
+    """
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first, kind='stable')] = np.arange(len(first))
+    return rank[inverse.reshape(-1)]
+
+
+#==============================================================================================
+
+class ComponentTracker:
+    """
+    ComponentTracker object, following the connected components of a swarm over time.
+    At each step, only the components touched by a removed link are relabelled, and added links merge components on the graph
+    of components, so the cost depends on the topology changes rather than on the size of the swarm. Merge and split events
+    between consecutive steps are recorded.
+    """
+
+    def __init__(self, nb_nodes):
+        """
+        ComponentTracker object constructor
+
+        Args:
+            nb_nodes (int): the number of nodes N.
+        """
+        self.nb_nodes = int(nb_nodes)
+        self.labels = np.arange(self.nb_nodes) # Component label of each node at the last step
+        self.steps = 0 # Number of steps processed so far
+        self.events = [] # List of (step, 'merge'|'split', component, components), see help(ComponentTracker.update)
+        self._keys = np.empty(0, dtype=np.int64) # Sorted link keys i*N+j (i < j) at the last step
+
+    def __str__(self):
+        """
+        ComponentTracker object descriptor
+
+        Returns:
+            str: the string description of the tracker
+        """
+        nb_cc = len(np.unique(self.labels))
+        return f"Component tracking of {self.nb_nodes} node(s) over {self.steps} step(s): {nb_cc} component(s), {len(self.events)} event(s)"
+
+    def update(self, pairs):
+        """
+        Function to process the neighbor pairs of the next step.
+        A 'merge' event (step, 'merge', new component, previous components) is recorded when a component gathers nodes of several
+        previous components, and a 'split' event (step, 'split', previous component, new components) when the nodes of a previous
+        component end up in several components. Components are the labels of their respective step.
+        Args:
+            pairs (np.ndarray): the (M, 2) array of node index pairs at this step.
+        Returns:
+            np.ndarray: the (N,) component labels at this step (see help(component_labels)).
+        """
+        N = self.nb_nodes
+        pairs = np.sort(np.asarray(pairs, dtype=np.int64).reshape(-1, 2), axis=1)
+        keys = np.unique(pairs[:, 0]*N + pairs[:, 1])
+        added = keys[~np.isin(keys, self._keys, assume_unique=True)]
+        removed = self._keys[~np.isin(self._keys, keys, assume_unique=True)]
+        prev = self.labels
+        base = prev.copy()
+        if len(removed): # Relabel the components that lost a link
+            affected = np.isin(prev, np.unique(prev[removed // N]))
+            nodes = np.flatnonzero(affected)
+            local = np.full(N, -1, dtype=np.int64)
+            local[nodes] = np.arange(len(nodes))
+            inner = pairs[affected[pairs[:, 0]] & affected[pairs[:, 1]]]
+            base[nodes] = prev.max() + 1 + component_labels(len(nodes), local[inner])
+        if len(added): # Merge the components linked by a new link
+            _, base = np.unique(base, return_inverse=True)
+            base = base.reshape(-1)
+            links = base[np.stack((added // N, added % N), axis=1)]
+            base = component_labels(base.max()+1, links)[base]
+        labels = _canonical(base)
+        if self.steps:
+            self._record_events(prev, labels)
+        self.labels = labels
+        self._keys = keys
+        self.steps += 1
+        return labels
+
+    def _record_events(self, prev, labels):
+        """
+        Function to record the merge and split events between two consecutive labellings.
+        Args:
+            prev (np.ndarray): the component labels at the previous step.
+            labels (np.ndarray): the component labels at this step.
+        """
+        overlap = np.unique(np.stack((prev, labels), axis=1), axis=0) # (previous, new) components sharing nodes
+        for col, kind in ((1, 'merge'), (0, 'split')):
+            comp, counts = np.unique(overlap[:, col], return_counts=True)
+            for c in comp[counts > 1]:
+                others = overlap[overlap[:, col] == c, 1-col]
+                self.events.append((self.steps, kind, c.item(), tuple(others.tolist())))
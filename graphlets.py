@@ -0,0 +1,343 @@
+import numpy as np
+
+from itertools import combinations, permutations
+from math import factorial
+
+
+GRAPHLETS = {
+    3: ('path', 'triangle'),
+    4: ('star', 'path', 'paw', 'cycle', 'diamond', 'clique'),
+    } # Names of the connected graphlets, in the order of the counts. The 5-node ones are described by graphlet_edges(5)
+_DEGREES_4 = [(1, 1, 1, 3), (1, 1, 2, 2), (1, 2, 2, 3), (2, 2, 2, 2), (2, 2, 3, 3), (3, 3, 3, 3)] # Degree sequence of each 4-node graphlet
+_tables = {} # Dict(int:tuple), see help(_table)
+
+
+#==============================================================================================
+
+def _table(k):
+    """
+    Function to build the lookup table of the connected graphlets on k nodes. The induced subgraph on k sorted nodes is encoded
+    with one bit per node pair, so the table maps each of the 2^(k(k-1)/2) codes to its graphlet class.
+    Args:
+        k (int): the number of nodes of the graphlets.
+    Returns:
+        tuple(np.ndarray, list): the class of each code (-1 if the subgraph is not connected), and the edge list of each class.
+    """
+    if k in _tables:
+        return _tables[k]
+    pairs = list(combinations(range(k), 2))
+    bit = {p: b for b, p in enumerate(pairs)}
+    perms = list(permutations(range(k)))
+    canonical = {}
+    for code in range(1 << len(pairs)):
+        edges = [p for b, p in enumerate(pairs) if code >> b & 1]
+        seen, stack = {0}, [0] # Connectivity check
+        while stack:
+            u = stack.pop()
+            for a, b in edges:
+                v = b if a == u else a if b == u else None
+                if v is not None and v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        if len(seen) == k:
+            canonical[code] = min(sum(1 << bit[tuple(sorted((p[a], p[b])))] for a, b in edges) for p in perms)
+    classes = sorted(set(canonical.values()), key=lambda c: (bin(c).count('1'), c))
+    if k == 4: # Same order as GRAPHLETS[4]
+        degrees = lambda c: tuple(sorted(sum(1 for b, p in enumerate(pairs) if c >> b & 1 and v in p) for v in range(k)))
+        classes = sorted(classes, key=lambda c: _DEGREES_4.index(degrees(c)))
+    index = {c: i for i, c in enumerate(classes)}
+    lookup = np.full(1 << len(pairs), -1, dtype=np.int64)
+    for code, c in canonical.items():
+        lookup[code] = index[c]
+    _tables[k] = lookup, [[p for b, p in enumerate(pairs) if c >> b & 1] for c in classes]
+    return _tables[k]
+
+def graphlet_edges(k):
+    """
+    Function to describe the connected graphlets on k nodes (2 for k=3, 6 for k=4, 21 for k=5), in the order of the counts.
+    Args:
+        k (int): the number of nodes of the graphlets.
+    Returns:
+        list(list(tuple)): the edge list of each graphlet, on nodes 0 to k-1.
+    """
+    return _table(k)[1]
+
+
+#==============================================================================================
+
+def _small_counts(A):
+    """
+    Function to count the induced 3-node and 4-node connected graphlets in closed form, from the degrees, the triangles and the
+    common neighbors of the nodes. Non-induced counts of each pattern are computed first, then converted into induced counts
+    with the number of copies of each pattern inside each larger graphlet.
+    Args:
+        A (np.ndarray): a (N, N) boolean adjacency matrix.
+    Returns:
+        tuple(np.ndarray, np.ndarray): the (2,) 3-node counts and the (6,) 4-node counts.
+    """
+    A = np.asarray(A, dtype=bool)
+    F = A.astype(np.float64)
+    d = F.sum(axis=1)
+    common = F @ F # Number of common neighbors of each pair
+    tri = (common * F).sum(axis=1) / 2 # Triangles through each node
+    triangles = tri.sum() / 3
+    wedges = (d*(d-1)/2).sum()
+    off_diag = ~np.eye(len(A), dtype=bool)
+    u, v = np.nonzero(np.triu(A, k=1))
+    # Non-induced counts of the 4-node patterns
+    star = (d*(d-1)*(d-2)/6).sum()
+    path = ((d[u]-1)*(d[v]-1)).sum() - 3*triangles
+    paw = (tri*(d-2)).sum()
+    cycle = (common*(common-1)/2)[off_diag].sum() / 4
+    diamond = (common[u, v]*(common[u, v]-1)/2).sum()
+    clique = 0
+    for a, b in zip(u[common[u, v] >= 2], v[common[u, v] >= 2]): # Edges between the common neighbors of each edge
+        idx = np.flatnonzero(A[a] & A[b])
+        clique += np.count_nonzero(A[np.ix_(idx, idx)]) / 2
+    clique /= 6
+    # Induced counts
+    diamond -= 6*clique
+    cycle -= diamond + 3*clique
+    paw -= 4*diamond + 12*clique
+    path -= 2*paw + 4*cycle + 6*diamond + 12*clique
+    star -= paw + 2*diamond + 4*clique
+    three = np.array([wedges - 3*triangles, triangles])
+    four = np.array([star, path, paw, cycle, diamond, clique])
+    return np.rint(three).astype(np.int64), np.rint(four).astype(np.int64)
+
+def _partitions(items):
+    """
+    Function to list all the partitions of a set (52 for 5 elements).
+    Args:
+        items (list(int)): the elements.
+    Returns:
+        generator: the partitions, as lists of blocks.
+    """
+    if not items:
+        yield []
+        return
+    first, rest = items[0], items[1:]
+    for partition in _partitions(rest):
+        yield [[first]] + partition
+        for i in range(len(partition)):
+            yield partition[:i] + [[first] + partition[i]] + partition[i+1:]
+
+def _elimination_order(k, edges):
+    """
+    Function to find an order in which to sum out the nodes of a pattern so that the largest intermediate array is as small as
+    possible (its number of dimensions is the treewidth of the pattern). All the orders are tried once per pattern, which is cheap
+    for k <= 5.
+    Args:
+        k (int): the number of nodes of the pattern.
+        edges (list(tuple)): the edges of the pattern.
+    Returns:
+        tuple(tuple, int): the elimination order and the treewidth.
+    """
+    key = ('order', k, tuple(edges))
+    if key in _tables:
+        return _tables[key]
+    best, width = None, k
+    for order in permutations(range(k)):
+        adj = {v: set() for v in range(k)}
+        for a, b in edges:
+            adj[a].add(b)
+            adj[b].add(a)
+        w = 0
+        for v in order: # Summing out v links all its remaining neighbors together
+            w = max(w, len(adj[v]))
+            for x in adj[v]:
+                adj[x] |= adj[v] - {x}
+                adj[x].discard(v)
+            del adj[v]
+        if w < width:
+            best, width = order, w
+    _tables[key] = best, width
+    return best, width
+
+def _hom(k, edges, A, domains=None):
+    """
+    Function to count the homomorphisms of a pattern into a graph, i.e. the maps from the nodes of the pattern to the
+    nodes of the graph that send every edge onto an edge (distinct pattern nodes may share a graph node).
+    Patterns of treewidth 2 or less are summed out node by node with matrix products, in O(N^3) time and O(N^2) memory.
+    For denser patterns, the image i of a node v of highest degree is fixed in turn, and the rest of the pattern is counted with
+    the neighbors of v restricted to the neighbors of i, which removes one dimension from the largest intermediate array.
+    Args:
+        k (int): the number of nodes of the pattern.
+        edges (list(tuple)): the edges of the pattern.
+        A (np.ndarray): the (N, N) adjacency matrix of the graph, as floats, with a zero diagonal.
+        domains (list(np.ndarray), optional): the graph nodes allowed for each pattern node. Defaults to None (all the nodes).
+    Returns:
+        float: the number of homomorphisms.
+    """
+    if domains is None:
+        domains = [np.arange(len(A))]*k
+    if not edges:
+        return float(np.prod([len(d) for d in domains]))
+    order, width = _elimination_order(k, edges)
+    if width > 2:
+        degree = np.bincount(np.ravel(edges), minlength=k)
+        v = int(degree.argmax())
+        linked = {b if a == v else a for a, b in edges if v in (a, b)}
+        rest = [(a - (a > v), b - (b > v)) for a, b in edges if v not in (a, b)]
+        total = 0.0
+        for i in domains[v]:
+            sub = [d[A[i, d] > 0] if u in linked else d for u, d in enumerate(domains) if u != v]
+            if all(len(d) for d in sub):
+                total += _hom(k-1, rest, A, sub)
+        return total
+    letters = 'abcde'
+    factors = [((a, b), A[np.ix_(domains[a], domains[b])]) for a, b in edges]
+    total = 1.0
+    for v in order:
+        involved = [f for f in factors if v in f[0]]
+        factors = [f for f in factors if v not in f[0]]
+        if not involved: # Isolated node, mapped anywhere in its domain
+            total *= len(domains[v])
+            continue
+        dims = sorted(set().union(*(f[0] for f in involved)) - {v})
+        subscripts = ','.join(''.join(letters[x] for x in f[0]) for f in involved) + '->' + ''.join(letters[x] for x in dims)
+        new = np.einsum(subscripts, *(f[1] for f in involved), optimize=True)
+        if dims:
+            factors.append((tuple(dims), new))
+        else:
+            total *= float(new)
+    return total
+
+def _five_node_system():
+    """
+    Function to build, once, the linear relations between homomorphism counts and induced 5-node graphlet counts:
+        - the injective maps of a pattern H are obtained from the homomorphisms of its quotients H/P, for all the partitions P of
+          its nodes into independent blocks (Moebius inversion on the partition lattice, with coefficient prod((-1)^(|B|-1) (|B|-1)!)),
+        - the number of (not necessarily induced) copies of H is the number of injective maps divided by the automorphisms of H,
+        - the copies of H are found in every 5-node graphlet containing H as a spanning subgraph.
+    Returns:
+        tuple(list, np.ndarray): for each 5-node graphlet H, the (coefficient, (size, class)) terms of its number of copies, and the
+        (21, 21) matrix of the number of copies of each graphlet H (column) inside each graphlet G (row).
+    """
+    if 'system' in _tables:
+        return _tables['system']
+    k = 5
+    lookup, classes = _table(k)
+    pair_bits = {p: b for b, p in enumerate(combinations(range(k), 2))}
+    terms, overlap = [], np.zeros((len(classes), len(classes)))
+    for h, edges in enumerate(classes):
+        coefs = {}
+        for partition in _partitions(list(range(k))):
+            block = {v: i for i, B in enumerate(partition) for v in B}
+            if any(block[a] == block[b] for a, b in edges):
+                continue
+            m = len(partition)
+            quotient = {tuple(sorted((block[a], block[b]))) for a, b in edges}
+            sub_lookup, _ = _table(m)
+            sub_bits = {p: b for b, p in enumerate(combinations(range(m), 2))}
+            key = (m, int(sub_lookup[sum(1 << sub_bits[e] for e in quotient)]))
+            mu = np.prod([(-1)**(len(B)-1) * factorial(len(B)-1) for B in partition])
+            coefs[key] = coefs.get(key, 0) + mu
+        edge_set = {tuple(e) for e in edges}
+        automorphisms = sum(1 for p in permutations(range(k)) if {tuple(sorted((p[a], p[b]))) for a, b in edges} == edge_set)
+        terms.append([(c / automorphisms, key) for key, c in coefs.items() if c])
+        for subset in range(1 << len(edges)): # Spanning subgraphs of graphlet h
+            code = sum(1 << pair_bits[e] for j, e in enumerate(edges) if subset >> j & 1)
+            if lookup[code] >= 0:
+                overlap[h, lookup[code]] += 1
+    _tables['system'] = terms, overlap
+    return _tables['system']
+
+def _five_node_counts(A):
+    """
+    Function to count the induced connected 5-node graphlets without enumerating node sets: the homomorphism counts of the
+    connected patterns of at most 5 nodes are converted into induced counts (see help(_five_node_system) and help(_hom)).
+    The memory is O(N^2) for every pattern. The time is O(N^3) for the patterns of treewidth 2 or less, and at most
+    O(N * sum of d_i^2), with d_i the degree of node i, for the denser ones (e.g. K4 with one subdivided edge), so about
+    O(N^4) on a complete graph. The counts are exact as long as they fit in a float64 mantissa (N^5 < 2^53, i.e. up to about
+    1500 nodes).
+    Args:
+        A (np.ndarray): a (N, N) boolean adjacency matrix.
+    Returns:
+        np.ndarray: the count of each graphlet, in the order of graphlet_edges(5).
+    """
+    terms, overlap = _five_node_system()
+    F = np.asarray(A, dtype=np.float64)
+    np.fill_diagonal(F, 0)
+    hom = {}
+    copies = np.zeros(len(terms))
+    for h, h_terms in enumerate(terms):
+        for c, (m, cls) in h_terms:
+            if (m, cls) not in hom:
+                hom[(m, cls)] = _hom(m, graphlet_edges(m)[cls], F)
+            copies[h] += c*hom[(m, cls)]
+    return np.rint(np.linalg.solve(overlap.T, copies)).astype(np.int64)
+
+def count_graphlets(adjacency, sizes=(3, 4, 5)):
+    """
+    Function to count the induced connected graphlets of a snapshot, without enumerating node sets. The 3-node and 4-node graphlets
+    are counted in closed form (see help(_small_counts)), the 5-node ones from homomorphism counts (see help(_five_node_counts)).
+    Args:
+        adjacency (np.ndarray): a (N, N) boolean adjacency matrix.
+        sizes (list(int), optional): the graphlet sizes, among 3, 4 and 5. Defaults to (3, 4, 5).
+    Returns:
+        dict(int:np.ndarray): the counts of each size, in the order of GRAPHLETS and graphlet_edges.
+    """
+    unknown = set(sizes) - {3, 4, 5}
+    if unknown:
+        raise ValueError(f"Graphlet sizes must be among 3, 4 and 5, got {sorted(unknown)}")
+    A = np.asarray(adjacency, dtype=bool)
+    counts = {}
+    if 3 in sizes or 4 in sizes:
+        three, four = _small_counts(A)
+        counts.update({s: c for s, c in ((3, three), (4, four)) if s in sizes})
+    if 5 in sizes:
+        counts[5] = _five_node_counts(A)
+    return {s: counts[s] for s in sizes}
+
+def graphlet_distribution(counts):
+    """
+    Function to normalize graphlet counts into frequencies, per graphlet size.
+    Args:
+        counts (dict(int:np.ndarray)): the counts of each size, see help(count_graphlets). The arrays may hold one row per snapshot.
+    Returns:
+        dict(int:np.ndarray): the frequencies of each size, summing to 1 (0 where there is no graphlet).
+    """
+    out = {}
+    for s, c in counts.items():
+        c = np.asarray(c, dtype=float)
+        total = c.sum(axis=-1, keepdims=True)
+        out[s] = np.divide(c, total, out=np.zeros_like(c), where=total > 0)
+    return out
+
+def group_graphlets(adjacency, labels, sizes=(3, 4, 5)):
+    """
+    Function to count the graphlets of the subgraph induced by each group of a sampling (see help(sampling.forest_fire)).
+    Args:
+        adjacency (np.ndarray): the (N, N) boolean adjacency matrix of the whole swarm.
+        labels (np.ndarray): the (N,) group label of each node.
+        sizes (list(int), optional): the graphlet sizes, among 3, 4 and 5. Defaults to (3, 4, 5).
+    Returns:
+        dict(int:dict): the counts of each group, see help(count_graphlets).
+    """
+    A = np.asarray(adjacency, dtype=bool)
+    labels = np.asarray(labels)
+    out = {}
+    for g in np.unique(labels).tolist():
+        idx = np.flatnonzero(labels == g)
+        out[g] = count_graphlets(A[np.ix_(idx, idx)], sizes)
+    return out
+
+def batch_graphlets(adjacency_chunks, sizes=(3, 4, 5)):
+    """
+    Function to count the graphlets of a whole sequence of snapshots.
+    Args:
+        adjacency_chunks (iterable(np.ndarray)): (N, N) or (t, N, N) boolean adjacency matrices in time order, e.g. SwarmTrace.adjacency().
+        sizes (list(int), optional): the graphlet sizes, among 3, 4 and 5. Defaults to (3, 4, 5).
+    Returns:
+        dict(int:np.ndarray): the (T, K) counts of each size, one row per snapshot.
+    """
+    rows = {s: [] for s in sizes}
+    for chunk in adjacency_chunks:
+        chunk = np.asarray(chunk, dtype=bool)
+        if chunk.ndim == 2:
+            chunk = chunk[np.newaxis]
+        for A in chunk:
+            for s, c in count_graphlets(A, sizes).items():
+                rows[s].append(c)
+    return {s: np.stack(r) if r else np.empty((0, len(graphlet_edges(s))), dtype=np.int64) for s, r in rows.items()}
@@ -0,0 +1,97 @@
+import os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from swarm_sim import SwarmTrace
+
+
+_shared = {} # Worker state: the trace attached to the shared memory block, see _init_worker
+
+
+#==============================================================================================
+
+def _init_worker(name, shape, dtype, timestamps, node_ids, connection_range):
+    """
+    Function to attach a worker process to the shared positions of the trace.
+    Args:
+        name (str): the name of the shared memory block.
+        shape (tuple): the (T, N, 3) shape of the positions.
+        dtype (str): the data type of the positions.
+        timestamps (np.ndarray): the timestamp labels of the trace.
+        node_ids (np.ndarray): the node IDs of the trace.
+        connection_range (int): the connection range of the swarm.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    positions = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _shared['shm'] = shm # Keep a reference, the array is only valid while the block is open
+    _shared['trace'] = SwarmTrace(positions, timestamps, node_ids, connection_range)
+
+def _run_shard(bounds, metrics, neighbors, trace=None):
+    """
+    Function to evaluate the metrics on every timestamp of a contiguous shard of the trace.
+    Args:
+        bounds (tuple(int, int)): the first and after-last timestamp indices of the shard.
+        metrics (dict(str:callable)): the metric functions, each called with a Swarm object.
+        neighbors (bool): if True, neighbor discovery is performed before the metrics are evaluated.
+        trace (SwarmTrace, optional): the trace to use. Defaults to None (the shared trace of the worker).
+    Returns:
+        dict(str:list): the list of results of each metric, in time order.
+    """
+    if trace is None:
+        trace = _shared['trace']
+    results = {name: [] for name in metrics}
+    for t in range(*bounds):
+        swarm = trace.swarm(t)
+        if neighbors:
+            swarm.compute_neighbors()
+        for name, f in metrics.items():
+            results[name].append(f(swarm))
+    return results
+
+def run_parallel(trace:SwarmTrace, metrics, start=0, stop=None, workers=None, shards=None, neighbors=True):
+    """
+    Function to evaluate per-timestamp metrics over a time window of a trace with a pool of worker processes.
+    The time axis is split into contiguous shards, and the positions are shared with the workers through a shared memory block
+    instead of pickling Swarm objects. Each worker builds the Swarm of its timestamps on its own.
+    The metric functions must be picklable, e.g. Swarm methods (Swarm.degree, Swarm.cluster_coef) or module-level functions
+    taking a Swarm object; lambdas and functions defined in a notebook are not.
+    Args:
+        trace (SwarmTrace): the trace to analyse.
+        metrics (dict(str:callable) or list(callable)): the metric functions, each called with the Swarm of a timestamp.
+        start (int, optional): the first timestamp index. Defaults to 0.
+        stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        workers (int, optional): the number of worker processes. Defaults to None (number of CPUs). 1 runs in the current process.
+        shards (int, optional): the number of shards of the time axis. Defaults to None (4 per worker, for load balancing).
+        neighbors (bool, optional): if True, neighbor discovery is performed before the metrics are evaluated. Defaults to True.
+    Returns:
+        dict(str:list): the list of results of each metric, in time order.
+    """
+    if not isinstance(metrics, dict):
+        metrics = {f.__name__: f for f in metrics}
+    trace = trace.window(start, stop) # Only the time window is shared with the workers
+    workers = workers or os.cpu_count() or 1
+    shards = max(1, min(shards or 4*workers, len(trace)))
+    cuts = np.linspace(0, len(trace), shards+1).astype(int)
+    bounds = [(a, b) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+    results = {name: [] for name in metrics}
+    if workers == 1:
+        parts = [_run_shard(b, metrics, neighbors, trace) for b in bounds]
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(trace.positions.nbytes, 1))
+        positions = None
+        try:
+            positions = np.ndarray(trace.positions.shape, dtype=trace.positions.dtype, buffer=shm.buf)
+            positions[:] = trace.positions
+            init_args = (shm.name, positions.shape, positions.dtype.str, trace.timestamps, trace.node_ids, trace.connection_range)
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args) as pool:
+                parts = list(pool.map(_run_shard, bounds, [metrics]*len(bounds), [neighbors]*len(bounds))) # Results in shard order
+        finally:
+            positions = None # Release the view on the buffer, or close() raises BufferError and hides any exception
+            shm.close()
+            shm.unlink()
+    for part in parts:
+        for name in metrics:
+            results[name].extend(part[name])
+    return results
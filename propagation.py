@@ -0,0 +1,215 @@
+import numpy as np
+
+
+PROTOCOLS = ('epidemic', 'gossip', 'spray_and_wait')
+
+
+#==============================================================================================
+
+class Propagation:
+    """
+    Propagation object, simulating the store-carry-forward propagation of a batch of messages over a sequence of snapshots.
+    The state of every (message, node) couple is held in a (M, N) array, with the convention of Swarm.plot:
+        0: the node has no message
+        1: the node carries the message
+        -1: the node carries the message and has transmitted it
+    At each step, the messages travel at most one hop over the links of the current snapshot.
+    """
+
+    def __init__(self, nb_nodes, sources, destinations=None, starts=0, protocol='epidemic', p=0.5, copies=8, rng=None):
+        """
+        Propagation object constructor
+
+        Args:
+            nb_nodes (int): the number of nodes N.
+            sources (list(int)): the source node index of each message (M messages).
+            destinations (list(int), optional): the destination node index of each message. Defaults to None (no destination,
+                the message floods the swarm).
+            starts (int or list(int), optional): the step at which each message is created. Defaults to 0.
+            protocol (str, optional): 'epidemic' (flooding to all neighbors), 'gossip' (forwarding to each neighbor with
+                probability p) or 'spray_and_wait' (binary spray of a limited number of copies). Defaults to 'epidemic'.
+            p (float, optional): the forwarding probability of the gossip protocol. Defaults to 0.5.
+            copies (int, optional): the initial number of copies of the spray-and-wait protocol. Defaults to 8.
+            rng (np.random.Generator or int, optional): the random generator, or a seed. Defaults to None.
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol {protocol!r}, expected one of {PROTOCOLS}")
+        self.nb_nodes = int(nb_nodes)
+        self.sources = np.atleast_1d(np.asarray(sources, dtype=np.int64))
+        M = len(self.sources)
+        self.destinations = None if destinations is None else np.broadcast_to(np.asarray(destinations, dtype=np.int64), (M,)).copy()
+        self.starts = np.broadcast_to(np.asarray(starts, dtype=np.int64), (M,)).copy()
+        self.protocol = protocol
+        self.p = float(p)
+        self.rng = np.random.default_rng(rng)
+        self.step = 0 # Index of the next step
+        self.states = np.zeros((M, self.nb_nodes), dtype=np.int8)
+        self.arrival = np.full((M, self.nb_nodes), -1, dtype=np.int64) # First step at which each node holds each message, -1 if never
+        self.copies = np.zeros((M, self.nb_nodes), dtype=np.int64) # Copies held (spray-and-wait only)
+        self._initial_copies = int(copies)
+
+    def __str__(self):
+        """
+        Propagation object descriptor
+
+        Returns:
+            str: the string description of the simulation
+        """
+        M = len(self.sources)
+        return f"{self.protocol} propagation of {M} message(s) over {self.nb_nodes} node(s), {self.step} step(s) simulated"
+
+    #*************** Simulation ***************
+    def update(self, adjacency):
+        """
+        Function to simulate one step over the links of a snapshot.
+        Args:
+            adjacency (np.ndarray): the (N, N) boolean adjacency matrix of the step.
+        Returns:
+            np.ndarray: the (M, N) states after the step.
+        """
+        t = self.step
+        new = np.flatnonzero(self.starts == t) # Messages created at this step
+        self.states[new, self.sources[new]] = 1
+        self.arrival[new, self.sources[new]] = t
+        self.copies[new, self.sources[new]] = self._initial_copies
+        A = np.asarray(adjacency, dtype=bool)
+        has = self.states != 0
+        if self.protocol == 'spray_and_wait':
+            received, senders = self._spray(A, has)
+        elif self.protocol == 'epidemic':
+            carriers = np.matmul(has.astype(np.float32), A.astype(np.float32)) # Number of carrier neighbors
+            received = (carriers > 0) & ~has
+            senders = has & (np.matmul(received.astype(np.float32), A.astype(np.float32)) > 0)
+        else: # Independent trials on each link from a carrier to a node without the message
+            s, r = np.nonzero(A)
+            success = has[:, s] & ~has[:, r] & (self.rng.random((len(has), len(s))) < self.p) # (M, E)
+            received = np.zeros_like(has)
+            senders = np.zeros_like(has)
+            m, e = np.nonzero(success)
+            received[m, r[e]] = True
+            senders[m, s[e]] = True # Only the carriers whose trial succeeded have transmitted
+        self.states[senders] = -1
+        self.states[received] = 1
+        self.arrival[received] = t + 1 # Held from the next step on
+        self.step += 1
+        return self.states
+
+    def _spray(self, A, has):
+        """
+        Function to perform one step of binary spray-and-wait: every node holding more than one copy hands half of its copies
+        to one of its neighbors without the message, and a carrier next to the destination hands it one of its copies directly.
+        The total number of copies of a message never grows, and the destination does not forward the message.
+        Args:
+            A (np.ndarray): the (N, N) boolean adjacency matrix of the step.
+            has (np.ndarray): the (M, N) mask of the nodes carrying each message.
+        Returns:
+            tuple(np.ndarray, np.ndarray): the (M, N) masks of the receiving and sending nodes.
+        """
+        M, N = has.shape
+        received = np.zeros((M, N), dtype=bool)
+        senders = np.zeros((M, N), dtype=bool)
+        spraying = has & (self.copies > 1)
+        if self.destinations is not None: # The destination keeps the message
+            spraying[np.arange(M), self.destinations] = False
+        m, s = np.nonzero(spraying)
+        if len(m): # Each spraying node picks one random neighbor without the message
+            priority = np.where(A[s] & ~has[m], self.rng.random((len(m), N)), -1)
+            r = priority.argmax(axis=1)
+            keep = priority[np.arange(len(m)), r] >= 0
+            m, s, r = m[keep], s[keep], r[keep]
+            shuffle = self.rng.permutation(len(m)) # One sender per receiver, chosen at random
+            _, first = np.unique((m*N + r)[shuffle], return_index=True)
+            m, s, r = m[shuffle[first]], s[shuffle[first]], r[shuffle[first]]
+            given = self.copies[m, s] // 2
+            self.copies[m, s] -= given
+            self.copies[m, r] = given
+            received[m, r] = True
+            senders[m, s] = True
+        if self.destinations is not None: # Direct delivery by one carrier, whatever its number of copies
+            dest = self.destinations
+            m = np.flatnonzero(~has[np.arange(M), dest] & ~received[np.arange(M), dest])
+            near = has[m] & A[dest[m]] & (self.copies[m] > 0)
+            priority = np.where(near, self.rng.random(near.shape), -1)
+            c = priority.argmax(axis=1) # Random carrier next to the destination
+            delivered = near.any(axis=1)
+            m, c = m[delivered], c[delivered]
+            self.copies[m, c] -= 1 # The copy moves to the destination
+            self.copies[m, dest[m]] = 1
+            received[m, dest[m]] = True
+            senders[m, c] = True
+        return received, senders
+
+    #*************** Metrics ***************
+    def coverage(self):
+        """
+        Function to compute the ratio of nodes reached by each message so far.
+        Returns:
+            np.ndarray: the (M,) coverage ratios between 0 and 1.
+        """
+        return (self.states != 0).mean(axis=1)
+
+    def latency(self, dt=1.0):
+        """
+        Function to compute the delivery latency of each message, from its creation to its arrival at its destination.
+        Args:
+            dt (float, optional): the duration of a step. Defaults to 1.0.
+        Returns:
+            np.ndarray: the (M,) latencies, NaN for messages not delivered (or without destination).
+        """
+        M = len(self.sources)
+        if self.destinations is None:
+            return np.full(M, np.nan)
+        arrival = self.arrival[np.arange(M), self.destinations].astype(float)
+        arrival[arrival < 0] = np.nan
+        return (arrival - self.starts)*dt
+
+    def latency_stats(self, dt=1.0):
+        """
+        Function to summarize the delivery latencies (see help(Propagation.latency)).
+        Args:
+            dt (float, optional): the duration of a step. Defaults to 1.0.
+        Returns:
+            dict(str:float): the delivery ratio and the mean, median, 95th percentile and maximum latency of the delivered messages.
+        """
+        lat = self.latency(dt)
+        done = lat[~np.isnan(lat)]
+        stats = {'delivery_ratio': len(done) / len(lat) if len(lat) else 0.0}
+        for key, f in (('mean', np.mean), ('median', np.median), ('p95', lambda x: np.percentile(x, 95)), ('max', np.max)):
+            stats[key] = float(f(done)) if len(done) else np.nan
+        return stats
+
+
+#==============================================================================================
+
+def simulate(adjacency_chunks, sources, destinations=None, starts=0, protocol='epidemic', p=0.5, copies=8, rng=None, record=False):
+    """
+    Function to run a propagation over a whole sequence of snapshots (see help(Propagation)).
+    Args:
+        adjacency_chunks (iterable(np.ndarray)): (N, N) or (t, N, N) boolean adjacency matrices in time order, e.g. SwarmTrace.adjacency().
+        sources (list(int)): the source node index of each message.
+        destinations (list(int), optional): the destination node index of each message. Defaults to None.
+        starts (int or list(int), optional): the step at which each message is created. Defaults to 0.
+        protocol (str, optional): 'epidemic', 'gossip' or 'spray_and_wait'. Defaults to 'epidemic'.
+        p (float, optional): the forwarding probability of the gossip protocol. Defaults to 0.5.
+        copies (int, optional): the initial number of copies of the spray-and-wait protocol. Defaults to 8.
+        rng (np.random.Generator or int, optional): the random generator, or a seed. Defaults to None.
+        record (bool, optional): if True, the states of every step are kept. Defaults to False.
+    Returns:
+        tuple(Propagation, np.ndarray): the simulation after the last step, and the (T, M, N) states of every step if recorded
+        (else None).
+    """
+    sim = None
+    history = [] if record else None
+    for chunk in adjacency_chunks:
+        chunk = np.asarray(chunk, dtype=bool)
+        if chunk.ndim == 2:
+            chunk = chunk[np.newaxis]
+        if sim is None:
+            sim = Propagation(chunk.shape[-1], sources, destinations, starts, protocol, p, copies, rng)
+        for A in chunk:
+            states = sim.update(A)
+            if record:
+                history.append(states.copy())
+    if record:
+        history = np.stack(history) if history else np.empty((0, len(np.atleast_1d(sources)), 0), dtype=np.int8)
+    return sim, history
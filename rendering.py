@@ -0,0 +1,203 @@
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+
+from matplotlib import animation
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+from graph_metrics import ComponentTracker
+
+
+STATE_COLORS = np.array(['blue', 'red', 'green']) # Indexed by node state 0, 1 and -1, as in Swarm.plot
+
+
+#==============================================================================================
+
+def state_colors(states):
+    """
+    Function to map propagation states to colors, with the convention of Swarm.plot:
+        blue: the node has no message (state 0)
+        red: the node carries the message (state 1)
+        green: the node has transmitted its message (state -1)
+    Args:
+        states (np.ndarray): the (N,) node states.
+    Returns:
+        np.ndarray: the (N,) color names.
+    """
+    return STATE_COLORS[np.asarray(states, dtype=np.int64)]
+
+def label_colors(labels, cmap='tab20'):
+    """
+    Function to map group or component labels to colors, the same label always getting the same color.
+    Args:
+        labels (np.ndarray): the (N,) integer labels.
+        cmap (str, optional): the name of a qualitative matplotlib colormap. Defaults to 'tab20'.
+    Returns:
+        np.ndarray: the (N, 4) RGBA colors.
+    """
+    colormap = plt.get_cmap(cmap)
+    return colormap(np.asarray(labels, dtype=np.int64) % colormap.N)
+
+def _carry_labels(labels, prev_labels, prev_colors):
+    """
+    Function to keep the color labels of the components from one frame to the next: each new component takes the color label of
+    the previous component it shares the most nodes with, unless a larger overlap already took it (after a split, the largest part
+    keeps the color). The other components get unused color labels.
+    Args:
+        labels (np.ndarray): the (N,) component labels of this frame.
+        prev_labels (np.ndarray): the (N,) component labels of the previous frame.
+        prev_colors (np.ndarray): the (N,) color labels of the previous frame.
+    Returns:
+        np.ndarray: the (N,) color labels of this frame.
+    """
+    overlap, counts = np.unique(np.stack((prev_labels, labels), axis=1), axis=0, return_counts=True) # (previous, new) components sharing nodes
+    comp, first = np.unique(prev_labels, return_index=True)
+    color_of = dict(zip(comp.tolist(), prev_colors[first].tolist()))
+    mapping, taken = {}, set()
+    for p, c in overlap[np.argsort(-counts, kind='stable')].tolist(): # Largest overlaps first
+        if c not in mapping and color_of[p] not in taken:
+            mapping[c] = color_of[p]
+            taken.add(color_of[p])
+    fresh = int(prev_colors.max()) + 1 if len(prev_colors) else 0
+    lookup = np.empty(labels.max() + 1 if len(labels) else 0, dtype=np.int64)
+    for c in np.unique(labels).tolist():
+        if c not in mapping:
+            mapping[c] = fresh
+            fresh += 1
+        lookup[c] = mapping[c]
+    return lookup[labels]
+
+
+#==============================================================================================
+
+class SwarmRenderer:
+    """
+    SwarmRenderer object, drawing a swarm in 3D with one artist for all the nodes and one Line3DCollection for all the edges.
+    The artists are created once and updated in place from one frame to the next (see help(SwarmRenderer.update)), so that
+    redrawing a dense swarm or animating a trace does not create new figures or artists.
+    """
+
+    def __init__(self, positions, pairs=None, colors='blue', e_color='gray', size=50, ax=None, figsize=(8,8), follow=True):
+        """
+        SwarmRenderer object constructor
+
+        Args:
+            positions (np.ndarray): the (N, 3) array of node coordinates of the first frame.
+            pairs (np.ndarray, optional): the (M, 2) node index pairs to draw as edges. Defaults to None (no edge).
+            colors (str or np.ndarray, optional): a color, or the (N,) colors of the nodes. Defaults to 'blue'.
+            e_color (str, optional): the color of the edges. Defaults to 'gray'.
+            size (float, optional): the size of the nodes. Defaults to 50.
+            ax (Axes3D, optional): the 3D axes to draw on. Defaults to None (a new figure is created).
+            figsize (tuple, optional): the size of the new figure. Defaults to (8,8).
+            follow (bool, optional): if True, the axes limits follow the swarm at each frame. Defaults to True.
+        """
+        if ax is None:
+            fig = plt.figure(figsize=figsize)
+            ax = fig.add_subplot(projection='3d')
+        self.ax = ax
+        self.fig = ax.figure
+        self.follow = follow
+        pos = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.edges = Line3DCollection(np.empty((0, 2, 3)), colors=e_color, linewidths=0.8)
+        ax.add_collection3d(self.edges, autolim=False)
+        self.nodes = ax.scatter(pos[:, 0], pos[:, 1], pos[:, 2], c=colors, s=size, depthshade=False)
+        self.update(pos, pairs, colors)
+
+    def update(self, positions, pairs=None, colors=None, title=None):
+        """
+        Function to move the nodes and the edges to a new frame, in place.
+        Args:
+            positions (np.ndarray): the (N, 3) array of node coordinates.
+            pairs (np.ndarray, optional): the (M, 2) node index pairs to draw as edges. Defaults to None (no edge).
+            colors (str or np.ndarray, optional): a color, or the (N,) colors of the nodes. Defaults to None (unchanged).
+            title (str, optional): the title of the axes. Defaults to None (unchanged).
+        Returns:
+            tuple: the updated artists.
+        """
+        pos = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.nodes._offsets3d = (pos[:, 0], pos[:, 1], pos[:, 2])
+        if colors is not None:
+            self.nodes.set_color(colors)
+        pairs = np.empty((0, 2), dtype=np.int64) if pairs is None else np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        self.edges.set_segments(pos[pairs]) # (M, 2, 3) segments
+        if title is not None:
+            self.ax.set_title(title)
+        if self.follow and len(pos):
+            low, high = pos.min(axis=0), pos.max(axis=0)
+            margin = 0.05*(high - low).max() + 1e-9
+            self.ax.set_xlim(low[0] - margin, high[0] + margin)
+            self.ax.set_ylim(low[1] - margin, high[1] + margin)
+            self.ax.set_zlim(low[2] - margin, high[2] + margin)
+        return self.nodes, self.edges
+
+
+#==============================================================================================
+
+def _writer(path, fps):
+    """
+    Function to choose an animation writer from the file extension. ffmpeg is used when available; GIF files fall back on Pillow.
+    Args:
+        path (str): the output file.
+        fps (int): the number of frames per second.
+    Returns:
+        animation.AbstractMovieWriter: the writer.
+    """
+    if animation.writers.is_available('ffmpeg'):
+        return animation.FFMpegWriter(fps=fps)
+    if os.path.splitext(path)[1].lower() == '.gif':
+        return animation.PillowWriter(fps=fps)
+    raise RuntimeError(f"No animation writer available for {path!r}: install ffmpeg, or use a .gif file")
+
+def animate_trace(trace, path, start=0, stop=None, connection_range=None, colors='components', skin=None, fps=10, dpi=100,
+                  writer=None, edges=True, figsize=(8,8)):
+    """
+    Function to render a time window of a trace into a video or GIF file. The frames are drawn by a single SwarmRenderer and
+    written one at a time, so no figure is kept per frame. The edges follow the neighbor pairs maintained incrementally
+    (see help(SwarmTrace.neighbor_pairs)).
+    Args:
+        trace (SwarmTrace): the trace of the swarm.
+        path (str): the output file, e.g. 'swarm.mp4' or 'swarm.gif'.
+        start (int, optional): the first timestamp index. Defaults to 0.
+        stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+        colors (str or np.ndarray, optional): 'components' to color the nodes by connected component (a component keeps its
+            color from one frame to the next, see help(_carry_labels)), a (T, N) array of propagation states (e.g. one message of the history of
+            propagation.simulate), or a single color. Defaults to 'components'.
+        skin (float, optional): the extra distance for the candidate pairs. Defaults to None (10% of the connection range).
+        fps (int, optional): the number of frames per second. Defaults to 10.
+        dpi (int, optional): the resolution of the frames. Defaults to 100.
+        writer (animation.AbstractMovieWriter, optional): the writer. Defaults to None (chosen from the file extension).
+        edges (bool, optional): if False, only the nodes are drawn. Defaults to True.
+        figsize (tuple, optional): the size of the figure. Defaults to (8,8).
+    """
+    start, stop, _ = slice(start, stop).indices(len(trace))
+    N = trace.positions.shape[1]
+    by_component = isinstance(colors, str) and colors == 'components'
+    states = None if isinstance(colors, str) else np.asarray(colors)
+    if states is not None and len(states) != stop - start:
+        raise ValueError(f"colors must hold the states of the {stop - start} frame(s), got {len(states)}")
+    tracker = ComponentTracker(N) if by_component else None
+    prev_labels = color_labels = None
+    writer = writer or _writer(path, fps)
+    renderer = None
+    with writer.saving(plt.figure(figsize=figsize), path, dpi):
+        ax = writer.fig.add_subplot(projection='3d')
+        for k, pairs in enumerate(trace.neighbor_pairs(connection_range, skin, start, stop)):
+            if by_component:
+                labels = tracker.update(pairs)
+                color_labels = labels if prev_labels is None else _carry_labels(labels, prev_labels, color_labels)
+                prev_labels = labels
+                frame_colors = label_colors(color_labels)
+            elif states is not None:
+                frame_colors = state_colors(states[k])
+            else:
+                frame_colors = colors
+            pos = trace.positions[start + k]
+            title = f"Swarm at time {trace.timestamps[start + k]}"
+            if renderer is None:
+                renderer = SwarmRenderer(pos, pairs if edges else None, frame_colors, ax=ax)
+                renderer.ax.set_title(title)
+            else:
+                renderer.update(pos, pairs if edges else None, frame_colors, title)
+            writer.grab_frame()
+    plt.close(writer.fig)
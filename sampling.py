@@ -0,0 +1,188 @@
+import numpy as np
+
+
+#==============================================================================================
+
+class _FreeNodes:
+    """
+    Set of unassigned nodes supporting O(1) removal and O(k) uniform sampling, kept as a packed array of nodes with the
+    position of each node in it (removal swaps the node with the last one).
+    """
+
+    def __init__(self, n):
+        """
+        Args:
+            n (int): the number of nodes, all free at first.
+        """
+        self.items = np.arange(n) # Free nodes first, in arbitrary order
+        self.pos = np.arange(n) # Position of each node in items
+        self.mask = np.ones(n, dtype=bool) # True if the node is free
+        self.size = n
+
+    def remove(self, nodes):
+        """
+        Function to remove free nodes from the set, in O(1) per node.
+        Args:
+            nodes (np.ndarray): the nodes to remove, all free.
+        """
+        items, pos = self.items, self.pos
+        for v in np.asarray(nodes).tolist():
+            i, last = pos[v], self.size-1
+            w = items[last]
+            items[i], items[last] = w, v
+            pos[w], pos[v] = i, last
+            self.size = last
+        self.mask[nodes] = False
+
+    def sample(self, k, rng):
+        """
+        Function to draw distinct free nodes uniformly at random.
+        Args:
+            k (int): the number of nodes to draw (at most the number of free nodes).
+            rng (np.random.Generator): the random generator.
+        Returns:
+            np.ndarray: the drawn nodes.
+        """
+        k = min(k, self.size)
+        return self.items[rng.choice(self.size, k, replace=False)] if k else np.empty(0, dtype=np.int64)
+
+
+def _gather(indptr, indices, nodes):
+    """
+    Function to gather the neighbors of several nodes from a CSR adjacency.
+    Args:
+        indptr (np.ndarray): the CSR index pointers.
+        indices (np.ndarray): the CSR neighbor indices.
+        nodes (np.ndarray): the nodes whose neighbors are gathered.
+    Returns:
+        tuple(np.ndarray, np.ndarray): the position of the source node in nodes and the neighbor, for every edge.
+    """
+    deg = indptr[nodes+1] - indptr[nodes]
+    owner = np.repeat(np.arange(len(nodes)), deg)
+    offsets = np.arange(deg.sum()) - np.repeat(np.cumsum(deg) - deg, deg)
+    return owner, indices[indptr[nodes][owner] + offsets]
+
+def _first_claim(owner, nodes, rng):
+    """
+    Function to resolve the conflicts when several owners claim the same node: each node goes to one owner chosen at random.
+    Args:
+        owner (np.ndarray): the owner of each claim.
+        nodes (np.ndarray): the claimed node of each claim.
+        rng (np.random.Generator): the random generator.
+    Returns:
+        tuple(np.ndarray, np.ndarray): the owners and nodes of the granted claims.
+    """
+    shuffle = rng.permutation(len(nodes))
+    _, first = np.unique(nodes[shuffle], return_index=True)
+    keep = shuffle[first]
+    return owner[keep], nodes[keep]
+
+def generators(seed=None, runs=1):
+    """
+    Function to create independent random streams, one per run, from a single seed (see help(np.random.SeedSequence.spawn)).
+    Args:
+        seed (int, optional): the root seed. Defaults to None (fresh entropy).
+        runs (int, optional): the number of streams. Defaults to 1.
+    Returns:
+        list(np.random.Generator): the random generators.
+    """
+    return [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(runs)]
+
+
+#==============================================================================================
+
+def forest_fire(indptr, indices, n=10, p=0.7, rng=None):
+    """
+    Function to partition a graph with the Forest Fire algorithm.
+    In the initial phase, n nodes are selected as "fire sources". Then, at each round, every burning node burns each of its
+    unassigned neighbors with a probability of p, and the newly burned nodes burn at the next round. A burning node with no
+    unassigned neighbor performs a random jump to an unassigned node instead; a burning node whose trials all failed keeps burning.
+    All the burning nodes of a round are processed at once.
+    Args:
+        indptr (np.ndarray): the CSR index pointers of the adjacency (see help(Swarm.adjacency_csr)).
+        indices (np.ndarray): the CSR neighbor indices.
+        n (int, optional): the initial number of sources. Defaults to 10.
+        p (float, optional): the fire spreading probability, in ]0, 1]. Defaults to 0.7.
+        rng (np.random.Generator or int, optional): the random generator, or a seed. Defaults to None.
+    Returns:
+        np.ndarray: the group ID (0 to n-1) of each node.
+    """
+    if not 0 < p <= 1:
+        raise ValueError(f"p must be in ]0, 1], got {p}")
+    rng = np.random.default_rng(rng)
+    N = len(indptr) - 1
+    labels = np.full(N, -1, dtype=np.int64)
+    free = _FreeNodes(N)
+    burning = rng.choice(N, min(n, N), replace=False)
+    labels[burning] = np.arange(len(burning))
+    free.remove(burning)
+    while free.size:
+        owner, nbr = _gather(indptr, indices, burning)
+        is_free = free.mask[nbr]
+        owner, nbr = owner[is_free], nbr[is_free]
+        has_free = np.bincount(owner, minlength=len(burning)) > 0
+        success = rng.random(len(nbr)) < p
+        owner, nbr = _first_claim(owner[success], nbr[success], rng)
+        labels[nbr] = labels[burning[owner]]
+        free.remove(nbr)
+        stuck = burning[~has_free]
+        jumps = free.sample(len(stuck), rng) # Random jumps of the nodes without unassigned neighbors
+        labels[jumps] = labels[rng.permutation(stuck)[:len(jumps)]]
+        free.remove(jumps)
+        failed = np.ones(len(burning), dtype=bool)
+        failed[owner] = False
+        burning = np.concatenate((nbr, jumps, burning[failed & has_free]))
+    return labels
+
+def mdrw(indptr, indices, n=10, rng=None):
+    """
+    Function to partition a graph with the Multi-Dimensional Random Walk algorithm.
+    In the initial phase, n nodes are selected as sources. Then, at each round, every walk moves to one of the unassigned neighbors
+    of its current node, chosen uniformly at random, or performs a random jump to an unassigned node if there is none.
+    All the walks of a round are processed at once; a walk whose next node is taken by another walk retries at the next round.
+    Args:
+        indptr (np.ndarray): the CSR index pointers of the adjacency (see help(Swarm.adjacency_csr)).
+        indices (np.ndarray): the CSR neighbor indices.
+        n (int, optional): the initial number of sources. Defaults to 10.
+        rng (np.random.Generator or int, optional): the random generator, or a seed. Defaults to None.
+    Returns:
+        np.ndarray: the group ID (0 to n-1) of each node.
+    """
+    rng = np.random.default_rng(rng)
+    N = len(indptr) - 1
+    labels = np.full(N, -1, dtype=np.int64)
+    free = _FreeNodes(N)
+    current = rng.choice(N, min(n, N), replace=False) # Current node of each walk
+    labels[current] = np.arange(len(current))
+    free.remove(current)
+    while free.size:
+        owner, nbr = _gather(indptr, indices, current)
+        is_free = free.mask[nbr]
+        owner, nbr = owner[is_free], nbr[is_free]
+        counts = np.bincount(owner, minlength=len(current))
+        walking = np.flatnonzero(counts)
+        pick = (rng.random(len(walking)) * counts[walking]).astype(np.int64) # One free neighbor per walk
+        first = np.searchsorted(owner, walking)
+        walk_owner, walk_nbr = _first_claim(walking, nbr[first + pick], rng)
+        labels[walk_nbr] = walk_owner
+        free.remove(walk_nbr)
+        current[walk_owner] = walk_nbr
+        stuck = rng.permutation(np.flatnonzero(counts == 0))
+        jumps = free.sample(len(stuck), rng)
+        labels[jumps] = stuck[:len(jumps)]
+        free.remove(jumps)
+        current[stuck[:len(jumps)]] = jumps
+    return labels
+
+def rns(N, clist=range(10), rng=None):
+    """
+    Function to partition a graph with the Random Node Sampling algorithm: each node choses a random group ID from the list.
+    Args:
+        N (int): the number of nodes.
+        clist (list(int), optional): list of group IDs. Defaults to range(10).
+        rng (np.random.Generator or int, optional): the random generator, or a seed. Defaults to None.
+    Returns:
+        np.ndarray: the group ID of each node.
+    """
+    rng = np.random.default_rng(rng)
+    return np.asarray(clist, dtype=np.int64)[rng.integers(0, len(clist), N)]
@@ -0,0 +1,264 @@
+import numpy as np
+
+from itertools import product
+
+
+#==============================================================================================
+
+def pairwise_distances(positions):
+    """
+    Function to compute the Euclidean distances between all pairs of points at once.
+    Args:
+        positions (np.ndarray): the (N, 3) array of coordinates.
+    Returns:
+        np.ndarray: the (N, N) distance matrix, with zeros on the diagonal.
+    """
+    pos = np.asarray(positions, dtype=float).reshape(-1, 3)
+    diff = pos[:, np.newaxis, :] - pos[np.newaxis, :, :]
+    return np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+
+
+#==============================================================================================
+
+class SpatialGrid:
+    """
+    SpatialGrid object, a uniform grid of cubic cells used as a spatial index over node positions.
+    With a cell size equal to the connection range, all the neighbors of a node lie in its own cell or in one of the 26
+    adjacent cells, so range queries only inspect a few cells instead of the whole swarm.
+    """
+
+    def __init__(self, positions, cell_size):
+        """
+        SpatialGrid object constructor
+
+        Args:
+            positions (np.ndarray): the (N, 3) array of node coordinates.
+            cell_size (float): the edge length of a cell, usually the connection range.
+        """
+        if cell_size <= 0:
+            raise ValueError(f"cell_size must be positive, got {cell_size}")
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+        N = len(self.positions)
+        self.origin = self.positions.min(axis=0) if N else np.zeros(3)
+        cells = np.floor((self.positions - self.origin) / self.cell_size).astype(np.int64) + 1 # Pad by one cell on each side
+        self.dims = (cells.max(axis=0) if N else np.zeros(3, dtype=np.int64)) + 2
+        if np.prod(self.dims.astype(float)) >= 2**62:
+            raise ValueError("Too many grid cells, increase cell_size")
+        keys = self._linear_key(cells)
+        self._order = np.argsort(keys, kind='stable') # Node indices sorted by cell
+        self._cells, self._starts, self._counts = np.unique(keys[self._order], return_index=True, return_counts=True)
+
+    def __len__(self):
+        """
+        Returns:
+            int: the number of indexed nodes.
+        """
+        return len(self.positions)
+
+    def __str__(self):
+        """
+        SpatialGrid object descriptor
+
+        Returns:
+            str: the string description of the grid
+        """
+        return f"SpatialGrid of {len(self)} node(s) in {len(self._cells)} cell(s), cell size: {self.cell_size}"
+
+    #*************** Common operations ***************
+    def _linear_key(self, cells):
+        """
+        Function to convert integer cell coordinates into a single integer key.
+        Args:
+            cells (np.ndarray): the (..., 3) array of padded cell coordinates.
+        Returns:
+            np.ndarray: the array of cell keys.
+        """
+        return (cells[..., 0]*self.dims[1] + cells[..., 1])*self.dims[2] + cells[..., 2]
+
+    def _locate(self, keys):
+        """
+        Function to find the occupied cells matching the given keys.
+        Args:
+            keys (np.ndarray): the array of cell keys to look up.
+        Returns:
+            tuple: the boolean mask of occupied keys and the corresponding cell indices.
+        """
+        idx = np.searchsorted(self._cells, keys)
+        idx = np.minimum(idx, max(len(self._cells)-1, 0))
+        found = self._cells[idx] == keys if len(self._cells) else np.zeros(np.shape(keys), dtype=bool)
+        return found, idx
+
+    def _reach(self, radius):
+        """
+        Function to compute the number of cells to inspect in each direction for a given search radius.
+        Args:
+            radius (float): the search radius.
+        Returns:
+            int: the number of cells.
+        """
+        return max(int(np.ceil(radius / self.cell_size)), 1)
+
+    #*************** Range queries ***************
+    def query(self, point, radius=None):
+        """
+        Function to retrieve all nodes within a given distance of a point.
+        Args:
+            point (array-like): the (x, y, z) coordinates of the point.
+            radius (float, optional): the search radius. Defaults to None (the cell size).
+        Returns:
+            np.ndarray: the sorted indices of the nodes within range.
+        """
+        if radius is None:
+            radius = self.cell_size
+        point = np.asarray(point, dtype=float)
+        center = np.floor((point - self.origin) / self.cell_size).astype(np.int64) + 1
+        k = self._reach(radius)
+        offsets = np.array(list(product(range(-k, k+1), repeat=3)), dtype=np.int64)
+        cells = center + offsets
+        cells = cells[np.all((cells >= 0) & (cells < self.dims), axis=1)]
+        found, idx = self._locate(self._linear_key(cells))
+        idx = idx[found]
+        if len(idx) == 0:
+            return np.empty(0, dtype=np.int64)
+        members = np.concatenate([self._order[s:s+c] for s, c in zip(self._starts[idx], self._counts[idx])])
+        diff = self.positions[members] - point
+        members = members[np.sqrt(np.einsum('ij,ij->i', diff, diff)) <= radius]
+        return np.sort(members)
+
+    def query_pairs(self, radius=None):
+        """
+        Function to retrieve all pairs of nodes within a given distance of each other.
+        Only the pairs of cells that are close enough are compared, so the cost is about O(N*k) where k is the average
+        number of nodes in the vicinity of a node.
+        Args:
+            radius (float, optional): the search radius, at most the cell size. Defaults to None (the cell size).
+        Returns:
+            np.ndarray: the (M, 2) array of node index pairs (i, j) with i < j, sorted lexicographically.
+        """
+        if radius is None:
+            radius = self.cell_size
+        if radius > self.cell_size:
+            raise ValueError(f"radius ({radius}) must not exceed the cell size ({self.cell_size})")
+        half_offsets = [o for o in product((-1, 0, 1), repeat=3) if o > (0, 0, 0)] # Each pair of cells is visited once
+        chunks = [self._cell_pairs(0, np.arange(len(self._cells)), same_cell=True, radius=radius)]
+        for o in half_offsets:
+            shift = self._linear_key(np.array(o, dtype=np.int64))
+            found, idx = self._locate(self._cells + shift)
+            chunks.append(self._cell_pairs(np.flatnonzero(found), idx[found], same_cell=False, radius=radius))
+        pairs = np.concatenate(chunks)
+        pairs.sort(axis=1)
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def _cell_pairs(self, a, b, same_cell, radius):
+        """
+        Function to compare all the nodes of the cells a with all the nodes of the cells b, pairwise.
+        Args:
+            a (np.ndarray or int): the indices of the first cells (0 if same_cell).
+            b (np.ndarray): the indices of the second cells.
+            same_cell (bool): if True, compare each cell of b with itself.
+            radius (float): the search radius.
+        Returns:
+            np.ndarray: the (M, 2) array of node index pairs within range.
+        """
+        if same_cell:
+            a = b
+        na, nb = self._counts[a], self._counts[b]
+        total = na * nb
+        if total.sum() == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        cell_pair = np.repeat(np.arange(len(a)), total)
+        local = np.arange(total.sum()) - np.repeat(np.cumsum(total) - total, total)
+        ia, ib = np.divmod(local, nb[cell_pair])
+        if same_cell:
+            keep = ia < ib
+            cell_pair, ia, ib = cell_pair[keep], ia[keep], ib[keep]
+        i = self._order[self._starts[a][cell_pair] + ia]
+        j = self._order[self._starts[b][cell_pair] + ib]
+        diff = self.positions[i] - self.positions[j]
+        close = np.sqrt(np.einsum('ij,ij->i', diff, diff)) <= radius
+        return np.stack((i[close], j[close]), axis=1)
+
+
+#==============================================================================================
+
+class VerletList:
+    """
+    VerletList object, maintaining the neighbor pairs of a moving swarm incrementally (Verlet / skin list).
+    Candidate pairs within connection_range + skin are computed with a SpatialGrid, and only those candidates are checked at each
+    step. The candidates are rebuilt once a node has moved more than skin/2 since the last rebuild, which guarantees the same
+    result as a full recompute.
+    """
+
+    def __init__(self, connection_range, skin):
+        """
+        VerletList object constructor
+
+        Args:
+            connection_range (float): the maximum distance between two nodes to establish a connection.
+            skin (float): the extra distance added to the connection range for the candidate pairs.
+        """
+        if skin < 0:
+            raise ValueError(f"skin must be non-negative, got {skin}")
+        self.connection_range = float(connection_range)
+        self.skin = float(skin)
+        self.candidates = None # (M, 2) array of candidate pairs
+        self.reference = None # Positions at the last rebuild
+        self.rebuilds = 0 # Number of rebuilds so far
+
+    def __str__(self):
+        """
+        VerletList object descriptor
+
+        Returns:
+            str: the string description of the list
+        """
+        nb_cand = 0 if self.candidates is None else len(self.candidates)
+        return f"VerletList of {nb_cand} candidate pair(s), connection range: {self.connection_range}, skin: {self.skin}, rebuilt {self.rebuilds} time(s)"
+
+    def needs_rebuild(self, positions):
+        """
+        Function to check whether the candidate pairs are still valid for the given positions.
+        Only relative motion matters: the mean displacement of the swarm (e.g. its common orbital motion) is removed first.
+        Args:
+            positions (np.ndarray): the (N, 3) array of node coordinates.
+        Returns:
+            bool: True if the candidate pairs must be rebuilt.
+        """
+        if self.candidates is None or self.reference.shape != positions.shape:
+            return True
+        moves = positions - self.reference
+        moves -= moves.mean(axis=0)
+        max_move = np.sqrt(np.einsum('ij,ij->i', moves, moves).max()) if len(moves) else 0.0
+        return 2*max_move > self.skin
+
+    def rebuild(self, positions):
+        """
+        Function to recompute the candidate pairs from scratch. Without a positive cutoff distance (e.g. a connection range of 0),
+        no grid can be built and the pairs are found from the full distance matrix, as in Swarm.neighbor_pairs.
+        Args:
+            positions (np.ndarray): the (N, 3) array of node coordinates.
+        """
+        cutoff = self.connection_range + self.skin
+        if cutoff > 0:
+            self.candidates = SpatialGrid(positions, cutoff).query_pairs()
+        else:
+            diff = positions[:, np.newaxis, :] - positions[np.newaxis, :, :]
+            self.candidates = np.argwhere(np.triu(np.sqrt(np.einsum('ijk,ijk->ij', diff, diff)) <= cutoff, k=1))
+        self.reference = positions.copy()
+        self.rebuilds += 1
+
+    def update(self, positions):
+        """
+        Function to compute the neighbor pairs for new positions, checking only the candidate pairs.
+        Args:
+            positions (np.ndarray): the (N, 3) array of node coordinates.
+        Returns:
+            np.ndarray: the (M, 2) array of node index pairs (i, j) within range, with i < j, sorted lexicographically.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        if self.needs_rebuild(positions):
+            self.rebuild(positions)
+        i, j = self.candidates[:, 0], self.candidates[:, 1]
+        diff = positions[i] - positions[j]
+        return self.candidates[np.sqrt(np.einsum('ij,ij->i', diff, diff)) <= self.connection_range]
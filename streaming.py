@@ -0,0 +1,472 @@
+import os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+
+from spatial_index import VerletList, pairwise_distances
+
+
+#==============================================================================================
+
+class RunningStats:
+    """
+    RunningStats object, maintaining the count, mean, variance, minimum and maximum of a stream of values in constant memory
+    (Welford's algorithm). The statistics may be scalar or per component (e.g. the mean degree of each node), and two
+    RunningStats fed with different parts of a stream can be merged exactly.
+    """
+
+    def __init__(self, shape=()):
+        """
+        RunningStats object constructor
+
+        Args:
+            shape (tuple, optional): the shape of one sample, e.g. (N,) for one value per node. Defaults to () (scalar values).
+        """
+        self.shape = tuple(shape)
+        self.count = 0
+        self.mean = np.zeros(self.shape)
+        self._m2 = np.zeros(self.shape) # Sum of the squared deviations from the mean
+        self.min = np.full(self.shape, np.inf)
+        self.max = np.full(self.shape, -np.inf)
+
+    def __str__(self):
+        """
+        RunningStats object descriptor
+
+        Returns:
+            str: the string description of the statistics
+        """
+        return f"Running statistics of {self.count} sample(s) of shape {self.shape}"
+
+    def update(self, values):
+        """
+        Function to add samples to the statistics.
+        Args:
+            values (np.ndarray): one sample of the given shape, or several samples stacked along the first axis.
+        Returns:
+            RunningStats: self.
+        """
+        values = np.asarray(values, dtype=float).reshape((-1,) + self.shape)
+        if len(values) == 0:
+            return self
+        other = RunningStats(self.shape)
+        other.count = len(values)
+        other.mean = values.mean(axis=0)
+        other._m2 = ((values - other.mean)**2).sum(axis=0)
+        other.min, other.max = values.min(axis=0), values.max(axis=0)
+        return self.merge(other)
+
+    def merge(self, other):
+        """
+        Function to merge the statistics of another part of the stream into this one (Chan's parallel formula).
+        Args:
+            other (RunningStats): the statistics to merge, with the same shape.
+        Returns:
+            RunningStats: self.
+        """
+        if other.shape != self.shape:
+            raise ValueError(f"Cannot merge statistics of shape {other.shape} into shape {self.shape}")
+        n = self.count + other.count
+        if other.count == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta*other.count/n
+        self._m2 = self._m2 + other._m2 + delta**2*self.count*other.count/n
+        self.min, self.max = np.minimum(self.min, other.min), np.maximum(self.max, other.max)
+        self.count = n
+        return self
+
+    @property
+    def var(self):
+        """
+        Returns:
+            np.ndarray: the (population) variance of the samples.
+        """
+        return self._m2 / self.count if self.count else np.full(self.shape, np.nan)
+
+    @property
+    def std(self):
+        """
+        Returns:
+            np.ndarray: the (population) standard deviation of the samples.
+        """
+        return np.sqrt(self.var)
+
+
+#==============================================================================================
+
+class Histogram:
+    """
+    Histogram object, counting a stream of values into fixed bins. The values outside of the bins are counted apart.
+    Histograms with the same bins are merged by adding their counts.
+    """
+
+    def __init__(self, edges):
+        """
+        Histogram object constructor
+
+        Args:
+            edges (list(float)): the increasing bin edges, see help(np.histogram).
+        """
+        self.edges = np.asarray(edges, dtype=float)
+        if self.edges.ndim != 1 or len(self.edges) < 2 or np.any(np.diff(self.edges) <= 0):
+            raise ValueError("edges must be an increasing list of at least 2 values")
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0 # Number of values below the first edge
+        self.overflow = 0 # Number of values above the last edge
+
+    def __str__(self):
+        """
+        Histogram object descriptor
+
+        Returns:
+            str: the string description of the histogram
+        """
+        return f"Histogram of {self.total} value(s) in {len(self.counts)} bin(s) over [{self.edges[0]}, {self.edges[-1]}]"
+
+    @classmethod
+    def linear(cls, low, high, bins=50):
+        """
+        Function to build a histogram of equal-width bins.
+        Args:
+            low (float): the first edge.
+            high (float): the last edge.
+            bins (int, optional): the number of bins. Defaults to 50.
+        Returns:
+            Histogram: the empty histogram.
+        """
+        return cls(np.linspace(low, high, bins+1))
+
+    @property
+    def total(self):
+        """
+        Returns:
+            int: the number of values counted, including those outside of the bins.
+        """
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+    def update(self, values):
+        """
+        Function to count new values.
+        Args:
+            values (np.ndarray): the values, of any shape.
+        Returns:
+            Histogram: self.
+        """
+        values = np.ravel(values)
+        self.counts += np.histogram(values, self.edges)[0]
+        self.underflow += int(np.count_nonzero(values < self.edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.edges[-1]))
+        return self
+
+    def merge(self, other):
+        """
+        Function to add the counts of another histogram with the same bins.
+        Args:
+            other (Histogram): the histogram to merge.
+        Returns:
+            Histogram: self.
+        """
+        if not np.array_equal(other.edges, self.edges):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def quantile(self, q):
+        """
+        Function to estimate quantiles, interpolating linearly inside the bins. The values outside of the bins are clipped to the first and last edges.
+        Args:
+            q (float or list(float)): the quantile levels between 0 and 1.
+        Returns:
+            float or np.ndarray: the estimated quantiles.
+        """
+        cum = np.concatenate(([0, self.underflow], self.underflow + np.cumsum(self.counts), [self.total]))
+        edges = np.concatenate(([self.edges[0]], self.edges, [self.edges[-1]]))
+        return np.interp(np.asarray(q)*self.total, cum, edges) if self.total else np.full(np.shape(q), np.nan)
+
+
+#==============================================================================================
+
+class QuantileSketch:
+    """
+    QuantileSketch object, estimating the quantiles of a stream of values with a bounded relative error and without knowing
+    their range in advance (DDSketch). The values are counted in logarithmic buckets, so the memory grows with the logarithm
+    of the range of the values only, and sketches with the same accuracy are merged by adding their counts.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        """
+        QuantileSketch object constructor
+
+        Args:
+            relative_accuracy (float, optional): the maximum relative error of the quantiles. Defaults to 0.01.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be within ]0, 1[, got {relative_accuracy}")
+        self.relative_accuracy = float(relative_accuracy)
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.positive = {} # Dict(int:int), count of the positive values per bucket
+        self.negative = {} # Dict(int:int), count of the negative values per bucket of their absolute value
+        self.zeros = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def __str__(self):
+        """
+        QuantileSketch object descriptor
+
+        Returns:
+            str: the string description of the sketch
+        """
+        return f"Quantile sketch of {self.count} value(s) in {len(self.positive) + len(self.negative)} bucket(s), relative accuracy: {self.relative_accuracy}"
+
+    def _add(self, store, values):
+        """
+        Function to count positive values into their buckets: bucket k holds the values within ]gamma^(k-1), gamma^k].
+        Args:
+            store (dict(int:int)): the buckets.
+            values (np.ndarray): the positive values.
+        """
+        keys, counts = np.unique(np.ceil(np.log(values) / np.log(self.gamma)).astype(np.int64), return_counts=True)
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            store[k] = store.get(k, 0) + c
+
+    def update(self, values):
+        """
+        Function to count new values.
+        Args:
+            values (np.ndarray): the values, of any shape.
+        Returns:
+            QuantileSketch: self.
+        """
+        values = np.ravel(np.asarray(values, dtype=float))
+        if len(values) == 0:
+            return self
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+        self.zeros += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+        self.min, self.max = min(self.min, values.min()), max(self.max, values.max())
+        return self
+
+    def merge(self, other):
+        """
+        Function to add the counts of another sketch with the same accuracy.
+        Args:
+            other (QuantileSketch): the sketch to merge.
+        Returns:
+            QuantileSketch: self.
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracies")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for k, c in theirs.items():
+                mine[k] = mine.get(k, 0) + c
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    def _buckets(self):
+        """
+        Function to list the buckets in increasing order of value.
+        Returns:
+            tuple(np.ndarray, np.ndarray): the representative value and the count of each bucket.
+        """
+        neg = sorted(self.negative.items(), reverse=True)
+        pos = sorted(self.positive.items())
+        value = lambda k: 2*self.gamma**k / (self.gamma + 1)
+        values = [-value(k) for k, _ in neg] + [0.0]*bool(self.zeros) + [value(k) for k, _ in pos]
+        counts = [c for _, c in neg] + [self.zeros]*bool(self.zeros) + [c for _, c in pos]
+        return np.array(values), np.array(counts, dtype=np.int64)
+
+    def quantile(self, q):
+        """
+        Function to estimate quantiles, within the relative accuracy of the sketch.
+        Args:
+            q (float or list(float)): the quantile levels between 0 and 1.
+        Returns:
+            float or np.ndarray: the estimated quantiles.
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)
+        values, counts = self._buckets()
+        rank = np.asarray(q)*(self.count - 1)
+        idx = np.searchsorted(np.cumsum(counts), rank, side='right')
+        return np.clip(values[np.minimum(idx, len(values)-1)], self.min, self.max)
+
+    def histogram(self, edges):
+        """
+        Function to approximate a histogram of the values, each bucket being counted at its representative value.
+        Args:
+            edges (list(float)): the increasing bin edges, see help(np.histogram).
+        Returns:
+            tuple(np.ndarray, np.ndarray): the number of values in each bin and the bin edges.
+        """
+        values, counts = self._buckets()
+        return np.histogram(values, edges, weights=counts)[0].astype(np.int64), np.asarray(edges, dtype=float)
+
+
+#==============================================================================================
+
+class TimestepQuantiles:
+    """
+    TimestepQuantiles object, keeping a few quantiles of a metric at each timestep (e.g. the min / Q1 / median / Q3 / max degree
+    over time) instead of the whole metric arrays. Summaries of different time windows are merged by timestep.
+    """
+
+    def __init__(self, quantiles=(0, 0.25, 0.5, 0.75, 1)):
+        """
+        TimestepQuantiles object constructor
+
+        Args:
+            quantiles (list(float), optional): the quantile levels between 0 and 1. Defaults to (0, 0.25, 0.5, 0.75, 1).
+        """
+        self.quantiles = np.asarray(quantiles, dtype=float)
+        self._steps = [] # Timestep indices
+        self._values = [] # (Q,) quantiles of each timestep
+
+    def __len__(self):
+        """
+        Returns:
+            int: the number of timesteps summarized.
+        """
+        return len(self._steps)
+
+    def __str__(self):
+        """
+        TimestepQuantiles object descriptor
+
+        Returns:
+            str: the string description of the summary
+        """
+        return f"Quantiles {self.quantiles.tolist()} of {len(self)} timestep(s)"
+
+    def update(self, values, step=None):
+        """
+        Function to summarize the metric of a new timestep.
+        Args:
+            values (np.ndarray): the values of the metric at this timestep (e.g. the degree of each node).
+            step (int, optional): the timestep index. Defaults to None (the one after the last timestep).
+        Returns:
+            TimestepQuantiles: self.
+        """
+        if step is None:
+            step = self._steps[-1] + 1 if self._steps else 0
+        values = np.ravel(values)
+        self._steps.append(int(step))
+        self._values.append(np.quantile(values, self.quantiles) if len(values) else np.full(len(self.quantiles), np.nan))
+        return self
+
+    def merge(self, other):
+        """
+        Function to add the timesteps summarized by another object with the same quantile levels.
+        Args:
+            other (TimestepQuantiles): the summary to merge.
+        Returns:
+            TimestepQuantiles: self.
+        """
+        if not np.array_equal(other.quantiles, self.quantiles):
+            raise ValueError("Cannot merge summaries with different quantile levels")
+        order = np.argsort(self._steps + other._steps, kind='stable')
+        steps, values = self._steps + other._steps, self._values + other._values
+        self._steps = [steps[i] for i in order]
+        self._values = [values[i] for i in order]
+        return self
+
+    @property
+    def steps(self):
+        """
+        Returns:
+            np.ndarray: the (T,) timestep indices, in increasing order.
+        """
+        return np.array(self._steps, dtype=np.int64)
+
+    @property
+    def values(self):
+        """
+        Returns:
+            np.ndarray: the (T, Q) quantiles of each timestep.
+        """
+        return np.array(self._values).reshape(-1, len(self.quantiles))
+
+
+#==============================================================================================
+
+def _summarize_window(task):
+    """
+    Function to summarize the degrees and the distances of a contiguous window of timesteps.
+    Args:
+        task (tuple): the (T, N, 3) positions of the window, its first timestep index, the connection range, the skin of the
+            neighbor search, the quantile levels, the relative accuracy of the distance sketch and the edges of the distance histogram.
+    Returns:
+        dict: the partial summaries, see help(summarize_trace).
+    """
+    positions, first, connection_range, skin, quantiles, accuracy, edges = task
+    N = positions.shape[1]
+    out = {'degree_quantiles': TimestepQuantiles(quantiles), 'degree': RunningStats((N,)),
+           'distance': QuantileSketch(accuracy), 'distance_histogram': None if edges is None else Histogram(edges)}
+    vl = VerletList(connection_range, skin)
+    upper = np.triu_indices(N, k=1)
+    for k, pos in enumerate(positions):
+        degree = np.bincount(vl.update(pos).ravel(), minlength=N)
+        out['degree_quantiles'].update(degree, first + k)
+        out['degree'].update(degree)
+        distances = pairwise_distances(pos)[upper]
+        out['distance'].update(distances)
+        if edges is not None:
+            out['distance_histogram'].update(distances)
+    return out
+
+def merge_summaries(parts):
+    """
+    Function to merge the summaries of several time windows (see help(summarize_trace)).
+    Args:
+        parts (list(dict)): the summaries to merge.
+    Returns:
+        dict: the merged summary.
+    """
+    merged = parts[0]
+    for part in parts[1:]:
+        for key, agg in part.items():
+            if agg is not None:
+                merged[key].merge(agg)
+    return merged
+
+def summarize_trace(trace, connection_range=None, start=0, stop=None, quantiles=(0, 0.25, 0.5, 0.75, 1), relative_accuracy=0.01,
+                    distance_edges=None, skin=None, workers=1, shards=None):
+    """
+    Function to summarize the degree and distance statistics of a trace in bounded memory: each timestep is reduced to
+    mergeable aggregates as soon as it is computed, and the time window can be split among worker processes whose partial
+    summaries are merged.
+    Args:
+        trace (SwarmTrace): the trace of the swarm.
+        connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+        start (int, optional): the first timestamp index. Defaults to 0.
+        stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        quantiles (list(float), optional): the degree quantiles kept per timestep. Defaults to (0, 0.25, 0.5, 0.75, 1).
+        relative_accuracy (float, optional): the relative accuracy of the distance quantiles. Defaults to 0.01.
+        distance_edges (list(float), optional): the bin edges of an exact peer-to-peer distance histogram. Defaults to None (no histogram).
+        skin (float, optional): the extra distance for the candidate pairs, see help(SwarmTrace.neighbor_pairs). Defaults to None.
+        workers (int, optional): the number of worker processes. Defaults to 1 (current process). None uses every CPU.
+        shards (int, optional): the number of time windows. Defaults to None (one per worker).
+    Returns:
+        dict: 'degree_quantiles' (TimestepQuantiles of the node degrees), 'degree' (RunningStats of the degree of each node),
+        'distance' (QuantileSketch of the peer-to-peer distances) and 'distance_histogram' (Histogram, or None).
+    """
+    connection_range = connection_range or trace.connection_range
+    skin = 0.1*connection_range if skin is None else skin
+    start, stop, _ = slice(start, stop).indices(len(trace))
+    workers = workers or os.cpu_count() or 1
+    shards = max(1, min(shards or workers, stop - start))
+    cuts = np.linspace(start, stop, shards+1).astype(int)
+    tasks = [(trace.positions[a:b], a, connection_range, skin, quantiles, relative_accuracy, distance_edges) for a, b in zip(cuts[:-1], cuts[1:])]
+    if workers == 1:
+        parts = [_summarize_window(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(_summarize_window, tasks))
+    return merge_summaries(parts)
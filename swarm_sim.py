@@ -1,12 +1,56 @@
 from typing import List
 import numpy as np
-import matplotlib.pyplot as plt
 import networkx as nx
 
 from numpy.random import binomial
 from math import *
 from mpl_toolkits import mplot3d
-from random import seed, randint, choice, sample
+from random import seed, randint, choice
+
+from graphlets import batch_graphlets, count_graphlets
+from graph_metrics import ComponentTracker, component_labels, hop_distances, pairs_to_csr, path_report, range_sweep
+from rendering import SwarmRenderer, animate_trace, state_colors
+from sampling import forest_fire, mdrw, rns
+from spatial_index import SpatialGrid, VerletList, pairwise_distances
+from topology_log import build_log
+
+
+#==============================================================================================
+
+class NeighborList(list):
+    """
+    NeighborList object, read-only list of the neighbors of a node (see help(Node.neighbors)).
+    Mutating it raises a TypeError instead of silently changing a copy: use Node.add_neighbor / Node.remove_neighbor,
+    or assign a whole new list to Node.neighbors.
+    """
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Node.neighbors is read-only, use Node.add_neighbor / Node.remove_neighbor or assign a new list")
+    
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+
+#==============================================================================================
+
+class NodeList(list):
+    """
+    NodeList object, list of the nodes of a swarm (see help(Swarm.nodes)) counting its in-place changes, so that the node ID
+    index of the swarm knows when to be rebuilt.
+    """
+    version = 0 # Number of in-place changes so far
+    
+    def _changing(method):
+        def changed(self, *args, **kwargs):
+            self.version += 1
+            return method(self, *args, **kwargs)
+        changed.__name__ = method.__name__
+        return changed
+    
+    append, extend, insert, remove = _changing(list.append), _changing(list.extend), _changing(list.insert), _changing(list.remove)
+    pop, clear, sort, reverse = _changing(list.pop), _changing(list.clear), _changing(list.sort), _changing(list.reverse)
+    __setitem__, __delitem__ = _changing(list.__setitem__), _changing(list.__delitem__)
+    __iadd__, __imul__ = _changing(list.__iadd__), _changing(list.__imul__)
 
 
 #==============================================================================================
@@ -14,7 +58,9 @@ from random import seed, randint, choice, sample
 class Node:
     """
     Node class, representing a satellite in the swarm. 
+    The neighbors are kept in an insertion-ordered set, so that adding, removing and looking up a neighbor is O(1).
     """
+    __slots__ = ('id', 'x', 'y', 'z', 'group', 'state', '_neighbors')
     
     def __init__(self, id, x=0.0, y=0.0, z=0.0):
         """
@@ -30,8 +76,9 @@ class Node:
         self.x = float(x)
         self.y = float(y) 
         self.z = float(z) 
-        self.neighbors = [] # List(Node), list of neighbor nodes to the node
+        self._neighbors = {} # Dict(Node:None), ordered set of neighbor nodes to the node
         self.group = -1 # Group ID to which belongs the node
+        self.state = 0 # Message propagation state (see help(Swarm.plot))
         
     def __str__(self):
         """
@@ -43,6 +90,18 @@ class Node:
         nb_neigh = len(self.neighbors)
         return f"Node ID {self.id} ({self.x},{self.y},{self.z}) has {nb_neigh} neighbor(s)\tGroup: {self.group}"
     
+    @property
+    def neighbors(self):
+        """
+        NeighborList(Node), read-only list of neighbor nodes to the node, in insertion order.
+        It is a snapshot of the neighbors: modify them with Node.add_neighbor / Node.remove_neighbor, or assign a new list.
+        """
+        return NeighborList(self._neighbors)
+    
+    @neighbors.setter
+    def neighbors(self, nodes):
+        self._neighbors = dict.fromkeys(nodes)
+    
     #*************** Common operations ****************
     def add_neighbor(self, node):
         """
@@ -51,8 +110,7 @@ class Node:
         Args:
             node (Node): the node to add.
         """
-        if node not in self.neighbors:
-            self.neighbors.append(node)
+        self._neighbors[node] = None
         
     def compute_dist(self, node):
         """
@@ -90,8 +148,7 @@ class Node:
         Args:
             node (Node): the node to remove
         """
-        if node in self.neighbors:
-            self.neighbors.remove(node)   
+        self._neighbors.pop(node, None)
      
     def set_group(self, c):
         """
@@ -116,8 +173,8 @@ class Node:
         if max_edges == 0:
             return 0
         edges = 0
-        for v in self.neighbors:
-            common_elem = set(v.neighbors).intersection(self.neighbors)
+        for v in self._neighbors:
+            common_elem = v._neighbors.keys() & self._neighbors.keys()
             edges += len(common_elem)
         return edges/(2*max_edges) # Divide by 2 because each edge is counted twice
                     
@@ -129,22 +186,26 @@ class Node:
         Returns:
             int: the length of the neighbor list of the node.
         """
-        return len(self.neighbors)
+        return len(self._neighbors)
                 
     def k_vicinity(self, depth=1):
         """
         Function to compute the k-vicinity (aka the extended neighborhood) of the node.
         The k-vicinity corresponds to the number of direct and undirect neighbors within at most k hops from the node.
+        The node itself is not counted.
         Args:
             depth (int, optional): the number of hops for extension. Defaults to 1.
         Returns:
             int: the length of the extended neighbor list of the node.
         """
-        kv = self.neighbors.copy()
-        for i in range(depth-1):
-            nodes = kv
-            kv.extend([n for node in nodes for n in node.neighbors])
-        return len(set(kv))   
+        visited = {self}
+        frontier = [self]
+        for i in range(depth):
+            frontier = [n for node in frontier for n in node._neighbors if n not in visited]
+            visited.update(frontier)
+            if not frontier:
+                break
+        return len(visited)-1
     
     
     #*************** Sampling algorithms ****************
@@ -200,16 +261,41 @@ class Swarm:
     Swarm object, representing a swarm of nanosatellites.
     """
     
-    def __init__(self, connection_range=0, nodes=[]):
+    def __init__(self, connection_range=0, nodes=None):
         """
         Swarm object constructor
         
         Args:
             connection_range (int, optional): the maximum distance between two nodes to establish a connection. Defaults to 0.
-            nodes (list, optional): list of Node objects within the swarm. Defaults to [].
+            nodes (list, optional): list of Node objects within the swarm. Defaults to None (empty swarm).
         """
         self.connection_range = connection_range
-        self.nodes = nodes 
+        self._index = {} # Dict(int:int), node ID to position in the node list, see help(Swarm.index_of)
+        self._indexed = None # (identity, version) of the node list when the ID index was built
+        self.nodes = nodes if nodes is not None else []
+        
+    @property
+    def nodes(self):
+        """
+        NodeList(Node), list of Node objects within the swarm. Any list assigned to it is converted into a NodeList, so that
+        in-place changes (e.g. nodes[0] = node, slice assignment, sort) are seen by the node ID index.
+        """
+        return self._nodes
+    
+    @nodes.setter
+    def nodes(self, nodes):
+        self._nodes = nodes if isinstance(nodes, NodeList) else NodeList(nodes)
+        self._indexed = None
+        
+    def __contains__(self, node):
+        """
+        Function to check whether a node belongs to the swarm, in O(1).
+        Args:
+            node (Node): the node to look for.
+        Returns:
+            bool: True if the node is in the swarm.
+        """
+        return self.index_of(node) is not None
         
     def __str__(self):
         """
@@ -228,19 +314,67 @@ class Swarm:
         Args:
             node (Node): the node to add.
         """
-        if node not in self.nodes:
+        if node not in self:
             self.nodes.append(node)
+            self._index.setdefault(node.id, len(self.nodes)-1) # Keep the ID index up to date
+            self._indexed = (id(self.nodes), self.nodes.version)
             
+    def adjacency_matrix(self, connection_range=None):
+        """
+        Function to compute the boolean adjacency matrix of the swarm in one batched operation, without modifying the neighbor lists.
+        Two nodes are adjacent if their distance is lower or equal to the connection range. A node is never adjacent to itself.
+        Args:
+            connection_range (int, optional): the connection range of the swarm. Defaults to None.
+        Returns:
+            np.ndarray: the (N, N) boolean adjacency matrix.
+        """
+        if not connection_range:
+            connection_range=self.connection_range # Use the attribute of the Swarm object if none specified
+        ids = np.array([node.id for node in self.nodes])
+        matrix = self.pairwise_distances() <= connection_range
+        matrix &= ids[:, np.newaxis] != ids[np.newaxis, :] # Same rule as Node.is_neighbor
+        return matrix
+    
+    def adjacency_csr(self):
+        """
+        Function to export the current neighbor lists as a compressed sparse row (CSR) adjacency, restricted to the nodes of the swarm.
+        The neighbors of the node at position i are indices[indptr[i]:indptr[i+1]], as positions in the node list.
+        Returns:
+            tuple(np.ndarray, np.ndarray): the (N+1,) indptr array and the (E,) indices array.
+        """
+        indptr = [0]
+        indices = []
+        for node in self.nodes:
+            for n in node._neighbors:
+                j = self.index_of(n)
+                if j is not None:
+                    indices.append(j)
+            indptr.append(len(indices))
+        return np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64)
+        
+    def compute_neighbors(self, connection_range=None):
+        """
+        Function to perform neighbor discovery with a spatial index (see help(SpatialGrid)) instead of comparing all pairs of nodes.
+        The neighbor list of each node is updated accordingly. Suitable for large swarms, as no N*N matrix is built.
+        Args:
+            connection_range (int, optional): the connection range of the swarm. Defaults to None.
+        Returns:
+            np.ndarray: the (M, 2) array of neighbor pairs (see help(Swarm.neighbor_pairs)).
+        """
+        pairs = self.neighbor_pairs(connection_range)
+        self.set_neighbor_pairs(pairs)
+        return pairs
+        
     def distance_matrix(self):
         """
         Function to compute the Euclidean distance matrix of the swarm.
+        The distances are computed in one batched operation (see help(Swarm.pairwise_distances)).
         Returns:
-            list(list(float)): the 2-dimensional distance matrix formatted as matrix[node1][node2] = distance.
+            np.ndarray: the (N, N-1) distance matrix formatted as matrix[node1] = distances to every other node.
         """
-        matrix = []
-        for n1 in self.nodes:
-            matrix.append([n1.compute_dist(n2) for n2 in self.nodes if n1.id != n2.id])
-        return matrix
+        N = len(self.nodes)
+        matrix = self.pairwise_distances()
+        return matrix[~np.eye(N, dtype=bool)].reshape(N, max(N-1, 0)) # Drop the distance of each node to itself
     
     def get_node_by_id(self, id:int):
         """
@@ -250,33 +384,113 @@ class Swarm:
         Returns:
             Node: the Node object with the corresponding ID.
         """
-        for node in self.nodes:
-            if node.id == id:
-                return node
+        i = self._node_index().get(id)
+        if i is not None and self.nodes[i].id != id: # Node list modified in place, refresh the index
+            i = self._node_index(rebuild=True).get(id)
+        if i is not None:
+            return self.nodes[i]
+            
+    def index_of(self, node:Node):
+        """
+        Function to retrieve the position of a node in the node list of the swarm, in O(1) thanks to the ID index.
+        Args:
+            node (Node): the node to look for.
+        Returns:
+            int: the position of the node, or None if it is not in the swarm.
+        """
+        index = self._node_index()
+        i = index.get(node.id)
+        if i is not None and self.nodes[i] is not node: # Node list modified in place, refresh the index once
+            index = self._node_index(rebuild=True)
+            i = index.get(node.id)
+        if i is not None and self.nodes[i] is node:
+            return i
+        if len(index) != len(self.nodes) and node in self.nodes: # Duplicate IDs, fall back to a linear search
+            return self.nodes.index(node)
+        return None
+    
+    def _node_index(self, rebuild=False):
+        """
+        Function to get the node ID index of the swarm, rebuilt whenever the node list has been replaced or changed in place
+        (see help(NodeList)). Changes of the node IDs themselves are detected by the lookups, when a position no longer holds the
+        expected node.
+        Args:
+            rebuild (bool, optional): if True, force the index to be rebuilt. Defaults to False.
+        Returns:
+            dict(int:int): the position of each node ID in the node list (first occurrence).
+        """
+        if rebuild or self._indexed != (id(self.nodes), self.nodes.version):
+            self._index = {}
+            for i, node in enumerate(self.nodes):
+                self._index.setdefault(node.id, i)
+            self._indexed = (id(self.nodes), self.nodes.version)
+        return self._index
             
     def neighbor_matrix(self, connection_range=None):
         """
         Function to compute the neighbor matrix of the swarm.
         If two nodes are neighbors (according to the given connection range), the row[col] equals to 1. Else 0.
+        The neighbor list of each node is updated accordingly.
+        Args:
+            connection_range (int, optional): the connection range of the swarm. Defaults to None.
+        Returns:
+            np.ndarray: the (N, N) neighbor matrix formatted as matrix[node1][node2] = neighbor.
+        """
+        matrix = self.adjacency_matrix(connection_range)
+        self.set_neighbors(matrix)
+        return matrix.astype(int)
+    
+    def neighbor_pairs(self, connection_range=None):
+        """
+        Function to list all pairs of neighbor nodes, using a uniform grid sized to the connection range (see help(SpatialGrid)).
+        The neighbor lists are not modified.
         Args:
             connection_range (int, optional): the connection range of the swarm. Defaults to None.
         Returns:
-            list(list(int)): the 2-dimensional neighbor matrix formatted as matrix[node1][node2] = neighbor.
+            np.ndarray: the (M, 2) array of node indices (i, j), with i < j, in the order of the node list.
         """
-        matrix = []
         if not connection_range:
             connection_range=self.connection_range # Use the attribute of the Swarm object if none specified
-        for node in self.nodes:
-            matrix.append([node.is_neighbor(nb,connection_range) for nb in self.nodes])
-        return matrix
-        
+        if connection_range <= 0 or not self.nodes:
+            return np.argwhere(np.triu(self.adjacency_matrix(connection_range)))
+        pairs = SpatialGrid(self.positions(), connection_range).query_pairs()
+        ids = np.array([node.id for node in self.nodes])
+        return pairs[ids[pairs[:, 0]] != ids[pairs[:, 1]]] # Same rule as Node.is_neighbor
+    
+    def pairwise_distances(self):
+        """
+        Function to compute the Euclidean distances between all pairs of nodes at once, from the (N,3) array of coordinates.
+        Returns:
+            np.ndarray: the (N, N) distance matrix, with zeros on the diagonal.
+        """
+        return pairwise_distances(self.positions())
+    
+    def positions(self):
+        """
+        Function to gather the coordinates of the nodes into a single array.
+        Returns:
+            np.ndarray: the (N, 3) array of coordinates, in the order of the node list.
+        """
+        return np.array([(node.x, node.y, node.z) for node in self.nodes], dtype=float).reshape(-1, 3)
+    
+    def range_sweep(self, ranges):
+        """
+        Function to compute connectivity metrics for a whole list of connection ranges at once (see help(graph_metrics.range_sweep)).
+        The pairwise distances are only computed once, and the neighbor lists are not modified.
+        Args:
+            ranges (list(int)): the connection ranges to evaluate.
+        Returns:
+            dict(str:np.ndarray): the node degrees, isolation ratio, graph density and number of connected components for each range.
+        """
+        return range_sweep(self.positions(), ranges, [node.id for node in self.nodes])
+    
     def remove_node(self, node:Node):
         """
         Function to remove a node from the swarm unless it is already out.
         Args:
             node (Node): the node to remove.
         """
-        if node in self.nodes:
+        if node in self:
             self.nodes.remove(node)
         
     def reset_connection(self):
@@ -292,19 +506,69 @@ class Swarm:
         """
         for node in self.nodes:
             node.set_group(-1)
+            
+    def set_groups(self, labels):
+        """
+        Function to appoint a group ID to every node from an array of labels, and split the swarm into the corresponding samples.
+        Args:
+            labels (np.ndarray): the group ID of each node, in the order of the node list.
+        Returns:
+            dict(int:Swarm): the dictionary of group IDs and their corresponding Swarm sample.
+        """
+        swarms = {} # Dict(group ID:Swarm)
+        for node, c in zip(self.nodes, np.asarray(labels).tolist()):
+            node.set_group(c)
+            if c not in swarms:
+                swarms[c] = Swarm(self.connection_range, nodes=[])
+            swarms[c].nodes.append(node)
+        return dict(sorted(swarms.items()))
+        
+    def set_neighbors(self, matrix):
+        """
+        Function to fill the neighbor list of every node in bulk from an adjacency matrix.
+        Neighbors that do not belong to the swarm are left untouched.
+        Args:
+            matrix (np.ndarray): the (N, N) adjacency matrix, in the order of the node list.
+        """
+        self.set_neighbor_pairs(np.argwhere(np.triu(np.asarray(matrix, dtype=bool))))
+        
+    def set_neighbor_pairs(self, pairs):
+        """
+        Function to fill the neighbor list of every node in bulk from a list of neighbor pairs.
+        Neighbors that do not belong to the swarm are left untouched.
+        Args:
+            pairs (np.ndarray): the (M, 2) array of node indices (i, j), in the order of the node list. Each pair is set both ways.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        src = np.concatenate((pairs[:, 0], pairs[:, 1]))
+        dst = np.concatenate((pairs[:, 1], pairs[:, 0]))
+        order = np.lexsort((dst, src))
+        src, dst = src[order], dst[order]
+        bounds = np.searchsorted(src, np.arange(len(self.nodes)+1))
+        for i, node in enumerate(self.nodes):
+            outside = [n for n in node._neighbors if n not in self]
+            node.neighbors = outside + [self.nodes[j] for j in dst[bounds[i]:bounds[i+1]]]
+    
+    def set_states(self, states):
+        """
+        Function to appoint a message propagation state to every node (see help(Swarm.plot) and help(propagation.Propagation)).
+        Args:
+            states (np.ndarray): the state of each node, in the order of the node list.
+        """
+        for node, state in zip(self.nodes, np.asarray(states).tolist()):
+            node.state = state
     
     def swarm_to_nxgraph(self):
         """
         Function to convert a Swarm object into a NetworkX Graph. See help(networkx.Graph) for more information.
+        The neighbor lists are updated by the neighbor discovery (see help(Swarm.compute_neighbors)).
         Returns:
             nx.Graph: the converted graph.
         """
         G = nx.Graph()
         G.add_nodes_from([n.id for n in self.nodes])
-        for ni in self.nodes:
-            for nj in self.nodes:
-                if ni.is_neighbor(nj, self.connection_range)==1:
-                    G.add_edge(ni.id,nj.id)
+        pairs = self.compute_neighbors()
+        G.add_edges_from((self.nodes[i].id, self.nodes[j].id) for i, j in pairs)
         return G
     
     
@@ -319,6 +583,16 @@ class Swarm:
         """
         return [node.cluster_coef() for node in self.nodes]
     
+    def component_labels(self):
+        """
+        Function to label the connected components of the swarm from the current neighbor lists (see help(graph_metrics.component_labels)).
+        Returns:
+            np.ndarray: the component label of each node, in the order of the node list.
+        """
+        indptr, indices = self.adjacency_csr()
+        src = np.repeat(np.arange(len(self.nodes)), np.diff(indptr))
+        return component_labels(len(self.nodes), np.stack((src, indices), axis=1))
+    
     def connected_components(self):
         """
         Function to define the connected components in the network.
@@ -346,6 +620,7 @@ class Swarm:
     def DFSUtil(self, temp, node, visited):
         """
         Function to perform a Depth-First Search on the graph. Usually used to define all connected components in the swarm.
+        The search uses an explicit stack, so it is not limited by the recursion depth of Python.
         Args:
             temp (list(int)): the list of visited node IDs so far.
             node (Node): the node to be analysed.
@@ -355,31 +630,28 @@ class Swarm:
         """
         visited[node.id] = True # Mark the current node as visited
         temp.append(node.id) # Store the vertex to list
-        for n in node.neighbors:
-            if n in self.nodes:
-                if visited[n.id] == False: # Perform DFS on unvisited nodes
-                    temp = self.DFSUtil(temp, n, visited)
+        stack = [iter(node.neighbors)]
+        while stack:
+            for n in stack[-1]:
+                if n in self and visited[n.id] == False: # Go deeper on unvisited nodes
+                    visited[n.id] = True
+                    temp.append(n.id)
+                    stack.append(iter(n.neighbors))
+                    break
+            else: # All neighbors visited, backtrack
+                stack.pop()
         return temp
     
-    def diameter(self, group):
+    def diameter(self, group=None):
         """
-        Function to compute the diameter of the swarm. The swarm is first converted into a nx.Graph object (see help(Swarm.swarm_to_nxgraph)).
+        Function to compute the diameter of the swarm (see help(Swarm.path_report)).
         The diameter of the swarm is defined as the maximum shortest path distance between all pairs of nodes, in terms of number of hops.
         Args:
-            group (Swarm): the list of nodes to take into account.
+            group (Swarm, optional): the list of nodes to take into account. Defaults to None (the whole swarm).
         Returns:
             tuple: the diameter of the swarm as (source_id, target_id, diameter).
         """
-        G = self.swarm_to_nxgraph()
-        node_ids = [n.id for n in group.nodes]
-        max_length = (0,0,0) # Source, target, number of hops
-        for ni in node_ids:
-            for nj in node_ids:
-                if nx.has_path(G, ni, nj):
-                    sp = nx.shortest_path(G, ni, nj)
-                    if len(sp)-1 > max_length[2]:
-                        max_length = (ni, nj, len(sp)-1)
-        return max_length
+        return self.path_report(group)['diameter']
     
     def graph_density(self):
         """
@@ -396,10 +668,23 @@ class Swarm:
             return 0
         edges = 0
         for n in self.nodes:
-            common_nodes = set(n.neighbors).intersection(self.nodes)
-            edges += len(common_nodes)
+            edges += sum(1 for v in n._neighbors if v in self)
         return edges/(2*max_edges) # Divide by 2 because each edge is counted twice
     
+    def graphlets(self, sizes=(3, 4, 5)):
+        """
+        Function to count the induced connected graphlets of the swarm, from the current neighbor lists restricted to the nodes
+        of the swarm, so that it also applies to the groups returned by the sampling algorithms (see help(graphlets.count_graphlets)).
+        Args:
+            sizes (list(int), optional): the graphlet sizes, among 3, 4 and 5. Defaults to (3, 4, 5).
+        Returns:
+            dict(int:np.ndarray): the counts of each size, in the order of graphlets.GRAPHLETS and graphlets.graphlet_edges.
+        """
+        indptr, indices = self.adjacency_csr()
+        A = np.zeros((len(self.nodes), len(self.nodes)), dtype=bool)
+        A[np.repeat(np.arange(len(self.nodes)), np.diff(indptr)), indices] = True
+        return count_graphlets(A | A.T, sizes)
+    
     def k_vicinity(self, depth=1):
         """
         Function to compute the k-vicinity (aka the extended neighborhood) of each node in the swarm.
@@ -411,106 +696,84 @@ class Swarm:
         """
         return [node.k_vicinity(depth) for node in self.nodes]
     
-    def shortest_paths_lengths(self, group):
+    def path_report(self, group=None):
         """
-        Function to compute all the shortest paths between each pair of nodes (Dijkstra algorithm) and return their length. The swarm is 
-        first converted into a nx.Graph object (see help(Swarm.swarm_to_nxgraph)).
+        Function to compute all the shortest path lengths (in number of hops) between the nodes of a group at once, with one breadth-first
+        search per source (see help(graph_metrics.hop_distances)). Paths may go through any node of the swarm.
+        The adjacency is derived from the connection range of the swarm, and the neighbor lists are not modified.
         Args:
-            group (Swarm): the list of nodes to take into account.
+            group (Swarm, optional): the list of nodes to take into account. Defaults to None (the whole swarm).
+        Returns:
+            dict: the hop matrix, diameter, eccentricities and path lengths of the group (see help(graph_metrics.path_report)).
+        """
+        if group is None:
+            group = self
+        index = self._node_index()
+        ids = [n.id for n in group.nodes]
+        missing = [id for id in ids if id not in index]
+        if missing:
+            raise ValueError(f"Node(s) {missing} not in the swarm")
+        idx = np.array([index[id] for id in ids], dtype=np.int64)
+        indptr, indices = pairs_to_csr(len(self.nodes), self.neighbor_pairs())
+        hops = hop_distances(indptr, indices, sources=idx)[:, idx]
+        return path_report(hops, ids)
+    
+    def shortest_paths_lengths(self, group=None):
+        """
+        Function to compute all the shortest paths between each pair of nodes and return their length (see help(Swarm.path_report)).
+        Args:
+            group (Swarm, optional): the list of nodes to take into account. Defaults to None (the whole swarm).
         Returns:
             list(int): the list of the shortest path lengths.
         """
-        G = self.swarm_to_nxgraph()
-        node_ids = [n.id for n in group.nodes]
-        lengths = []
-        for ni in node_ids:
-            for nj in node_ids:
-                if nx.has_path(G, ni, nj) and nj != ni:
-                    lengths.append(nx.shortest_path_length(G, source=ni, target=nj))
-        return lengths 
+        return self.path_report(group)['lengths'].tolist()
     
     
     #************** Sampling algorithms ****************
     def ForestFire(self, n=10, p=0.7, s=1, overlap=False):
         """
-        Function to perform graph sampling by the Forest Fire algorithm. 
+        Function to perform graph sampling by the Forest Fire algorithm (see help(sampling.forest_fire)). 
         In the initial phase, n nodes are selected as "fire sources". Then, the fire spreads to the neighbors with a probability of p.
-        We finally obtain n samples defined as the nodes burned by each source.
+        We finally obtain n samples defined as the nodes burned by each source. The group ID of each node is updated accordingly.
         Args:
             n (int, optional): the initial number of sources. Defaults to 10.
             p (float, optional): the fire spreading probability. Defaults to 0.7.
-            s (int, optional): the random seed. Defaults to 1.
-            overlap (bool, optional): if True, node groups are allowed to overlap. Defaults to False.
+            s (int or np.random.Generator, optional): the random seed, or a random generator. Defaults to 1.
+            overlap (bool, optional): not supported, node groups are a partition of the swarm. Defaults to False.
         Returns:
             dict(int:Swarm): the dictionary of group IDs and their corresponding Swarm sample.
         """
-        sources = sample(self.nodes, n) # Initial random sources
-        swarms = {} # Dict(group ID:Swarm)
-        for i,src in enumerate(sources): # Initialize swarms
-            src.set_group(i)
-            swarms[i] = Swarm(self.connection_range, nodes=[src])
-        free_nodes = [n for n in self.nodes if n.group==-1]
-        burning_nodes = sources
-        next_nodes = []
-        while free_nodes: # Spread paths from each burning node in parallel
-            for bn in burning_nodes:
-                if not free_nodes:
-                    break
-                free_neighbors = set(free_nodes).intersection(bn.neighbors)
-                if free_neighbors: # At least one unassigned neighbor
-                    nodes = bn.proba_walk(p, i, overlap) # Next node(s)
-                else:
-                    nodes = [self.random_jump(s, overlap)] # If no neighbor, perform random jump in the graph
-                for n in nodes:
-                    n.set_group(bn.group)
-                    swarms[bn.group].add_node(n) 
-                    free_nodes.remove(n)
-                    next_nodes.append(n)
-            burning_nodes = next_nodes
-        return swarms
+        if overlap:
+            raise ValueError("Overlapping groups are not supported")
+        indptr, indices = self.adjacency_csr()
+        return self.set_groups(forest_fire(indptr, indices, n, p, np.random.default_rng(s)))
     
     def MDRW(self, n=10, s=1, overlap=False):
         """
-        Function to perform graph sampling by the Multi-Dimensional Random Walk algorithm.
-        In the initial phase, n nodes are selected as sources. Then they all perform random walks in parallel (see help(Node.random_walk) for
-        more information). 
-        We finally obtain n samples defined as the random walks from each source.
+        Function to perform graph sampling by the Multi-Dimensional Random Walk algorithm (see help(sampling.mdrw)).
+        In the initial phase, n nodes are selected as sources. Then they all perform random walks in parallel.
+        We finally obtain n samples defined as the random walks from each source. The group ID of each node is updated accordingly.
         Args:
             n (int, optional): the initial number of sources. Defaults to 10.
-            s (int, optional): the random seed. Defaults to 1.
-            overlap (bool, optional): if True, node groups are allowed to overlap. Defaults to False.
+            s (int or np.random.Generator, optional): the random seed, or a random generator. Defaults to 1.
+            overlap (bool, optional): not supported, node groups are a partition of the swarm. Defaults to False.
         Returns:
             dict(int:Swarm): the dictionary of group IDs and their corresponding Swarm sample.
         """
-        sources = sample(self.nodes, n) # Initial random sources
-        swarms = {} # Dict(group ID:Swarm)
-        for i,src in enumerate(sources): # Initialize swarms
-            src.set_group(i)
-            swarms[i] = Swarm(self.connection_range, nodes=[src])
-        free_nodes = [n for n in self.nodes if n.group==-1]
-        while free_nodes: # Spread paths to desired length
-            for k in swarms.keys():
-                n_i = swarms[k].nodes[-1] # Current node
-                free_neighbors = set(free_nodes).intersection(n_i.neighbors)
-                if free_neighbors: # At least one unassigned neighbor
-                    n_j = n_i.random_walk(i, overlap) # Next node
-                else:
-                    n_j = self.random_jump(s, overlap) # If no neighbor, perform random jump in the graph
-                n_j.set_group(n_i.group)
-                swarms[k].add_node(n_j) 
-                free_nodes.remove(n_j)
-        return swarms
+        if overlap:
+            raise ValueError("Overlapping groups are not supported")
+        indptr, indices = self.adjacency_csr()
+        return self.set_groups(mdrw(indptr, indices, n, np.random.default_rng(s)))
     
     def RNS(self, clist=range(10), s=1):
         """
-        Function to perform graph sampling by the Random Node Sampling algorithm.
+        Function to perform graph sampling by the Random Node Sampling algorithm (see help(sampling.rns)).
         Each node choses a random group ID from the list given as parameter.
         Args:
             clist (list(int)): list of group IDs. Defaults to range(10).
-            s (int, optional): random seed. Defaults to 1.
+            s (int or np.random.Generator, optional): random seed, or a random generator. Defaults to 1.
         """
-        for i, node in enumerate(self.nodes):
-            node.random_group(clist, s*i)
+        self.set_groups(rns(len(self.nodes), clist, np.random.default_rng(s)))
             
     def random_jump(self, s=1, overlap=False):
         """
@@ -529,7 +792,7 @@ class Swarm:
     
 
     #************** Plot functions **************
-    def plot(self, t:int):
+    def plot(self, t:int, renderer=None):
         """
         Function to create a 3D-plot of the swarm at a given timestamp. 
         Visualizes the message propagation with 3 colors: 
@@ -538,25 +801,295 @@ class Swarm:
             green: the node has transmitted its message (state -1)
         Args:
             t (int): timestamp of the simulation
+            renderer (SwarmRenderer, optional): the renderer of a previous plot, updated in place instead of creating a new figure.
+                Defaults to None.
+        Returns:
+            SwarmRenderer: the renderer of the plot (see help(rendering.SwarmRenderer)).
         """
-        fig = plt.figure(figsize=(8,8))
-        ax = plt.axes(projection='3d')
-        x_data = [node.x for node in self.nodes]
-        y_data = [node.y for node in self.nodes]
-        z_data = [node.z for node in self.nodes]
-        node_states = np.array([node.state for node in self.nodes])
-        colormap = np.array(['blue','red','green'])
-        ax.scatter(x_data, y_data, z_data, c=colormap[node_states])
-        ax.set_title('Propagation at time '+str(t))
+        colors = state_colors([node.state for node in self.nodes])
+        if renderer is None:
+            renderer = SwarmRenderer(self.positions(), colors=colors)
+        renderer.update(self.positions(), colors=colors, title='Propagation at time '+str(t))
+        return renderer
     
     def plot_edges(self, n_color='blue', e_color='gray'):
-        fig = plt.figure(figsize=(8,8))
-        ax = plt.axes(projection='3d')
-        x_data = [node.x for node in self.nodes]
-        y_data = [node.y for node in self.nodes]
-        z_data = [node.z for node in self.nodes]
-        ax.scatter(x_data, y_data, z_data, c=n_color, s=50)
-        for node in self.nodes:
-            for n in node.neighbors:
-                if n in self.nodes:
-                    ax.plot([node.x, n.x], [node.y, n.y], [node.z, n.z], c=e_color)
\ No newline at end of file
+        """
+        Function to create a 3D-plot of the swarm with an edge between each pair of neighbors (according to the current neighbor lists).
+        All the edges are drawn as a single collection, each link once.
+        Args:
+            n_color (str, optional): the color of the nodes. Defaults to 'blue'.
+            e_color (str, optional): the color of the edges. Defaults to 'gray'.
+        Returns:
+            SwarmRenderer: the renderer of the plot (see help(rendering.SwarmRenderer)).
+        """
+        indptr, indices = self.adjacency_csr()
+        src = np.repeat(np.arange(len(self.nodes)), np.diff(indptr))
+        pairs = np.stack((src, indices), axis=1)
+        return SwarmRenderer(self.positions(), pairs[pairs[:, 0] < pairs[:, 1]], n_color, e_color)
+
+#==============================================================================================
+
+class SwarmTrace:
+    """
+    SwarmTrace object, representing the positions of a swarm of nanosatellites over time.
+    The positions are stored as one contiguous (T, N, 3) array. Swarm objects are only built on demand, one timestamp at a time.
+    """
+    
+    def __init__(self, positions, timestamps=None, node_ids=None, connection_range=0):
+        """
+        SwarmTrace object constructor
+        
+        Args:
+            positions (np.ndarray): the (T, N, 3) array of node coordinates, for T timestamps and N nodes (float32 or float64).
+            timestamps (list(int), optional): the label of each timestamp. Defaults to None (0 to T-1).
+            node_ids (list(int), optional): the ID of each node. Defaults to None (0 to N-1).
+            connection_range (int, optional): the maximum distance between two nodes to establish a connection. Defaults to 0.
+        """
+        self.positions = np.asarray(positions) # Not copied, may be a memory map (see help(trace_cache.open_cache))
+        if not np.issubdtype(self.positions.dtype, np.floating):
+            self.positions = self.positions.astype(float)
+        if self.positions.ndim != 3 or self.positions.shape[2] != 3:
+            raise ValueError(f"positions must have shape (T, N, 3), got {self.positions.shape}")
+        T, N, _ = self.positions.shape
+        self.timestamps = np.arange(T) if timestamps is None else np.asarray(timestamps)
+        self.node_ids = np.arange(N) if node_ids is None else np.asarray(node_ids)
+        if len(self.timestamps) != T or len(self.node_ids) != N:
+            raise ValueError("timestamps and node_ids must match the shape of positions")
+        self.connection_range = connection_range
+        
+    def __getitem__(self, key):
+        """
+        Function to access the trace by timestamp index.
+        Args:
+            key (int or slice): the index of a timestamp, or a slice of timestamps.
+        Returns:
+            Swarm or SwarmTrace: the swarm at the given timestamp, or the trace restricted to the time window.
+        """
+        if isinstance(key, slice):
+            return SwarmTrace(self.positions[key], self.timestamps[key], self.node_ids, self.connection_range)
+        return self.swarm(key)
+    
+    def __iter__(self):
+        """
+        Function to iterate over the swarms of the trace, in time order. Each Swarm object is built lazily.
+        """
+        for t in range(len(self)):
+            yield self.swarm(t)
+    
+    def __len__(self):
+        """
+        Returns:
+            int: the number of timestamps in the trace.
+        """
+        return len(self.positions)
+        
+    def __str__(self):
+        """
+        SwarmTrace object descriptor
+        
+        Returns:
+            str: the string description of the trace
+        """
+        T, N, _ = self.positions.shape
+        return f"Trace of {N} node(s) over {T} timestamp(s), connection range: {self.connection_range}"
+    
+    #*************** Loading ***************
+    @classmethod
+    def from_csv(cls, paths, header=False, connection_range=0):
+        """
+        Function to load a trace from one CSV file per node, each holding 3 rows (x, y, z) and one column per timestamp.
+        Args:
+            paths (list(str)): the CSV file of each node, in node ID order.
+            header (bool, optional): if True, the first row holds the timestamp labels. Defaults to False.
+            connection_range (int, optional): the connection range of the swarm. Defaults to 0.
+        Returns:
+            SwarmTrace: the loaded trace.
+        """
+        data = [np.loadtxt(path, delimiter=',', ndmin=2, skiprows=int(header)) for path in paths]
+        timestamps = None
+        if header and paths:
+            with open(paths[0]) as f:
+                timestamps = [int(float(t)) for t in f.readline().strip().split(',')]
+        return cls(np.stack(data, axis=1).transpose(2, 1, 0), timestamps, connection_range=connection_range)
+    
+    @classmethod
+    def from_dataframes(cls, satellites, connection_range=0):
+        """
+        Function to build a trace from a dictionary of pandas DataFrames indexed by coordinate ('x', 'y', 'z'), with one column per timestamp.
+        Args:
+            satellites (dict(int:pd.DataFrame)): the dictionary of node IDs and their coordinates over time.
+            connection_range (int, optional): the connection range of the swarm. Defaults to 0.
+        Returns:
+            SwarmTrace: the converted trace.
+        """
+        frames = list(satellites.values())
+        positions = np.stack([df.loc[['x','y','z']].to_numpy(dtype=float).T for df in frames], axis=1)
+        timestamps = [int(t) for t in frames[0].columns] if frames else None
+        return cls(positions, timestamps, list(satellites.keys()), connection_range)
+    
+    #*************** Common operations ***************
+    def adjacency(self, connection_range=None, start=0, stop=None, chunk_size=100):
+        """
+        Function to stream the boolean adjacency matrices of a time window, computed in batched time chunks so that memory stays bounded.
+        Args:
+            connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+            chunk_size (int, optional): the number of timestamps per chunk. Defaults to 100.
+        Returns:
+            generator: the (t, N, N) boolean adjacency chunks, in time order.
+        """
+        if not connection_range:
+            connection_range = self.connection_range
+        positions = self.positions[start:stop]
+        N = positions.shape[1]
+        not_self = self.node_ids[:, np.newaxis] != self.node_ids[np.newaxis, :] # Same rule as Node.is_neighbor
+        for k in range(0, len(positions), chunk_size):
+            pos = positions[k:k+chunk_size]
+            diff = pos[:, :, np.newaxis, :] - pos[:, np.newaxis, :, :]
+            yield (np.sqrt(np.einsum('tijk,tijk->tij', diff, diff)) <= connection_range) & not_self
+    
+    def animate(self, path, start=0, stop=None, connection_range=None, colors='components', fps=10, dpi=100):
+        """
+        Function to render a time window of the trace into a video or GIF file, frame by frame (see help(rendering.animate_trace)).
+        Args:
+            path (str): the output file, e.g. 'swarm.mp4' or 'swarm.gif'.
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+            connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+            colors (str or np.ndarray, optional): 'components', a (T, N) array of propagation states, or a single color. Defaults to 'components'.
+            fps (int, optional): the number of frames per second. Defaults to 10.
+            dpi (int, optional): the resolution of the frames. Defaults to 100.
+        """
+        animate_trace(self, path, start, stop, connection_range, colors, fps=fps, dpi=dpi)
+    
+    def graphlets(self, sizes=(3, 4, 5), connection_range=None, start=0, stop=None):
+        """
+        Function to count the induced connected graphlets of every timestamp of a time window (see help(graphlets.batch_graphlets)).
+        Args:
+            sizes (list(int), optional): the graphlet sizes, among 3, 4 and 5. Defaults to (3, 4, 5).
+            connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        Returns:
+            dict(int:np.ndarray): the (T, K) counts of each size, one row per timestamp.
+        """
+        return batch_graphlets(self.adjacency(connection_range, start, stop), sizes)
+    
+    def items(self):
+        """
+        Function to iterate over the trace as (timestamp, Swarm) pairs, like a dictionary of Swarm objects.
+        Each Swarm object is built lazily.
+        """
+        for t in range(len(self)):
+            yield self.timestamps[t].item(), self.swarm(t)
+    
+    def neighbor_pairs(self, connection_range=None, skin=None, start=0, stop=None):
+        """
+        Function to step through the trace and yield the neighbor pairs of each timestamp, maintained incrementally
+        (see help(VerletList)). The results match a full recompute at each timestamp.
+        Args:
+            connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+            skin (float, optional): the extra distance for the candidate pairs. Defaults to None (10% of the connection range).
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        Returns:
+            generator: the (M, 2) arrays of node index pairs (i, j), with i < j, for each timestamp.
+        """
+        if not connection_range:
+            connection_range = self.connection_range
+        if skin is None:
+            skin = 0.1*connection_range
+        vl = VerletList(connection_range, skin)
+        for pos in self.positions[start:stop]:
+            yield vl.update(pos)
+    
+    def positions_at(self, t:int):
+        """
+        Function to access the node coordinates at a given timestamp index without building any Node object.
+        Args:
+            t (int): the timestamp index.
+        Returns:
+            np.ndarray: the (N, 3) array of coordinates (a view on the trace).
+        """
+        return self.positions[t]
+    
+    def range_sweep(self, ranges, start=0, stop=None):
+        """
+        Function to compute connectivity metrics for a whole list of connection ranges at each timestamp of a time window,
+        with a single distance computation per timestamp (see help(graph_metrics.range_sweep)).
+        Args:
+            ranges (list(int)): the connection ranges to evaluate.
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        Returns:
+            dict(str:np.ndarray): for T timestamps and R ranges, 'degree' (T, R, N), 'isolation' (T, R), 'density' (T, R)
+            and 'components' (T, R).
+        """
+        sweeps = [range_sweep(pos, ranges, self.node_ids) for pos in self.positions[start:stop]]
+        result = {'ranges': np.asarray(ranges, dtype=float)}
+        N = self.positions.shape[1]
+        empty = {'degree': np.empty((0, len(ranges), N), dtype=int), 'isolation': np.empty((0, len(ranges))),
+                 'density': np.empty((0, len(ranges))), 'components': np.empty((0, len(ranges)), dtype=int)} # Empty window
+        for key in ('degree', 'isolation', 'density', 'components'):
+            result[key] = np.stack([sw[key] for sw in sweeps]) if sweeps else empty[key]
+        return result
+    
+    def swarm(self, t:int, connection_range=None):
+        """
+        Function to build the Swarm object of a given timestamp index.
+        Args:
+            t (int): the timestamp index.
+            connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+        Returns:
+            Swarm: the swarm at the given timestamp.
+        """
+        if not connection_range:
+            connection_range = self.connection_range
+        nodes = [Node(id, x, y, z) for id, (x, y, z) in zip(self.node_ids.tolist(), self.positions[t].tolist())]
+        return Swarm(connection_range, nodes=nodes)
+    
+    def topology_log(self, connection_range=None, skin=None, start=0, stop=None, keyframe=100):
+        """
+        Function to record the topology of a time window as a log of link changes (see help(topology_log.TopologyLog)),
+        instead of one neighbor matrix per timestamp.
+        Args:
+            connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+            skin (float, optional): the extra distance for the candidate pairs, see help(SwarmTrace.neighbor_pairs). Defaults to None.
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+            keyframe (int, optional): the number of timestamps between two stored sets of links. Defaults to 100.
+        Returns:
+            TopologyLog: the log, whose timestamp 0 is the start of the window.
+        """
+        return build_log(self.neighbor_pairs(connection_range, skin, start, stop), self.positions.shape[1], keyframe)
+    
+    def track_components(self, connection_range=None, skin=None, start=0, stop=None):
+        """
+        Function to follow the connected components of the swarm through a time window, updating them incrementally from
+        one timestamp to the next (see help(ComponentTracker)).
+        Args:
+            connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+            skin (float, optional): the extra distance for the candidate pairs, see help(SwarmTrace.neighbor_pairs). Defaults to None.
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        Returns:
+            tuple(np.ndarray, list): the (T, N) component labels, and the list of merge / split events as
+            (timestamp index, kind, component, components).
+        """
+        tracker = ComponentTracker(self.positions.shape[1])
+        labels = [tracker.update(pairs) for pairs in self.neighbor_pairs(connection_range, skin, start, stop)]
+        labels = np.stack(labels) if labels else np.empty((0, self.positions.shape[1]), dtype=np.int64)
+        events = [(step + start, kind, c, others) for step, kind, c, others in tracker.events]
+        return labels, events
+    
+    def window(self, start=0, stop=None):
+        """
+        Function to restrict the trace to a time window, without copying the positions.
+        Args:
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        Returns:
+            SwarmTrace: the trace restricted to the time window.
+        """
+        return self[start:stop]
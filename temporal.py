@@ -0,0 +1,220 @@
+import hashlib
+import numpy as np
+
+from graph_metrics import component_labels
+
+
+_cache = {} # Dict(key:TemporalReachability), see help(reachability)
+
+
+#==============================================================================================
+
+class TemporalReachability:
+    """
+    TemporalReachability object, computing the earliest-arrival times of store-carry-forward routes over a trace, from every node
+    to every other node, for any start time.
+    A single backward scan of the snapshots computes, for each step t, the matrix F_t[i, j] of the earliest step at which a message
+    held by node i at step t can be held by node j. Only the matrices of every `checkpoint` steps are kept: a query at any start
+    time replays at most `checkpoint` steps backward from the next checkpoint.
+    """
+
+    def __init__(self, trace, connection_range=None, max_hops=1, checkpoint=100, start=0, stop=None, chunk_size=100):
+        """
+        TemporalReachability object constructor
+
+        Args:
+            trace (SwarmTrace): the trace of the swarm.
+            connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+            max_hops (int, optional): 1 if a message travels at most one hop per step (as in help(propagation.Propagation)),
+                None if it reaches the whole connected component of its holder within a step. Defaults to 1.
+            checkpoint (int, optional): the number of steps between two stored matrices. Defaults to 100.
+            start (int, optional): the first timestamp index of the window. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+            chunk_size (int, optional): the number of adjacency matrices computed at once. Defaults to 100.
+        """
+        if max_hops not in (1, None):
+            raise ValueError(f"max_hops must be 1 or None, got {max_hops}")
+        self.trace = trace
+        self.connection_range = connection_range or trace.connection_range
+        self.max_hops = max_hops
+        self.checkpoint = int(checkpoint)
+        self.start, self.stop, _ = slice(start, stop).indices(len(trace))
+        self.chunk_size = int(chunk_size)
+        self.nb_nodes = trace.positions.shape[1]
+        self.never = np.iinfo(np.int32).max # Arrival step of unreachable nodes
+        self._checkpoints = None # Dict(int:np.ndarray), F_t for the checkpoint steps, filled by scan()
+
+    def __str__(self):
+        """
+        TemporalReachability object descriptor
+
+        Returns:
+            str: the string description of the engine
+        """
+        state = 'not scanned' if self._checkpoints is None else f"{len(self._checkpoints)} checkpoint(s)"
+        return f"Temporal reachability of {self.nb_nodes} node(s) over steps [{self.start}, {self.stop}), connection range: {self.connection_range}, {state}"
+
+    #*************** Scan ***************
+    def _terminal(self):
+        """
+        Function to build the matrix after the last step of the window: every node only holds its own messages.
+        Returns:
+            np.ndarray: the (N, N) arrival matrix.
+        """
+        F = np.full((self.nb_nodes, self.nb_nodes), self.never, dtype=np.int32)
+        np.fill_diagonal(F, self.stop)
+        return F
+
+    def _step_back(self, F, A, t):
+        """
+        Function to compute F_t from F_{t+1} and the adjacency matrix of step t.
+        Args:
+            F (np.ndarray): the (N, N) arrival matrix F_{t+1}.
+            A (np.ndarray): the (N, N) boolean adjacency matrix of step t.
+            t (int): the step.
+        Returns:
+            np.ndarray: the (N, N) arrival matrix F_t.
+        """
+        if self.max_hops == 1: # Keep the message, or hand it to a neighbor which holds it from t+1
+            src, dst = np.nonzero(A)
+            out = F.copy()
+            if len(src):
+                rows, first = np.unique(src, return_index=True)
+                out[rows] = np.minimum(out[rows], np.minimum.reduceat(F[dst], first, axis=0))
+        else: # The whole component holds the message at t
+            labels = component_labels(len(A), np.argwhere(np.triu(A)))
+            order = np.argsort(labels, kind='stable')
+            _, first = np.unique(labels[order], return_index=True)
+            best = np.minimum.reduceat(F[order], first, axis=0)
+            out = best[labels]
+            out[labels[:, np.newaxis] == labels[np.newaxis, :]] = t
+        np.fill_diagonal(out, t)
+        return out
+
+    def _replay(self, F, stop, start):
+        """
+        Function to scan the snapshots backward from F_stop down to F_start.
+        Args:
+            F (np.ndarray): the arrival matrix F_stop.
+            stop (int): the step of F.
+            start (int): the step to go back to.
+        Returns:
+            generator: the (t, F_t) pairs, for t from stop-1 down to start.
+        """
+        for b in range(stop, start, -self.chunk_size):
+            a = max(start, b - self.chunk_size)
+            chunk = next(self.trace.adjacency(self.connection_range, a, b, chunk_size=b-a))
+            for t in range(b-1, a-1, -1):
+                F = self._step_back(F, chunk[t-a], t)
+                yield t, F
+
+    def scan(self):
+        """
+        Function to perform the backward scan of the whole window and store the checkpoint matrices. Done once, on the first query.
+        """
+        if self._checkpoints is not None:
+            return
+        F = self._terminal()
+        self._checkpoints = {self.stop: F}
+        for t, F in self._replay(F, self.stop, self.start):
+            if (t - self.start) % self.checkpoint == 0:
+                self._checkpoints[t] = F
+
+    #*************** Queries ***************
+    def earliest_arrival(self, t0):
+        """
+        Function to compute the earliest-arrival steps from every node to every other node, for messages created at step t0.
+        Args:
+            t0 (int): the start timestamp index, within the window.
+        Returns:
+            np.ndarray: the (N, N) matrix of arrival steps (timestamp indices), -1 if unreachable before the end of the window.
+        """
+        if not self.start <= t0 < self.stop:
+            raise ValueError(f"t0 must be within [{self.start}, {self.stop}), got {t0}")
+        self.scan()
+        c = min(self.start + -(-(t0 - self.start) // self.checkpoint)*self.checkpoint, self.stop) # Next checkpoint
+        F = self._checkpoints[c]
+        for t, F in self._replay(F, c, t0):
+            pass
+        F = F.astype(np.int64)
+        F[F == self.never] = -1
+        return F
+
+    def latency(self, t0, dt=1.0):
+        """
+        Function to compute the latencies of the earliest-arrival routes for messages created at step t0.
+        Args:
+            t0 (int): the start timestamp index.
+            dt (float, optional): the duration of a step. Defaults to 1.0.
+        Returns:
+            np.ndarray: the (N, N) latencies, NaN if unreachable.
+        """
+        F = self.earliest_arrival(t0).astype(float)
+        F[F < 0] = np.nan
+        return (F - t0)*dt
+
+    def report(self, starts=None, dt=1.0):
+        """
+        Function to summarize the earliest-arrival latencies over several start times.
+        Args:
+            starts (list(int), optional): the start timestamp indices. Defaults to None (every checkpoint of the window).
+            dt (float, optional): the duration of a step. Defaults to 1.0.
+        Returns:
+            dict: 'starts', 'temporal_diameter' (max latency among connected pairs, per start), 'reachability' (ratio of pairs
+            of distinct nodes connected before the end of the window, per start), 'mean_latency' (per start) and 'latencies'
+            (all the finite latencies, pooled).
+        """
+        if starts is None:
+            starts = range(self.start, self.stop, self.checkpoint)
+        starts = np.asarray(list(starts), dtype=np.int64)
+        off_diag = ~np.eye(self.nb_nodes, dtype=bool)
+        diameters, reach, means, pooled = [], [], [], []
+        for t0 in starts:
+            lat = self.latency(t0, dt)[off_diag]
+            lat = lat[~np.isnan(lat)]
+            diameters.append(lat.max() if len(lat) else np.nan)
+            means.append(lat.mean() if len(lat) else np.nan)
+            reach.append(len(lat) / off_diag.sum() if off_diag.any() else 0.0)
+            pooled.append(lat)
+        return {
+            'starts': starts,
+            'temporal_diameter': np.array(diameters),
+            'reachability': np.array(reach),
+            'mean_latency': np.array(means),
+            'latencies': np.concatenate(pooled) if pooled else np.empty(0),
+            }
+
+
+#==============================================================================================
+
+def trace_key(trace):
+    """
+    Function to compute a fingerprint of the positions of a trace, used as cache key.
+    Args:
+        trace (SwarmTrace): the trace.
+    Returns:
+        tuple: the shape of the positions and the digest of their content.
+    """
+    positions = np.ascontiguousarray(trace.positions)
+    return positions.shape, hashlib.blake2b(positions.view(np.uint8), digest_size=16).hexdigest()
+
+def reachability(trace, connection_range=None, max_hops=1, checkpoint=100, start=0, stop=None):
+    """
+    Function to get the temporal reachability engine of a trace (see help(TemporalReachability)), cached per (trace, range),
+    so that repeated routing queries reuse the same backward scan.
+    Args:
+        trace (SwarmTrace): the trace of the swarm.
+        connection_range (int, optional): the connection range of the swarm. Defaults to None (the one of the trace).
+        max_hops (int, optional): 1 or None, see help(TemporalReachability). Defaults to 1.
+        checkpoint (int, optional): the number of steps between two stored matrices. Defaults to 100.
+        start (int, optional): the first timestamp index of the window. Defaults to 0.
+        stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+    Returns:
+        TemporalReachability: the cached engine.
+    """
+    connection_range = connection_range or trace.connection_range
+    start, stop, _ = slice(start, stop).indices(len(trace))
+    key = (trace_key(trace), connection_range, max_hops, checkpoint, start, stop)
+    if key not in _cache:
+        _cache[key] = TemporalReachability(trace, connection_range, max_hops, checkpoint, start, stop)
+    return _cache[key]
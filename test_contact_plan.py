@@ -0,0 +1,30 @@
+import numpy as np
+
+from contact_plan import contact_plan
+from swarm_sim import SwarmTrace
+
+
+#==============================================================================================
+
+def test_contact_plan_matches_sampled_distances():
+    rng = np.random.default_rng(0)
+    T, N, r, dt = 30, 8, 1.0, 10.0
+    positions = np.cumsum(rng.normal(0, 0.3, (T, N, 3)), axis=0) + rng.uniform(-1.5, 1.5, (1, N, 3))
+    positions += np.arange(T)[:, np.newaxis, np.newaxis]*100 # Common motion of the swarm
+    trace = SwarmTrace(positions, connection_range=r)
+    plan = contact_plan(trace, start=2, stop=25, dt=dt, block=4)
+    intervals = plan.intervals()
+    assert len(plan) > 0
+    assert (intervals['end'] > intervals['start']).all()
+    i, j = np.triu_indices(N, k=1)
+    s = np.linspace(0, 1, 40, endpoint=False)
+    for t in range(2, 24): # Linear interpolation between the samples
+        sampled = positions[t] + s[:, np.newaxis, np.newaxis]*(positions[t+1] - positions[t]) # (S, N, 3)
+        distances = np.linalg.norm(sampled[:, i] - sampled[:, j], axis=2) # (S, P)
+        for k, time in enumerate((t + s)*dt):
+            if np.isclose(plan.events['time'], time, atol=1e-6).any():
+                continue
+            inside = (intervals['start'] <= time) & (intervals['end'] > time)
+            linked = set(zip(intervals['n1'][inside].tolist(), intervals['n2'][inside].tolist()))
+            assert linked == set(zip(i[distances[k] <= r].tolist(), j[distances[k] <= r].tolist()))
+    assert plan.start_time == 2*dt and plan.end_time == 24*dt
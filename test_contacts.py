@@ -0,0 +1,81 @@
+import numpy as np
+
+from contacts import ContactAnalyzer, analyze_contacts
+
+
+#==============================================================================================
+
+def _snapshots(rng, steps, n, p=0.3):
+    """
+    Function to draw a sequence of random undirected snapshots.
+    Args:
+        rng (np.random.Generator): the random generator.
+        steps (int): the number of snapshots.
+        n (int): the number of nodes.
+        p (float, optional): the link probability. Defaults to 0.3.
+    Returns:
+        np.ndarray: the (T, n, n) symmetric boolean adjacency matrices.
+    """
+    A = np.triu(rng.random((steps, n, n)) < p, k=1)
+    return A | A.transpose(0, 2, 1)
+
+def _brute_force(A, dt, t0):
+    """
+    Function to list the contact intervals and the inter-contact gaps by scanning the link state of each pair over time.
+    Args:
+        A (np.ndarray): the (T, N, N) adjacency matrices.
+        dt (float): the duration of a timestamp.
+        t0 (float): the time of the first timestamp.
+    Returns:
+        tuple(list, list): the (n1, n2, start, end) contacts and gaps, sorted by pair then start.
+    """
+    T, N = A.shape[:2]
+    contacts, gaps = [], []
+    for i in range(N):
+        for j in range(i+1, N):
+            runs, start = [], None
+            for t in range(T + 1):
+                up = t < T and A[t, i, j]
+                if up and start is None:
+                    start = t
+                elif not up and start is not None:
+                    runs.append((start, t))
+                    start = None
+            contacts += [(i, j, t0 + a*dt, t0 + b*dt) for a, b in runs]
+            gaps += [(i, j, t0 + b*dt, t0 + c*dt) for (_, b), (c, _) in zip(runs[:-1], runs[1:])]
+    return contacts, gaps
+
+def _as_list(intervals):
+    """
+    Returns:
+        list(tuple): the (n1, n2, start, end) tuples of a structured array of intervals.
+    """
+    return [(int(r['n1']), int(r['n2']), float(r['start']), float(r['end'])) for r in intervals]
+
+def test_intervals_match_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        A = _snapshots(rng, int(rng.integers(1, 30)), 8)
+        cuts = np.sort(rng.integers(0, len(A), 3))
+        analyzer = analyze_contacts(np.split(A, cuts), dt=10.0, t0=5.0) # Random time chunks
+        contacts, gaps = _brute_force(A, 10.0, 5.0)
+        assert _as_list(analyzer.intervals()) == contacts
+        assert _as_list(analyzer.inter_contact_times()) == gaps
+        assert np.allclose(analyzer.availability(), A.mean(axis=0)*100)
+        durations = analyzer.intervals()['duration']
+        assert np.allclose(durations, [c[3] - c[2] for c in contacts])
+
+def test_update_deltas_matches_update():
+    rng = np.random.default_rng(1)
+    A = _snapshots(rng, 25, 7)
+    full = analyze_contacts([A])
+    deltas = ContactAnalyzer(7)
+    previous = np.zeros((7, 7), dtype=bool)
+    for snapshot in A:
+        ups = np.argwhere(np.triu(snapshot & ~previous, k=1))
+        downs = np.argwhere(np.triu(previous & ~snapshot, k=1))
+        deltas.update_deltas(ups, downs)
+        previous = snapshot
+    assert _as_list(deltas.intervals()) == _as_list(full.intervals())
+    assert np.allclose(deltas.availability(), full.availability())
+    assert _as_list(deltas.intervals(close=False)) == _as_list(full.intervals(close=False))
@@ -0,0 +1,94 @@
+import numpy as np
+import networkx as nx
+
+from graph_metrics import ComponentTracker, component_labels, hop_distances, pairs_to_csr
+from swarm_sim import Node, Swarm
+
+
+#==============================================================================================
+
+def _networkx_hops(n, pairs):
+    """
+    Function to compute the reference hop matrix with networkx.
+    Args:
+        n (int): the number of nodes.
+        pairs (np.ndarray): the (M, 2) edges.
+    Returns:
+        np.ndarray: the (N, N) hop distances, -1 for unreachable nodes.
+    """
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(map(tuple, pairs.tolist()))
+    ref = np.full((n, n), -1, dtype=np.int64)
+    for u, lengths in nx.all_pairs_shortest_path_length(G):
+        for v, l in lengths.items():
+            ref[u, v] = l
+    return ref
+
+def _networkx_labels(n, pairs):
+    """
+    Function to compute the reference component labels with networkx, numbered from 0 in order of the first node of each component.
+    Args:
+        n (int): the number of nodes.
+        pairs (np.ndarray): the (M, 2) edges.
+    Returns:
+        np.ndarray: the (N,) component labels.
+    """
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(map(tuple, pairs.tolist()))
+    labels = np.empty(n, dtype=np.int64)
+    for c, nodes in enumerate(sorted(nx.connected_components(G), key=min)):
+        labels[list(nodes)] = c
+    return labels
+
+def test_hop_distances_isolated_tail():
+    indptr, indices = pairs_to_csr(4, np.array([[0, 2], [1, 2]]))
+    hops = hop_distances(indptr, indices)
+    assert (hops == _networkx_hops(4, np.array([[0, 2], [1, 2]]))).all()
+    assert (hops == hops.T).all()
+
+def test_hop_distances_matches_networkx():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(2, 40))
+        pairs = np.argwhere(np.triu(rng.random((n, n)) < rng.uniform(0, 0.3), k=1))
+        indptr, indices = pairs_to_csr(n, pairs)
+        assert (hop_distances(indptr, indices) == _networkx_hops(n, pairs)).all()
+
+def test_shortest_paths_lengths_isolated_node():
+    swarm = Swarm(1.5, [Node(0, 0, 0, 0), Node(1, 2, 0, 0), Node(2, 1, 0, 0), Node(3, 100, 0, 0)])
+    assert sorted(swarm.shortest_paths_lengths()) == [1, 1, 1, 1, 2, 2]
+
+def test_component_labels_matches_networkx():
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        n = int(rng.integers(1, 40))
+        pairs = np.argwhere(np.triu(rng.random((n, n)) < rng.uniform(0, 0.15), k=1))
+        assert (component_labels(n, pairs) == _networkx_labels(n, pairs)).all()
+
+def test_component_tracker_matches_networkx():
+    rng = np.random.default_rng(2)
+    n = 30
+    A = np.triu(rng.random((n, n)) < 0.05, k=1)
+    tracker = ComponentTracker(n)
+    prev = None
+    for step in range(60):
+        A = (A & (rng.random((n, n)) > 0.2)) | np.triu(rng.random((n, n)) < 0.01, k=1) # A few links down and up
+        pairs = np.argwhere(A)
+        labels = tracker.update(pairs[rng.permutation(len(pairs))])
+        assert (labels == _networkx_labels(n, pairs)).all()
+        if prev is not None: # Merges and splits from the overlaps of consecutive components
+            expected = []
+            overlap = set(zip(prev.tolist(), labels.tolist()))
+            for c in sorted(set(labels.tolist())):
+                parts = sorted(p for p, q in overlap if q == c)
+                if len(parts) > 1:
+                    expected.append((step, 'merge', c, tuple(parts)))
+            for p in sorted(set(prev.tolist())):
+                parts = sorted(q for r, q in overlap if r == p)
+                if len(parts) > 1:
+                    expected.append((step, 'split', p, tuple(parts)))
+            assert [e for e in tracker.events if e[0] == step] == expected
+        prev = labels
+    assert any(e[1] == 'merge' for e in tracker.events) and any(e[1] == 'split' for e in tracker.events)
@@ -0,0 +1,64 @@
+import numpy as np
+
+from itertools import combinations
+
+from graphlets import _table, batch_graphlets, count_graphlets, group_graphlets
+
+
+#==============================================================================================
+
+def _brute_force(A, k):
+    """
+    Function to count the induced connected k-node graphlets by classifying every k-node set.
+    Args:
+        A (np.ndarray): a (N, N) boolean adjacency matrix.
+        k (int): the number of nodes of the graphlets.
+    Returns:
+        np.ndarray: the count of each graphlet, in the order of graphlet_edges(k).
+    """
+    lookup, classes = _table(k)
+    pairs = list(combinations(range(k), 2))
+    counts = np.zeros(len(classes), dtype=np.int64)
+    for nodes in combinations(range(len(A)), k):
+        code = sum(1 << b for b, (u, v) in enumerate(pairs) if A[nodes[u], nodes[v]])
+        if lookup[code] >= 0:
+            counts[lookup[code]] += 1
+    return counts
+
+def _random_graph(rng, n):
+    """
+    Function to draw a random undirected graph with a random density.
+    Args:
+        rng (np.random.Generator): the random generator.
+        n (int): the number of nodes.
+    Returns:
+        np.ndarray: the (n, n) symmetric boolean adjacency matrix.
+    """
+    A = np.triu(rng.random((n, n)) < rng.uniform(0.05, 0.95), k=1)
+    return A | A.T
+
+def test_count_graphlets_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        A = _random_graph(rng, int(rng.integers(5, 14)))
+        counts = count_graphlets(A)
+        for k in (3, 4, 5):
+            assert (np.asarray(counts[k]) == _brute_force(A, k)).all()
+
+def test_count_graphlets_small_graphs():
+    for n in range(6):
+        A = np.ones((n, n), dtype=bool) & ~np.eye(n, dtype=bool)
+        counts = count_graphlets(A)
+        for k in (3, 4, 5):
+            assert (np.asarray(counts[k]) == _brute_force(A, k)).all()
+
+def test_group_and_batch_graphlets():
+    rng = np.random.default_rng(1)
+    A = _random_graph(rng, 12)
+    labels = rng.integers(0, 2, 12)
+    for g, counts in group_graphlets(A, labels, sizes=(4, 5)).items():
+        idx = np.flatnonzero(labels == g)
+        assert (np.asarray(counts[5]) == _brute_force(A[np.ix_(idx, idx)], 5)).all()
+    rows = batch_graphlets([np.stack((A, _random_graph(rng, 12)))], sizes=(5,))
+    assert rows[5].shape == (2, 21)
+    assert (rows[5][0] == _brute_force(A, 5)).all()
@@ -0,0 +1,57 @@
+import numpy as np
+
+from propagation import Propagation, simulate
+
+
+#==============================================================================================
+
+def _snapshots(rng, steps, n, p=0.1):
+    """
+    Function to draw a sequence of random undirected snapshots.
+    Args:
+        rng (np.random.Generator): the random generator.
+        steps (int): the number of snapshots.
+        n (int): the number of nodes.
+        p (float, optional): the link probability. Defaults to 0.1.
+    Returns:
+        np.ndarray: the (T, n, n) symmetric boolean adjacency matrices.
+    """
+    A = np.triu(rng.random((steps, n, n)) < p, k=1)
+    return A | A.transpose(0, 2, 1)
+
+def test_spray_and_wait_conserves_copies():
+    rng = np.random.default_rng(0)
+    for seed in range(10):
+        sim = Propagation(30, sources=[0, 1, 2], destinations=[5, 6, 7], starts=[0, 3, 6], protocol='spray_and_wait', copies=8, rng=seed)
+        for A in _snapshots(rng, 40, 30):
+            before = sim.copies[np.arange(3), sim.destinations].copy()
+            sim.update(A)
+            assert (sim.copies.sum(axis=1) <= 8).all()
+            assert (sim.copies >= 0).all()
+            assert (sim.copies[np.arange(3), sim.destinations] >= before).all() # The destination never forwards
+
+def test_gossip_senders_transmitted():
+    rng = np.random.default_rng(1)
+    nb_senders = nb_adjacent = 0
+    for A in _snapshots(rng, 20, 25, 0.2):
+        sim = Propagation(25, sources=[0, 1, 2, 3], protocol='gossip', p=0.3, rng=rng)
+        sim.states[:, :10] = 1
+        has = sim.states != 0
+        states = sim.update(A)
+        received = (states == 1) & ~has
+        senders = states == -1
+        assert not (senders & ~has).any()
+        for m in range(4): # Every sender has a receiving neighbor, and every receiver a sending neighbor
+            assert (A[np.ix_(senders[m], received[m])].any(axis=1)).all()
+            assert (A[np.ix_(received[m], senders[m])].any(axis=1)).all()
+        nb_senders += senders.sum()
+        nb_adjacent += (has & (received.astype(int) @ A > 0)).sum()
+    assert nb_senders < nb_adjacent # Carriers next to a receiver whose own trials failed have not transmitted
+
+def test_gossip_extremes():
+    A = _snapshots(np.random.default_rng(2), 15, 20, 0.15)
+    epidemic, _ = simulate(A, [0, 4], protocol='epidemic')
+    always, _ = simulate(A, [0, 4], protocol='gossip', p=1.0, rng=0)
+    never, _ = simulate(A, [0, 4], protocol='gossip', p=0.0, rng=0)
+    assert (always.states == epidemic.states).all()
+    assert (never.states != 0).sum() == 2
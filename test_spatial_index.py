@@ -0,0 +1,32 @@
+import numpy as np
+
+from spatial_index import VerletList
+from swarm_sim import SwarmTrace
+
+
+#==============================================================================================
+
+def _dense_pairs(positions, r):
+    """
+    Function to compute the reference neighbor pairs from the full distance matrix.
+    Args:
+        positions (np.ndarray): the (N, 3) node coordinates.
+        r (float): the connection range.
+    Returns:
+        np.ndarray: the (M, 2) node pairs (i, j) within range, with i < j, sorted lexicographically.
+    """
+    D = np.linalg.norm(positions[:, np.newaxis] - positions[np.newaxis], axis=2)
+    return np.argwhere(np.triu(D <= r, k=1))
+
+def test_verlet_list_matches_dense():
+    rng = np.random.default_rng(0)
+    positions = np.round(np.cumsum(rng.normal(0, 0.3, (20, 15, 3)), axis=0) + rng.uniform(-2, 2, (1, 15, 3)))
+    positions[:, 3] = positions[:, 7] # Coincident nodes, within a range of 0
+    for r in (0.0, 1.0, 2.5):
+        vl = VerletList(r, 0.0)
+        trace = SwarmTrace(positions, connection_range=r)
+        for pos, pairs in zip(positions, trace.neighbor_pairs()):
+            expected = _dense_pairs(pos, r)
+            assert (vl.update(pos) == expected).all()
+            assert (pairs == expected).all()
+    assert len(_dense_pairs(positions[0], 0.0)) > 0
@@ -0,0 +1,78 @@
+import numpy as np
+import pickle
+
+from swarm_sim import Node, Swarm, SwarmTrace
+
+
+#==============================================================================================
+
+def _swarm(n=5):
+    """
+    Function to build a small swarm of aligned nodes, 1 apart.
+    Args:
+        n (int, optional): the number of nodes. Defaults to 5.
+    Returns:
+        Swarm: the swarm, with a connection range of 1.5.
+    """
+    return Swarm(1.5, [Node(i, i, 0, 0) for i in range(n)])
+
+def test_node_index_item_assignment():
+    s = _swarm()
+    s.get_node_by_id(0) # Build the index
+    new = Node(99)
+    s.nodes[0] = new
+    assert s.get_node_by_id(99) is new
+    assert new in s
+    assert s.get_node_by_id(0) is None
+    s.add_node(new)
+    assert len(s.nodes) == 5
+
+def test_node_index_slice_assignment():
+    s = _swarm()
+    s.get_node_by_id(0)
+    a, b = Node(50), Node(51)
+    s.nodes[1:3] = [a, b]
+    assert s.get_node_by_id(50) is a and s.get_node_by_id(51) is b
+    assert a in s and b in s
+    assert s.get_node_by_id(1) is None and s.get_node_by_id(2) is None
+    s.nodes[1:3] = [Node(60)] # Shorter slice
+    assert s.get_node_by_id(60) is not None and s.get_node_by_id(50) is None
+
+def test_node_index_reorder_and_reassign():
+    s = _swarm()
+    nodes = list(s.nodes)
+    s.get_node_by_id(0)
+    s.nodes.reverse()
+    assert [s.index_of(n) for n in nodes] == [4, 3, 2, 1, 0]
+    s.nodes.sort(key=lambda n: n.id)
+    assert [s.index_of(n) for n in nodes] == [0, 1, 2, 3, 4]
+    s.nodes = nodes[:2]
+    assert nodes[1] in s and nodes[2] not in s
+    del s.nodes[0]
+    assert nodes[0] not in s and s.index_of(nodes[1]) == 0
+
+def test_node_index_edges_after_replacement():
+    s = _swarm()
+    s.compute_neighbors()
+    s.get_node_by_id(0)
+    new = Node(99, 0, 0, 0)
+    s.nodes[0] = new
+    s.compute_neighbors()
+    indptr, indices = s.adjacency_csr()
+    assert np.diff(indptr).tolist() == [1, 2, 2, 2, 1]
+    assert s.graph_density() == 4/10
+
+def test_node_index_pickle():
+    s = pickle.loads(pickle.dumps(_swarm()))
+    s.nodes[0] = Node(99)
+    assert s.get_node_by_id(99) is s.nodes[0]
+
+def test_range_sweep_shapes():
+    positions = np.random.default_rng(0).uniform(0, 10, (6, 8, 3))
+    trace = SwarmTrace(positions, connection_range=3)
+    full = trace.range_sweep([2, 4, 6])
+    assert full['degree'].shape == (6, 3, 8) and full['components'].shape == (6, 3)
+    empty = trace.range_sweep([2, 4, 6], start=3, stop=3)
+    for key in ('degree', 'isolation', 'density', 'components'):
+        assert empty[key].shape == (0,) + full[key].shape[1:]
+        assert empty[key].dtype == full[key].dtype
@@ -0,0 +1,42 @@
+import numpy as np
+
+from propagation import simulate
+from swarm_sim import SwarmTrace
+from temporal import TemporalReachability, reachability
+
+
+#==============================================================================================
+
+def _trace(seed=0, steps=40, nb_nodes=12):
+    """
+    Function to build a random-walk trace with a sparse, changing topology.
+    Args:
+        seed (int, optional): the random seed. Defaults to 0.
+        steps (int, optional): the number of timestamps. Defaults to 40.
+        nb_nodes (int, optional): the number of nodes. Defaults to 12.
+    Returns:
+        SwarmTrace: the trace, with a connection range of 1.
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.cumsum(rng.normal(0, 0.4, (steps, nb_nodes, 3)), axis=0) + rng.uniform(-2, 2, (1, nb_nodes, 3))
+    return SwarmTrace(positions, connection_range=1.0)
+
+def test_earliest_arrival_matches_epidemic():
+    trace = _trace()
+    N = trace.positions.shape[1]
+    engine = TemporalReachability(trace, checkpoint=7, start=3, stop=37, chunk_size=5)
+    for t0 in (3, 4, 10, 17, 36):
+        sim, _ = simulate(trace.adjacency(start=t0, stop=37), np.arange(N), protocol='epidemic')
+        expected = np.where(sim.arrival >= 0, t0 + sim.arrival, -1)
+        assert (engine.earliest_arrival(t0) == expected).all()
+    assert np.isfinite(engine.latency(10)).sum() > N # Some routes over several steps
+
+def test_checkpoints_and_cache():
+    trace = _trace(1)
+    a = TemporalReachability(trace, checkpoint=1)
+    b = TemporalReachability(trace, checkpoint=100)
+    for t0 in (0, 13, 39):
+        assert (a.earliest_arrival(t0) == b.earliest_arrival(t0)).all()
+    assert reachability(trace, checkpoint=5) is reachability(trace, checkpoint=5)
+    report = a.report(starts=[0, 20])
+    assert len(report['temporal_diameter']) == 2 and (report['reachability'] <= 1).all()
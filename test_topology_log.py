@@ -0,0 +1,58 @@
+import numpy as np
+
+from contacts import analyze_contacts
+from topology_log import TopologyLog, build_log
+
+
+#==============================================================================================
+
+def _snapshots(rng, steps, n, p=0.3):
+    """
+    Function to draw a sequence of random undirected snapshots.
+    Args:
+        rng (np.random.Generator): the random generator.
+        steps (int): the number of snapshots.
+        n (int): the number of nodes.
+        p (float, optional): the link probability. Defaults to 0.3.
+    Returns:
+        np.ndarray: the (T, n, n) symmetric boolean adjacency matrices.
+    """
+    A = np.triu(rng.random((steps, n, n)) < p, k=1)
+    return A | A.transpose(0, 2, 1)
+
+def test_seek_and_replay_match_adjacency():
+    rng = np.random.default_rng(0)
+    A = _snapshots(rng, 37, 9)
+    log = build_log((np.argwhere(np.triu(a, k=1)) for a in A), 9, keyframe=5)
+    assert len(log) == 37
+    for t in rng.permutation(37):
+        assert (log.adjacency(t) == A[t]).all()
+    for t, pairs in log.replay(3, 30):
+        assert (pairs == np.argwhere(np.triu(A[t], k=1))).all()
+    assert sum(1 for _ in log) == 37
+
+def test_deltas_and_events():
+    rng = np.random.default_rng(1)
+    A = _snapshots(rng, 12, 6)
+    log = TopologyLog(6, keyframe=4)
+    log.append_adjacency(A)
+    previous = np.zeros((6, 6), dtype=bool)
+    for t, a in enumerate(A):
+        ups, downs = log.deltas(t)
+        assert (ups == np.argwhere(np.triu(a & ~previous, k=1))).all()
+        assert (downs == np.argwhere(np.triu(previous & ~a, k=1))).all()
+        previous = a
+    events = log.events()
+    assert len(events) == sum(len(u) + len(d) for u, d in map(log.deltas, range(12)))
+    assert (np.diff(events['step']) >= 0).all()
+
+def test_save_load_and_contacts(tmp_path):
+    rng = np.random.default_rng(2)
+    A = _snapshots(rng, 20, 7)
+    log = TopologyLog(7, keyframe=6)
+    log.append_adjacency(A)
+    log.save(str(tmp_path / 'log.npz'))
+    loaded = TopologyLog.load(str(tmp_path / 'log.npz'))
+    for t in range(20):
+        assert (loaded.adjacency(t) == A[t]).all()
+    assert (log.contacts().intervals() == analyze_contacts([A]).intervals()).all()
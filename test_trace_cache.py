@@ -0,0 +1,38 @@
+import numpy as np
+
+from trace_cache import is_valid, load_trace
+
+
+#==============================================================================================
+
+def _write_csv(tmp_path, nb_nodes=3, steps=4):
+    """
+    Function to write a small trace, one CSV file per node with a header row of timestamps.
+    Args:
+        tmp_path (pathlib.Path): the directory of the files.
+        nb_nodes (int, optional): the number of nodes. Defaults to 3.
+        steps (int, optional): the number of timestamps. Defaults to 4.
+    Returns:
+        tuple(list(str), np.ndarray): the CSV files and the (T, N, 3) coordinates.
+    """
+    rng = np.random.default_rng(0)
+    positions = rng.random((steps, nb_nodes, 3))*1000
+    paths = []
+    for i in range(nb_nodes):
+        path = str(tmp_path / f'out{i}.csv')
+        np.savetxt(path, np.vstack((10*np.arange(1, steps+1), positions[:, i, :].T)), delimiter=',')
+        paths.append(path)
+    return paths, positions
+
+def test_cache_options_invalidate(tmp_path):
+    paths, positions = _write_csv(tmp_path)
+    cache = str(tmp_path / 'cache.npy')
+    trace = load_trace(paths, cache, header=True, workers=1)
+    assert np.allclose(trace.positions, positions)
+    assert list(trace.timestamps) == [10, 20, 30, 40]
+    assert is_valid(paths, cache, header=True) and not is_valid(paths, cache, header=False)
+    trace = load_trace(paths, cache, header=True, dtype=np.float32, workers=1)
+    assert trace.positions.dtype == np.float32
+    assert not is_valid(paths, cache, header=True)
+    assert is_valid(paths, cache, header=True, dtype=np.float32)
+    assert not (tmp_path / 'cache.json.tmp').exists()
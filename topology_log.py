@@ -0,0 +1,297 @@
+import numpy as np
+
+from contacts import ContactAnalyzer
+
+
+LOG_EVENT_DTYPE = np.dtype([('step', np.int64), ('n1', np.int64), ('n2', np.int64), ('up', bool)])
+
+
+#==============================================================================================
+
+class TopologyLog:
+    """
+    TopologyLog object, storing the topology of a swarm over time as an initial set of links followed by the link-up / link-down
+    changes of each timestamp, instead of one neighbor matrix per timestamp.
+    A link (i, j), with i < j, is encoded as the integer key i*N + j. The full set of links is also kept every `keyframe`
+    timestamps, so that any timestamp can be rebuilt by replaying at most `keyframe` steps of changes.
+    """
+
+    def __init__(self, nb_nodes, keyframe=100):
+        """
+        TopologyLog object constructor
+
+        Args:
+            nb_nodes (int): the number of nodes N.
+            keyframe (int, optional): the number of timestamps between two stored sets of links. Defaults to 100.
+        """
+        self.nb_nodes = int(nb_nodes)
+        self.keyframe = int(keyframe)
+        self.dtype = np.int32 if self.nb_nodes**2 < 2**31 else np.int64 # Link keys
+        self.steps = 0 # Number of timestamps logged
+        self._state = np.empty(0, dtype=self.dtype) # Sorted keys of the links at the last timestamp
+        self._keyframes = {} # Dict(int:np.ndarray), sorted keys of the links at every keyframe timestamp
+        self._chunks = [] # Link keys of the changes, per timestamp, not yet merged into self._keys
+        self._keys = np.empty(0, dtype=self.dtype) # Link keys of all the changes, in timestamp order
+        self._up = np.empty(0, dtype=bool) # True for a link up, False for a link down
+        self._offsets = [0] # The changes of timestamp t are self._keys[self._offsets[t]:self._offsets[t+1]]
+
+    def __len__(self):
+        """
+        Returns:
+            int: the number of timestamps logged.
+        """
+        return self.steps
+
+    def __str__(self):
+        """
+        TopologyLog object descriptor
+
+        Returns:
+            str: the string description of the log
+        """
+        return f"Topology log of {self.nb_nodes} node(s) over {self.steps} timestamp(s): {self._offsets[-1]} change(s), {self.nbytes} bytes"
+
+    @property
+    def nbytes(self):
+        """
+        Returns:
+            int: the memory used by the changes and the keyframes, in bytes.
+        """
+        self._merge()
+        return self._keys.nbytes + self._up.nbytes + 8*len(self._offsets) + sum(k.nbytes for k in self._keyframes.values())
+
+    #*************** Recording ***************
+    def _encode(self, pairs):
+        """
+        Function to convert node pairs into sorted link keys.
+        Args:
+            pairs (np.ndarray): the (M, 2) node pairs (i, j), with i < j.
+        Returns:
+            np.ndarray: the (M,) sorted link keys.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        return np.sort(pairs[:, 0]*self.nb_nodes + pairs[:, 1]).astype(self.dtype)
+
+    def _decode(self, keys):
+        """
+        Function to convert link keys into node pairs.
+        Args:
+            keys (np.ndarray): the (M,) link keys.
+        Returns:
+            np.ndarray: the (M, 2) node pairs (i, j), with i < j.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        return np.stack((keys // self.nb_nodes, keys % self.nb_nodes), axis=1)
+
+    def append(self, pairs):
+        """
+        Function to log the links of the next timestamp. Only the changes from the previous timestamp are stored.
+        Args:
+            pairs (np.ndarray): the (M, 2) node pairs (i, j), with i < j, linked at this timestamp (see help(SwarmTrace.neighbor_pairs)).
+        """
+        keys = self._encode(pairs)
+        ups = np.setdiff1d(keys, self._state, assume_unique=True)
+        downs = np.setdiff1d(self._state, keys, assume_unique=True)
+        self._chunks.append((np.concatenate((ups, downs)), np.r_[np.ones(len(ups), dtype=bool), np.zeros(len(downs), dtype=bool)]))
+        self._offsets.append(self._offsets[-1] + len(ups) + len(downs))
+        if self.steps % self.keyframe == 0:
+            self._keyframes[self.steps] = keys
+        self._state = keys
+        self.steps += 1
+
+    def append_adjacency(self, adjacency):
+        """
+        Function to log the next adjacency matrices (see help(TopologyLog.append)).
+        Args:
+            adjacency (np.ndarray): a (N, N) boolean adjacency matrix, or a (t, N, N) chunk of them in time order.
+        """
+        adjacency = np.asarray(adjacency, dtype=bool)
+        if adjacency.ndim == 2:
+            adjacency = adjacency[np.newaxis]
+        for A in adjacency:
+            self.append(np.argwhere(np.triu(A, k=1)))
+
+    def _merge(self):
+        """
+        Function to merge the changes recorded since the last call into the flat arrays of changes.
+        """
+        if self._chunks:
+            keys, up = zip(*self._chunks)
+            self._keys = np.concatenate((self._keys,) + keys).astype(self.dtype)
+            self._up = np.concatenate((self._up,) + up)
+            self._chunks = []
+
+    #*************** Replay ***************
+    def deltas(self, t):
+        """
+        Function to get the link changes of a timestamp, relative to the previous one (to no link for the first timestamp).
+        Args:
+            t (int): the timestamp index.
+        Returns:
+            tuple(np.ndarray, np.ndarray): the (K, 2) node pairs whose link comes up and the (K', 2) node pairs whose link goes down.
+        """
+        if not 0 <= t < self.steps:
+            raise IndexError(f"timestamp index {t} out of range [0, {self.steps})")
+        self._merge()
+        keys = self._keys[self._offsets[t]:self._offsets[t+1]]
+        up = self._up[self._offsets[t]:self._offsets[t+1]]
+        return self._decode(keys[up]), self._decode(keys[~up])
+
+    def _keys_at(self, t):
+        """
+        Function to rebuild the link keys of a timestamp from the previous keyframe. Only the last change of each link between
+        the keyframe and the timestamp matters, so the changes are applied all at once.
+        Args:
+            t (int): the timestamp index.
+        Returns:
+            np.ndarray: the sorted link keys.
+        """
+        if not 0 <= t < self.steps:
+            raise IndexError(f"timestamp index {t} out of range [0, {self.steps})")
+        self._merge()
+        k = t - t % self.keyframe
+        base = self._keyframes[k]
+        keys = self._keys[self._offsets[k+1]:self._offsets[t+1]][::-1] # Latest change first
+        up = self._up[self._offsets[k+1]:self._offsets[t+1]][::-1]
+        changed, last = np.unique(keys, return_index=True)
+        base = base[~np.isin(base, changed, assume_unique=True)]
+        return np.union1d(base, changed[up[last]]).astype(self.dtype)
+
+    def seek(self, t):
+        """
+        Function to rebuild the links of any timestamp, through the keyframe before it.
+        Args:
+            t (int): the timestamp index.
+        Returns:
+            np.ndarray: the (M, 2) node pairs (i, j), with i < j, linked at this timestamp.
+        """
+        return self._decode(self._keys_at(t))
+
+    def adjacency(self, t):
+        """
+        Function to rebuild the boolean adjacency matrix of a timestamp (see help(TopologyLog.seek)).
+        Args:
+            t (int): the timestamp index.
+        Returns:
+            np.ndarray: the (N, N) symmetric boolean adjacency matrix.
+        """
+        pairs = self.seek(t)
+        A = np.zeros((self.nb_nodes, self.nb_nodes), dtype=bool)
+        A[pairs[:, 0], pairs[:, 1]] = True
+        A[pairs[:, 1], pairs[:, 0]] = True
+        return A
+
+    def replay(self, start=0, stop=None):
+        """
+        Function to step forward through the logged timestamps, applying the changes of each timestamp to the links of the previous one.
+        Args:
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the log).
+        Returns:
+            generator: the (t, pairs) couples, with pairs the (M, 2) node pairs linked at timestamp t.
+        """
+        start, stop, _ = slice(start, stop).indices(self.steps)
+        if start >= stop:
+            return
+        self._merge()
+        keys = self._keys_at(start)
+        yield start, self._decode(keys)
+        for t in range(start+1, stop):
+            changes = self._keys[self._offsets[t]:self._offsets[t+1]]
+            up = self._up[self._offsets[t]:self._offsets[t+1]]
+            keys = np.union1d(keys[~np.isin(keys, changes[~up], assume_unique=True)], changes[up]).astype(self.dtype)
+            yield t, self._decode(keys)
+
+    def __iter__(self):
+        """
+        Function to iterate over the links of every timestamp, see help(TopologyLog.replay).
+        """
+        for _, pairs in self.replay():
+            yield pairs
+
+    def events(self, start=0, stop=None):
+        """
+        Function to list the link changes of a time window. The links present at the first timestamp of the log are logged as
+        link-up events of that timestamp.
+        Args:
+            start (int, optional): the first timestamp index. Defaults to 0.
+            stop (int, optional): the timestamp index after the last one. Defaults to None (end of the log).
+        Returns:
+            np.ndarray: the structured array of events with fields step, n1, n2 and up, in timestamp order.
+        """
+        start, stop, _ = slice(start, stop).indices(self.steps)
+        self._merge()
+        a, b = self._offsets[start], self._offsets[max(start, stop)]
+        out = np.empty(b - a, dtype=LOG_EVENT_DTYPE)
+        out['step'] = np.repeat(np.arange(start, max(start, stop)), np.diff(self._offsets[start:max(start, stop)+1]))
+        pairs = self._decode(self._keys[a:b])
+        out['n1'], out['n2'], out['up'] = pairs[:, 0], pairs[:, 1], self._up[a:b]
+        return out
+
+    #*************** Metrics ***************
+    def contacts(self, dt=1.0, t0=0.0):
+        """
+        Function to run a contact analysis directly from the changes (see help(ContactAnalyzer.update_deltas)).
+        Args:
+            dt (float, optional): the duration of a timestamp. Defaults to 1.0.
+            t0 (float, optional): the time of the first timestamp. Defaults to 0.0.
+        Returns:
+            ContactAnalyzer: the analyzer fed with the whole log.
+        """
+        analyzer = ContactAnalyzer(self.nb_nodes, dt, t0)
+        for t in range(self.steps):
+            analyzer.update_deltas(*self.deltas(t))
+        return analyzer
+
+    #*************** Storage ***************
+    def save(self, path):
+        """
+        Function to save the log into a compressed .npz file.
+        Args:
+            path (str): the file path.
+        """
+        self._merge()
+        frames = sorted(self._keyframes)
+        np.savez_compressed(path, nb_nodes=self.nb_nodes, keyframe=self.keyframe, keys=self._keys, up=self._up,
+                            offsets=np.asarray(self._offsets, dtype=np.int64), state=self._state,
+                            frame_steps=np.asarray(frames, dtype=np.int64),
+                            frame_offsets=np.cumsum([0] + [len(self._keyframes[k]) for k in frames]),
+                            frame_keys=np.concatenate([self._keyframes[k] for k in frames] or [np.empty(0, dtype=self.dtype)]))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Function to load a log saved with TopologyLog.save.
+        Args:
+            path (str): the file path.
+        Returns:
+            TopologyLog: the log.
+        """
+        with np.load(path) as data:
+            log = cls(int(data['nb_nodes']), int(data['keyframe']))
+            log._keys = data['keys'].astype(log.dtype)
+            log._up = data['up']
+            log._offsets = data['offsets'].tolist()
+            log._state = data['state'].astype(log.dtype)
+            bounds = data['frame_offsets']
+            log._keyframes = {int(k): data['frame_keys'][bounds[n]:bounds[n+1]].astype(log.dtype) for n, k in enumerate(data['frame_steps'])}
+        log.steps = len(log._offsets) - 1
+        return log
+
+
+#==============================================================================================
+
+def build_log(pair_stream, nb_nodes, keyframe=100):
+    """
+    Function to log a whole sequence of neighbor pairs (see help(TopologyLog)).
+    Args:
+        pair_stream (iterable(np.ndarray)): the (M, 2) node pairs of each timestamp, in time order, e.g. SwarmTrace.neighbor_pairs().
+        nb_nodes (int): the number of nodes.
+        keyframe (int, optional): the number of timestamps between two stored sets of links. Defaults to 100.
+    Returns:
+        TopologyLog: the log of the whole sequence.
+    """
+    log = TopologyLog(nb_nodes, keyframe)
+    for pairs in pair_stream:
+        log.append(pairs)
+    return log
@@ -0,0 +1,143 @@
+import json
+import os
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+
+from swarm_sim import SwarmTrace
+
+
+CACHE_VERSION = 2
+
+
+#==============================================================================================
+
+def _source_info(paths):
+    """
+    Function to describe the source CSV files, to detect when one of them has changed.
+    Args:
+        paths (list(str)): the CSV files.
+    Returns:
+        list(dict): the absolute path, size and modification time of each file.
+    """
+    info = []
+    for path in paths:
+        st = os.stat(path)
+        info.append({'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns})
+    return info
+
+def _ingest(args):
+    """
+    Function to parse one CSV file and write its coordinates into the cache file, from a worker process.
+    Args:
+        args (tuple): the cache file, node index, CSV file and whether the CSV has a header row.
+    Returns:
+        int: the number of timestamps of the CSV file.
+    """
+    cache_path, i, path, header = args
+    data = np.loadtxt(path, delimiter=',', ndmin=2, skiprows=int(header)) # (3, T)
+    positions = np.load(cache_path, mmap_mode='r+')
+    positions[:, i, :] = data.T
+    positions.flush()
+    return data.shape[1]
+
+def _meta_path(cache_path):
+    """
+    Returns:
+        str: the path of the metadata file of a cache file.
+    """
+    return os.path.splitext(cache_path)[0] + '.json'
+
+def is_valid(paths, cache_path, header=False, dtype=np.float64):
+    """
+    Function to check whether a cache file exists and was built from the current version of the given CSV files, with the same
+    parsing options.
+    Args:
+        paths (list(str)): the CSV files, one per node.
+        cache_path (str): the cache file.
+        header (bool, optional): if True, the first row of each CSV file holds the timestamp labels. Defaults to False.
+        dtype (np.dtype, optional): the data type of the coordinates. Defaults to np.float64.
+    Returns:
+        bool: True if the cache can be used as is.
+    """
+    if not (os.path.exists(cache_path) and os.path.exists(_meta_path(cache_path))):
+        return False
+    with open(_meta_path(cache_path)) as f:
+        meta = json.load(f)
+    return (meta.get('version') == CACHE_VERSION and meta.get('header') == bool(header) and meta.get('dtype') == np.dtype(dtype).str
+            and meta.get('sources') == _source_info(paths))
+
+def build_cache(paths, cache_path, header=False, dtype=np.float64, workers=None):
+    """
+    Function to parse the CSV files of a trace (one per node, 3 rows x, y, z and one column per timestamp) in parallel, and write
+    them into a binary cache: a (T, N, 3) .npy array, memory-mappable, plus a .json file of metadata.
+    Args:
+        paths (list(str)): the CSV files, in node ID order.
+        cache_path (str): the .npy cache file to write.
+        header (bool, optional): if True, the first row of each CSV file holds the timestamp labels. Defaults to False.
+        dtype (np.dtype, optional): the data type of the coordinates, e.g. np.float32 to halve the size. Defaults to np.float64.
+        workers (int, optional): the number of worker processes. Defaults to None (number of CPUs).
+    """
+    with open(paths[0]) as f:
+        first = f.readline().strip().split(',')
+        T = len(first)
+    timestamps = [int(float(t)) for t in first] if header else list(range(T))
+    tmp_path = cache_path + '.tmp.npy'
+    np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(T, len(paths), 3)).flush()
+    tasks = [(tmp_path, i, path, header) for i, path in enumerate(paths)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        lengths = [_ingest(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            lengths = list(pool.map(_ingest, tasks))
+    bad = [p for p, n in zip(paths, lengths) if n != T]
+    if bad:
+        os.remove(tmp_path)
+        raise ValueError(f"CSV file(s) {bad} do not have {T} timestamps")
+    meta = {'version': CACHE_VERSION, 'shape': [T, len(paths), 3], 'dtype': np.dtype(dtype).str, 'header': bool(header),
+            'timestamps': timestamps, 'sources': _source_info(paths)}
+    if os.path.exists(_meta_path(cache_path)): # Invalidate the old cache first, so that a crash cannot pair old metadata with new data
+        os.remove(_meta_path(cache_path))
+    os.replace(tmp_path, cache_path)
+    with open(_meta_path(cache_path) + '.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(_meta_path(cache_path) + '.tmp', _meta_path(cache_path))
+
+def open_cache(cache_path, start=0, stop=None, connection_range=0):
+    """
+    Function to open a binary trace cache without reading it: only the timestamps that are accessed are loaded from disk.
+    Args:
+        cache_path (str): the .npy cache file.
+        start (int, optional): the first timestamp index. Defaults to 0.
+        stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        connection_range (int, optional): the connection range of the swarm. Defaults to 0.
+    Returns:
+        SwarmTrace: the trace restricted to the time window, backed by a read-only memory map.
+    """
+    with open(_meta_path(cache_path)) as f:
+        meta = json.load(f)
+    positions = np.load(cache_path, mmap_mode='r')
+    return SwarmTrace(positions, meta['timestamps'], connection_range=connection_range).window(start, stop)
+
+def load_trace(paths, cache_path=None, header=False, start=0, stop=None, connection_range=0, dtype=np.float64, workers=None):
+    """
+    Function to load a trace through its binary cache, (re)building the cache first if it is missing, if a source CSV file
+    has changed since it was built or if it was built with other header or dtype options (see help(build_cache) and help(open_cache)).
+    Args:
+        paths (list(str)): the CSV files, in node ID order.
+        cache_path (str, optional): the .npy cache file. Defaults to None ('trace_cache.npy' next to the first CSV file).
+        header (bool, optional): if True, the first row of each CSV file holds the timestamp labels. Defaults to False.
+        start (int, optional): the first timestamp index. Defaults to 0.
+        stop (int, optional): the timestamp index after the last one. Defaults to None (end of the trace).
+        connection_range (int, optional): the connection range of the swarm. Defaults to 0.
+        dtype (np.dtype, optional): the data type of the coordinates. Defaults to np.float64.
+        workers (int, optional): the number of worker processes for the CSV parsing. Defaults to None (number of CPUs).
+    Returns:
+        SwarmTrace: the trace restricted to the time window.
+    """
+    if cache_path is None:
+        cache_path = os.path.join(os.path.dirname(os.path.abspath(paths[0])), 'trace_cache.npy')
+    if not is_valid(paths, cache_path, header, dtype):
+        build_cache(paths, cache_path, header, dtype, workers)
+    return open_cache(cache_path, start, stop, connection_range)